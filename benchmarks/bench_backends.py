@@ -0,0 +1,146 @@
+"""
+JSON codec and event loop backend benchmark.
+
+Times each installed backend against the stdlib baseline on the work
+Tychra does with them: decoding a CNN payload, saving and loading
+guild_config.json, and running provider fetches plus many small tasks
+on the event loop. Backends that aren't installed are listed as skipped.
+
+    python -m benchmarks.bench_backends
+    python -m benchmarks.bench_backends --guilds 50000 --history-days 365 --json
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks.fake_upstreams import FakeUpstreams  # noqa: E402
+from benchmarks.bench_tychra import point_at_fakes, write_guild_config  # noqa: E402
+
+
+def _best(fn, repeat):
+    """
+    Best wall time of `repeat` calls, in seconds.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_json(backend, payload, config_path, repeat):
+    from src import backends
+    from src.config_manager import ConfigManager
+
+    backends.select_json_backend(backend)
+    decode = _best(lambda: backends.loads(payload), repeat)
+    manager = ConfigManager(config_path)
+    save = _best(manager._save_config, max(1, repeat // 10))
+    load = _best(manager._load_config, max(1, repeat // 10))
+    return {"backend": backend, "cnn_decode_ms": decode * 1000, "config_save_ms": save * 1000, "config_load_ms": load * 1000}
+
+
+async def _loop_workload(fetches, tasks):
+    from providers import MarketProvider
+    from src.http_pool import HttpPool
+
+    pool = HttpPool()
+    provider = MarketProvider()
+    try:
+        session = await pool.session()
+        start = time.perf_counter()
+        for _ in range(fetches):
+            await provider.fetch(session=session)
+        fetch_elapsed = time.perf_counter() - start
+
+        async def tick():
+            await asyncio.sleep(0)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(tick() for _ in range(tasks)))
+        task_elapsed = time.perf_counter() - start
+    finally:
+        await pool.close()
+    return fetch_elapsed / fetches * 1000, tasks / task_elapsed
+
+
+def bench_loop(backend, fetches, tasks):
+    from src import backends
+
+    fetch_ms, tasks_per_sec = backends.run(_loop_workload(fetches, tasks), backend)
+    return {"backend": backend, "fetch_ms": fetch_ms, "tasks_per_sec": tasks_per_sec}
+
+
+def _delta(value, baseline, lower_is_better=True):
+    if not baseline:
+        return ""
+    change = (baseline / value if lower_is_better else value / baseline) if value else float("inf")
+    return f"({change:.2f}x)"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--guilds", type=int, default=20000, help="guilds in the config file (default: 20000)")
+    parser.add_argument("--history-days", type=int, default=365, help="days of CNN history per series (default: 365)")
+    parser.add_argument("--repeat", type=int, default=50, help="decode repetitions, best is reported (default: 50)")
+    parser.add_argument("--fetches", type=int, default=20, help="provider fetches per loop backend (default: 20)")
+    parser.add_argument("--tasks", type=int, default=50000, help="small tasks per loop backend (default: 50000)")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args(argv)
+
+    from src.backends import JSON_BACKENDS, LOOP_BACKENDS, _importable
+
+    upstreams = FakeUpstreams(history_days=args.history_days).start()
+    try:
+        point_at_fakes(upstreams)
+        with urllib.request.urlopen(f"{upstreams.base_url}/index/fearandgreed/graphdata") as response:
+            payload = response.read()
+
+        # Baseline (stdlib) first
+        json_names = [name for name in reversed(JSON_BACKENDS) if _importable(name)]
+        loop_names = [name for name in reversed(LOOP_BACKENDS) if _importable(name)]
+
+        with tempfile.TemporaryDirectory() as tmp:
+            config_path = os.path.join(tmp, "guild_config.json")
+            write_guild_config(config_path, [100000 + i for i in range(args.guilds)])
+            json_results = [bench_json(name, payload, config_path, args.repeat) for name in json_names]
+        loop_results = [bench_loop(name, args.fetches, args.tasks) for name in loop_names]
+    finally:
+        upstreams.stop()
+
+    skipped = [name for name in (*JSON_BACKENDS, *LOOP_BACKENDS) if not _importable(name)]
+    if args.json:
+        print(json.dumps({"json": json_results, "loop": loop_results, "skipped": skipped}, indent=2))
+        return
+
+    base = json_results[0]
+    print(f"JSON codecs (CNN payload {len(payload) / 1024:.0f} KiB, {args.guilds} guild configs)")
+    for result in json_results:
+        print(
+            f"  {result['backend']:<8} decode {result['cnn_decode_ms']:7.3f} ms {_delta(result['cnn_decode_ms'], base['cnn_decode_ms']):<9}"
+            f" config save {result['config_save_ms']:7.2f} ms {_delta(result['config_save_ms'], base['config_save_ms']):<9}"
+            f" load {result['config_load_ms']:7.2f} ms {_delta(result['config_load_ms'], base['config_load_ms'])}"
+        )
+    base = loop_results[0]
+    print(f"Event loops ({args.fetches} provider fetches, {args.tasks} tasks)")
+    for result in loop_results:
+        print(
+            f"  {result['backend']:<8} fetch {result['fetch_ms']:7.2f} ms {_delta(result['fetch_ms'], base['fetch_ms']):<9}"
+            f" tasks {result['tasks_per_sec']:10.0f}/s {_delta(result['tasks_per_sec'], base['tasks_per_sec'], lower_is_better=False)}"
+        )
+    if skipped:
+        print(f"Not installed: {', '.join(skipped)}")
+
+
+if __name__ == "__main__":
+    main()
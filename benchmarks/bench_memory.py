@@ -0,0 +1,156 @@
+"""
+Memory benchmark for the default and LOW_MEMORY client profiles.
+
+Feeds synthetic GUILD_CREATE and MESSAGE_CREATE payloads into a real
+discord.py connection state (no gateway connection) and reports the
+resident memory each profile needs per 1000 guilds, for sizing
+containers. Each profile runs in a fresh interpreter.
+
+    python -m benchmarks.bench_memory --guilds 5000
+    python -m benchmarks.bench_memory --guilds 20000 --messages 5 --json
+"""
+import argparse
+import asyncio
+import gc
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+PROFILES = ("default", "low_memory")
+BOT_ID = 100000000000000000
+USER = {"id": str(BOT_ID), "username": "Tychra", "discriminator": "0", "avatar": None, "bot": True}
+
+
+def guild_payload(guild_id, channels, roles, emojis):
+    """
+    A GUILD_CREATE as Discord sends it without the members intent:
+    channels, roles, emojis and only the bot's own member.
+    """
+    return {
+        "id": str(guild_id),
+        "name": f"Guild {guild_id}",
+        "owner_id": "1",
+        "features": [],
+        "member_count": 250,
+        "large": False,
+        "unavailable": False,
+        "roles": [
+            {"id": str(guild_id if r == 0 else guild_id * 100 + r), "name": "@everyone" if r == 0 else f"role-{r}",
+             "permissions": "0", "position": r, "color": 0, "hoist": False, "managed": False, "mentionable": False}
+            for r in range(roles)
+        ],
+        "channels": [
+            {"id": str(guild_id * 1000 + c), "type": 0, "name": f"channel-{c}", "position": c,
+             "topic": "Market talk and other things worth a topic line", "permission_overwrites": [], "nsfw": False}
+            for c in range(channels)
+        ],
+        "emojis": [
+            {"id": str(guild_id * 100000 + e), "name": f"emoji_{e}", "roles": [], "require_colons": True,
+             "managed": False, "animated": False, "available": True}
+            for e in range(emojis)
+        ],
+        "members": [{"user": USER, "roles": [], "joined_at": "2024-01-01T00:00:00+00:00", "deaf": False, "mute": False, "flags": 0}],
+        "voice_states": [],
+        "presences": [],
+        "threads": [],
+        "stickers": [],
+    }
+
+
+def message_payload(guild_id, channel_id, message_id):
+    return {
+        "id": str(message_id), "channel_id": str(channel_id), "guild_id": str(guild_id),
+        "author": {"id": "2", "username": "someone", "discriminator": "0", "avatar": None},
+        "member": {"roles": [], "joined_at": "2024-01-01T00:00:00+00:00", "deaf": False, "mute": False, "flags": 0},
+        "content": "what's the index doing today?", "timestamp": "2024-01-01T00:00:00+00:00",
+        "edited_timestamp": None, "tts": False, "mention_everyone": False, "mentions": [],
+        "mention_roles": [], "attachments": [], "embeds": [], "pinned": False, "type": 0,
+    }
+
+
+async def measure(profile, guilds, channels, roles, emojis, messages):
+    import discord
+    from src.client import create_bot
+    from src.memory import rss_bytes
+
+    os.environ["LOW_MEMORY"] = "on" if profile == "low_memory" else "off"
+    # Entering the client sets up its loop-bound state without connecting
+    async with create_bot() as bot:
+        state = bot._connection
+        state.user = discord.ClientUser(state=state, data=USER)
+
+        gc.collect()
+        before = rss_bytes()
+
+        for i in range(guilds):
+            guild_id = 200000000000000000 + i
+            guild = state._add_guild_from_data(guild_payload(guild_id, channels, roles, emojis))
+            assert guild.me is not None
+            # Message events only arrive at all when the intent is on
+            if state._intents.guild_messages:
+                for m in range(messages):
+                    state.parse_message_create(message_payload(guild_id, guild_id * 1000, guild_id * 10 + m))
+
+        gc.collect()
+        after = rss_bytes()
+        return {
+            "profile": profile,
+            "guilds": guilds,
+            "intents": state._intents.value,
+            "cached_messages": len(state._messages or ()),
+            "rss_mib": after / (1024 * 1024),
+            "mib_per_1000_guilds": (after - before) / (1024 * 1024) / guilds * 1000,
+        }
+
+
+def run_profile(profile, args):
+    """
+    Run one profile in a fresh interpreter so the numbers don't share a heap.
+    """
+    command = [
+        sys.executable, "-m", "benchmarks.bench_memory", "--worker", profile,
+        "--guilds", str(args.guilds), "--channels", str(args.channels), "--roles", str(args.roles),
+        "--emojis", str(args.emojis), "--messages", str(args.messages),
+    ]
+    result = subprocess.run(command, cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"{profile} run failed:\n{result.stderr[-2000:]}")
+    return json.loads(result.stdout)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--guilds", type=int, default=5000, help="synthetic guilds (default: 5000)")
+    parser.add_argument("--channels", type=int, default=15, help="channels per guild (default: 15)")
+    parser.add_argument("--roles", type=int, default=10, help="roles per guild (default: 10)")
+    parser.add_argument("--emojis", type=int, default=10, help="emojis per guild (default: 10)")
+    parser.add_argument("--messages", type=int, default=2, help="messages seen per guild (default: 2)")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    parser.add_argument("--worker", choices=PROFILES, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        result = asyncio.run(measure(args.worker, args.guilds, args.channels, args.roles, args.emojis, args.messages))
+        print(json.dumps(result))
+        return
+
+    results = [run_profile(profile, args) for profile in PROFILES]
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{args.guilds} guilds, {args.channels} channels / {args.roles} roles / {args.emojis} emojis each")
+    for result in results:
+        print(
+            f"  {result['profile']:<11} {result['mib_per_1000_guilds']:6.2f} MiB per 1000 guilds  "
+            f"(RSS {result['rss_mib']:.1f} MiB, {result['cached_messages']} cached messages)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+"""
+Offline throughput benchmark for Tychra.
+
+Runs Updater.update_all_guilds, ConfigManager and ChartGenerator against
+local fake upstreams and a fake bot with synthetic guilds, then reports
+ticks/sec, per-guild latency percentiles and peak RSS.
+
+    python -m benchmarks.bench_tychra --guilds 5000 --ticks 5
+    python -m benchmarks.bench_tychra --guilds 2000 --rest-latency-ms 2 --rate-limit 500 --json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import resource
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks.fake_discord import FakeTychra  # noqa: E402
+from benchmarks.fake_upstreams import FakeUpstreams  # noqa: E402
+
+TEMPLATES = (
+    ("F/G: {m.index}", "{m.emotion} {m.emoji}"),
+    ("C: {c.index} {c.emoji}", "{c.emotion} {c.trend}"),
+    ("S:{m.index} C:{c.index}", "📈{m.emoji}{m.index} | 💰{c.emoji}{c.index}"),
+    ("{m.emoji}{m.index} {c.emoji}{c.index}", "Market:{m.trend} Crypto:{c.trend}"),
+)
+
+CHART_WINDOWS = (7, 10, 30, 90, 365)
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def peak_rss_mib():
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def point_at_fakes(upstreams):
+    """
+    Redirect provider, chart and QuickChart URLs to the local fakes.
+    """
+    from providers import CryptoProvider, MarketProvider
+    from src.chart_generator import ChartGenerator
+
+    MarketProvider.URL = f"{upstreams.base_url}/index/fearandgreed/graphdata"
+    CryptoProvider.URL = f"{upstreams.base_url}/fng/"
+    ChartGenerator.MARKET_API_URL = MarketProvider.URL
+    ChartGenerator.CRYPTO_API_URL = f"{upstreams.base_url}/fng/?limit={{days}}"
+    ChartGenerator.QUICKCHART_SCHEME = "http"
+    ChartGenerator.QUICKCHART_HOST = f"127.0.0.1:{upstreams.port}"
+
+
+def write_guild_config(path, guild_ids):
+    configs = {}
+    for i, guild_id in enumerate(guild_ids):
+        nickname, status = TEMPLATES[i % len(TEMPLATES)]
+        configs[str(guild_id)] = {"nickname_template": nickname, "status_template": status, "timezone": "UTC"}
+    with open(path, "w") as f:
+        json.dump(configs, f)
+
+
+async def bench_updates(bot, updater, ticks):
+    latencies = []
+    update_guild = updater.update_guild
+
+    async def timed_update_guild(guild_id, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await update_guild(guild_id, **kwargs)
+        finally:
+            latencies.append(time.perf_counter() - start)
+
+    updater.update_guild = timed_update_guild
+
+    tick_times = []
+    for _ in range(ticks):
+        start = time.perf_counter()
+        await updater.update_all_guilds()
+        tick_times.append(time.perf_counter() - start)
+
+    updater.update_guild = update_guild
+    total = sum(tick_times)
+    return {
+        "ticks": ticks,
+        "guilds": len(bot.guilds),
+        "ticks_per_sec": ticks / total if total else 0.0,
+        "guild_updates_per_sec": len(latencies) / total if total else 0.0,
+        "tick_p50_s": percentile(tick_times, 50),
+        "guild_p50_ms": percentile(latencies, 50) * 1000,
+        "guild_p99_ms": percentile(latencies, 99) * 1000,
+        "nickname_edits": sum(guild.me.edits for guild in bot.guilds),
+        "presence_changes": bot.presence_changes,
+        "simulated_429s": bot.rate_limiter.hits,
+    }
+
+
+def bench_config(config_manager, guild_ids, writes):
+    start = time.perf_counter()
+    for guild_id in guild_ids:
+        config_manager.get_guild_config(guild_id)
+    read_elapsed = time.perf_counter() - start
+
+    write_ids = guild_ids[:writes]
+    start = time.perf_counter()
+    for guild_id in write_ids:
+        config_manager.set_guild_template(guild_id, "status", "{m.emotion} {m.trend}")
+    write_elapsed = time.perf_counter() - start
+
+    return {
+        "reads": len(guild_ids),
+        "read_us": read_elapsed / max(1, len(guild_ids)) * 1e6,
+        "writes": len(write_ids),
+        "write_ms": write_elapsed / max(1, len(write_ids)) * 1000,
+    }
+
+
+async def _request_charts(chart_generator, count):
+    latencies = []
+    failures = 0
+    for i in range(count):
+        provider = "crypto" if i % 2 else "market"
+        days = CHART_WINDOWS[i % len(CHART_WINDOWS)]
+        start = time.perf_counter()
+        url = await chart_generator.generate_chart(days, provider)
+        latencies.append(time.perf_counter() - start)
+        if not url:
+            failures += 1
+    return latencies, failures
+
+
+async def bench_charts(chart_generator_class, count):
+    from src.provider_snapshot import ProviderSnapshot
+
+    # Cold: every request renders (no cache, no pre-warm)
+    cold = chart_generator_class(prewarm_top=0, cache_ttl=0)
+    latencies, failures = await _request_charts(cold, count)
+
+    # Warm: the same requests again after a data update pre-rendered the popular windows
+    warm = chart_generator_class(prewarm_top=len(CHART_WINDOWS) * 2)
+    await _request_charts(warm, count)
+    warm.on_snapshot(ProviderSnapshot({"m": {"index": 50}}, version=1))
+    prewarm_started = time.perf_counter()
+    await warm._prewarm_task
+    prewarm_seconds = time.perf_counter() - prewarm_started
+    warm_latencies, warm_failures = await _request_charts(warm, count)
+
+    return {
+        "charts": count,
+        "failures": failures + warm_failures,
+        "chart_p50_ms": percentile(latencies, 50) * 1000,
+        "chart_p99_ms": percentile(latencies, 99) * 1000,
+        "prewarm_s": prewarm_seconds,
+        "warm_p50_ms": percentile(warm_latencies, 50) * 1000,
+        "warm_p99_ms": percentile(warm_latencies, 99) * 1000,
+    }
+
+
+async def run(args):
+    from src.chart_generator import ChartGenerator
+    from src.config_manager import ConfigManager
+    from src.updater import Updater
+
+    upstreams = FakeUpstreams(history_days=args.history_days, latency_ms=args.upstream_latency_ms).start()
+    point_at_fakes(upstreams)
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            bot = FakeTychra(args.guilds, rest_latency_ms=args.rest_latency_ms, rate_limit=args.rate_limit)
+            guild_ids = [guild.id for guild in bot.guilds]
+
+            config_file = os.path.join(tmp, "guild_config.json")
+            write_guild_config(config_file, guild_ids)
+            config_manager = ConfigManager(config_file)
+            bot.config_manager = config_manager
+
+            updater = Updater(bot, config_manager)
+
+            results = {"updates": await bench_updates(bot, updater, args.ticks)}
+            results["config"] = bench_config(config_manager, guild_ids, args.config_writes)
+            results["charts"] = await bench_charts(ChartGenerator, args.charts)
+            results["upstream_requests"] = dict(upstreams.requests)
+            results["peak_rss_mib"] = peak_rss_mib()
+            return results
+    finally:
+        upstreams.stop()
+
+
+def print_report(results):
+    updates = results["updates"]
+    config = results["config"]
+    charts = results["charts"]
+    print(f"Guild updates ({updates['guilds']} guilds x {updates['ticks']} ticks)")
+    print(f"  ticks/sec            {updates['ticks_per_sec']:.3f}")
+    print(f"  guild updates/sec    {updates['guild_updates_per_sec']:.1f}")
+    print(f"  tick p50             {updates['tick_p50_s']:.3f} s")
+    print(f"  per-guild p50 / p99  {updates['guild_p50_ms']:.3f} / {updates['guild_p99_ms']:.3f} ms")
+    print(f"  nickname edits       {updates['nickname_edits']}  presence changes {updates['presence_changes']}  429s {updates['simulated_429s']}")
+    print("Config store")
+    print(f"  get_guild_config     {config['read_us']:.2f} us/op ({config['reads']} reads)")
+    print(f"  set_guild_template   {config['write_ms']:.3f} ms/op ({config['writes']} writes)")
+    print(f"Charts ({charts['charts']} requests, {charts['failures']} failed)")
+    print(f"  p50 / p99            {charts['chart_p50_ms']:.1f} / {charts['chart_p99_ms']:.1f} ms")
+    print(f"  pre-warmed p50 / p99 {charts['warm_p50_ms']:.3f} / {charts['warm_p99_ms']:.3f} ms (pre-warm took {charts['prewarm_s']:.2f} s)")
+    print(f"Upstream requests      {results['upstream_requests']}")
+    print(f"Peak RSS               {results['peak_rss_mib']:.1f} MiB")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--guilds", type=int, default=2000, help="synthetic guilds (default: 2000)")
+    parser.add_argument("--ticks", type=int, default=3, help="update_all_guilds runs (default: 3)")
+    parser.add_argument("--rest-latency-ms", type=float, default=0.0, help="simulated Discord REST latency")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="simulated REST requests/sec before 429s (0: unlimited)")
+    parser.add_argument("--upstream-latency-ms", type=float, default=0.0, help="simulated CNN/Alternative.me/QuickChart latency")
+    parser.add_argument("--history-days", type=int, default=365, help="history length served by the fake upstreams")
+    parser.add_argument("--config-writes", type=int, default=50, help="set_guild_template calls to time")
+    parser.add_argument("--charts", type=int, default=10, help="chart generations to time")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    parser.add_argument("--log-level", default="WARNING", help="log level while benchmarking (default: WARNING)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=args.log_level.upper(), format="[%(levelname)s] %(name)s: %(message)s")
+    # 429 warnings are expected when --rate-limit is set
+    logging.getLogger("discord.http").setLevel(logging.ERROR)
+
+    results = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_report(results)
+
+
+if __name__ == "__main__":
+    main()
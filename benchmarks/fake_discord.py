@@ -0,0 +1,105 @@
+"""
+A Discord-free stand-in for the Tychra bot.
+
+FakeTychra reuses Tychra's own update_nickname/update_status code, but the
+guild members and presence calls it talks to are local objects that
+simulate REST latency and 429 rate limits.
+"""
+import asyncio
+import logging
+import time
+
+from src.client import TychraMixin
+
+http_logger = logging.getLogger("discord.http")
+
+
+class FakeRateLimiter:
+    """
+    Token bucket standing in for Discord's REST limits. When the bucket is
+    empty the request "gets a 429" and sleeps the retry-after, logged the
+    same way discord.http logs it.
+    """
+
+    def __init__(self, rate=0.0, burst=None):
+        self.rate = rate
+        self.capacity = burst or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.hits = 0
+
+    async def acquire(self, route):
+        if not self.rate:
+            return
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+
+            retry_after = (1 - self.tokens) / self.rate
+            self.hits += 1
+            http_logger.warning(
+                'We are being rate limited. %s %s responded with 429. Retrying in %.2f seconds.',
+                "PATCH", route, retry_after
+            )
+            await asyncio.sleep(retry_after)
+
+
+class FakeMember:
+    __slots__ = ("guild", "nick", "edits")
+
+    def __init__(self, guild):
+        self.guild = guild
+        self.nick = None
+        self.edits = 0
+
+    async def edit(self, nick=None):
+        bot = self.guild.bot
+        await bot.rate_limiter.acquire(f"/guilds/{self.guild.id}/members/@me")
+        if bot.rest_latency:
+            await asyncio.sleep(bot.rest_latency)
+        # Like discord.py, editing the bot's own nickname leaves the cached member as it was
+        self.edits += 1
+
+
+class FakeGuild:
+    __slots__ = ("bot", "id", "name", "shard_id", "me")
+
+    def __init__(self, bot, guild_id):
+        self.bot = bot
+        self.id = guild_id
+        self.name = f"bench-guild-{guild_id}"
+        self.shard_id = 0
+        self.me = FakeMember(self)
+
+
+class FakeTychra(TychraMixin):
+    """
+    Exposes the attributes Updater, UpdateScheduler and CommandsCog use
+    (guilds, get_guild, update_nickname, update_status) without a gateway.
+    """
+
+    def __init__(self, guild_count, rest_latency_ms=0.0, rate_limit=0.0):
+        # TychraMixin.__init__ would build a real discord.py client; skip it
+        self.config_manager = None
+        self.updater = None
+        self.digests = None
+        self._sent_nicknames = {}
+        self.rest_latency = rest_latency_ms / 1000
+        self.rate_limiter = FakeRateLimiter(rate_limit)
+        self.presence_changes = 0
+        self.guilds = [FakeGuild(self, 100000 + i) for i in range(guild_count)]
+        self._guilds_by_id = {guild.id: guild for guild in self.guilds}
+
+    def get_guild(self, guild_id):
+        return self._guilds_by_id.get(guild_id)
+
+    async def change_presence(self, status=None, activity=None, shard_id=None):
+        await self.rate_limiter.acquire("gateway/presence")
+        self.presence_changes += 1
+
+    async def wait_until_ready(self):
+        return None
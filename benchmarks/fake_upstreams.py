@@ -0,0 +1,172 @@
+"""
+Local stand-ins for CNN, Alternative.me and QuickChart.
+
+The server runs on its own event loop in a background thread, so the
+upstreams don't compete with the code under test for the bot's loop.
+"""
+import asyncio
+import math
+import random
+import threading
+import time
+
+from aiohttp import web
+
+CNN_INDICATORS = (
+    "market_momentum_sp500",
+    "market_momentum_sp125",
+    "stock_price_strength",
+    "stock_price_breadth",
+    "put_call_options",
+    "market_volatility_vix",
+    "market_volatility_vix_50",
+    "junk_bond_demand",
+    "safe_haven_demand",
+)
+
+RATINGS = ((25, "extreme fear"), (45, "fear"), (55, "neutral"), (75, "greed"), (101, "extreme greed"))
+
+
+def _rating(score):
+    for high, rating in RATINGS:
+        if score < high:
+            return rating
+    return "extreme greed"
+
+
+class FakeUpstreams:
+    """
+    Serves CNN graphdata, Alternative.me /fng/ and QuickChart /chart endpoints.
+
+    Every request moves the index a little so consecutive ticks render
+    different nicknames, like a live market would.
+    """
+
+    def __init__(self, history_days=365, latency_ms=0.0, seed=1):
+        self.history_days = history_days
+        self.latency = latency_ms / 1000
+        self.requests = {"cnn": 0, "alternative": 0, "quickchart": 0}
+        self._random = random.Random(seed)
+        self._market = 50.0
+        self._crypto = 50.0
+        self._thread = None
+        self._loop = None
+        self._runner = None
+        self._ready = threading.Event()
+        self.port = None
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.port}"
+
+    def _step(self, value):
+        return min(99.0, max(1.0, value + self._random.uniform(-6, 6)))
+
+    async def _delay(self):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    def _series(self, now_ms, center):
+        day_ms = 86400 * 1000
+        return [
+            {
+                "x": now_ms - (self.history_days - i) * day_ms,
+                "y": round(center + 20 * math.sin(i / 9), 2),
+                "rating": _rating(center),
+            }
+            for i in range(self.history_days)
+        ]
+
+    async def _cnn(self, request):
+        await self._delay()
+        self.requests["cnn"] += 1
+        previous, self._market = self._market, self._step(self._market)
+
+        now_ms = int(time.time() * 1000)
+        payload = {
+            "fear_and_greed": {
+                "score": self._market,
+                "rating": _rating(self._market),
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S+00:00", time.gmtime()),
+                "previous_close": previous,
+                "previous_1_week": previous,
+                "previous_1_month": previous,
+                "previous_1_year": previous,
+            },
+            "fear_and_greed_historical": {
+                "timestamp": now_ms,
+                "score": self._market,
+                "rating": _rating(self._market),
+                "data": self._series(now_ms, self._market),
+            },
+        }
+        for i, name in enumerate(CNN_INDICATORS):
+            score = (self._market + 7 * i) % 100
+            payload[name] = {
+                "timestamp": now_ms,
+                "score": score,
+                "rating": _rating(score),
+                "data": self._series(now_ms, score),
+            }
+        return web.json_response(payload)
+
+    async def _alternative(self, request):
+        await self._delay()
+        self.requests["alternative"] += 1
+        self._crypto = self._step(self._crypto)
+
+        limit = int(request.query.get("limit", "1")) or self.history_days
+        now = int(time.time())
+        data = [
+            {
+                "value": str(int(self._crypto if i == 0 else 50 + 20 * math.sin(i / 7))),
+                "value_classification": _rating(self._crypto).title(),
+                "timestamp": str(now - i * 86400),
+            }
+            for i in range(min(limit, self.history_days))
+        ]
+        return web.json_response({"name": "Fear and Greed Index", "data": data, "metadata": {"error": None}})
+
+    async def _quickchart_create(self, request):
+        await request.read()
+        await self._delay()
+        self.requests["quickchart"] += 1
+        return web.json_response({"success": True, "url": f"{self.base_url}/chart/render/{self.requests['quickchart']}"})
+
+    async def _quickchart_render(self, request):
+        await request.read()
+        await self._delay()
+        self.requests["quickchart"] += 1
+        return web.Response(body=b"\x89PNG\r\n\x1a\n" + b"\0" * 1024, content_type="image/png")
+
+    async def _serve(self):
+        app = web.Application(client_max_size=16 * 1024 * 1024)
+        app.router.add_get("/index/fearandgreed/graphdata", self._cnn)
+        app.router.add_get("/fng/", self._alternative)
+        app.router.add_post("/chart/create", self._quickchart_create)
+        app.router.add_post("/chart", self._quickchart_render)
+
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        self._loop.run_until_complete(self._serve())
+        self._ready.set()
+        self._loop.run_forever()
+        self._loop.run_until_complete(self._runner.cleanup())
+        self._loop.close()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="fake-upstreams", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        return self
+
+    def stop(self):
+        if self._loop:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
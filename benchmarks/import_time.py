@@ -0,0 +1,108 @@
+"""
+Startup import-time benchmark with a tracked budget.
+
+Runs `python -X importtime -c "import main"` in fresh interpreters and
+compares the median cumulative import time against
+benchmarks/import_budget.json. It also fails if any module the budget
+lists as deferred (charts, cron, profiler, ...) is imported at startup.
+
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --runs 10 --top 15
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUDGET_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "import_budget.json")
+
+
+def parse_importtime(stderr):
+    """
+    Parse -X importtime output into [(name, depth, self_us, cumulative_us)].
+    """
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        modules.append((name.strip(), depth, int(self_us), int(cumulative_us)))
+    return modules
+
+
+def measure(module, runs):
+    samples = []
+    imported = set()
+    direct = {}
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=ROOT, capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+        modules = parse_importtime(result.stderr)
+        imported.update(name for name, _, _, _ in modules)
+
+        # importtime prints children before their parent, so the depth-1
+        # entries right before `module`'s own line are its direct imports
+        children = []
+        for name, depth, _, cumulative in modules:
+            if depth == 1:
+                children.append((name, cumulative))
+            elif depth == 0:
+                if name == module:
+                    samples.append(cumulative / 1000)
+                    for child, child_cumulative in children:
+                        direct.setdefault(child, []).append(child_cumulative / 1000)
+                children = []
+
+    direct_medians = {name: statistics.median(times) for name, times in direct.items()}
+    return statistics.median(samples), imported, direct_medians
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters to sample (default: 5)")
+    parser.add_argument("--top", type=int, default=10, help="direct imports to list (default: 10)")
+    parser.add_argument("--budget", default=BUDGET_FILE, help="budget file")
+    args = parser.parse_args(argv)
+
+    with open(args.budget) as f:
+        budget = json.load(f)
+
+    module = budget.get("module", "main")
+    total_ms, imported, direct = measure(module, args.runs)
+
+    print(f"import {module}: {total_ms:.1f} ms median over {args.runs} runs (budget {budget['total_ms']} ms)")
+    print("Slowest direct imports:")
+    for name, ms in sorted(direct.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"  {ms:8.1f} ms  {name}")
+
+    failures = []
+    if total_ms > budget["total_ms"]:
+        failures.append(f"import time {total_ms:.1f} ms exceeds budget of {budget['total_ms']} ms")
+
+    eager = sorted(
+        name for name in budget.get("deferred", [])
+        if name in imported
+    )
+    if eager:
+        failures.append(f"deferred modules imported at startup: {', '.join(eager)}")
+
+    if failures:
+        for failure in failures:
+            print(f"FAIL: {failure}")
+        return 1
+
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
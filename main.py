@@ -1,54 +1,125 @@
 import asyncio
 import logging
-import logging.handlers
 import os
 import sys
 from dotenv import load_dotenv
 from src.client import create_bot
 from src.config_manager import ConfigManager
 from src.commands import setup_commands
-from src.updater import Updater
+from src.updater import Updater, UpdaterGroup
+from src.alerts import AlertEngine
 from src.scheduler import UpdateScheduler
-from src.chart_generator import ChartGenerator
+from src.sharding import ShardingConfig
+from src.startup import StartupCoordinator
+from src.update_queue import GuildUpdateQueue
+from src.snapshot_cache import create_snapshot_cache
+from src.http_pool import HttpPool
+from src.identities import load_identities
+from src.provider_hub import ProviderHub
+from src.cadence import CadenceEngine
+from src.logging_setup import setup_logging, stop_logging
+from src.memory import rss_bytes
+from src.metrics import CONFIG_GUILDS, PROCESS_RESIDENT_MEMORY_BYTES, create_metrics_server, install_ratelimit_observer
+from src.profiler import PROFILER
+from src.backends import describe_backends, run, select_loop_backend
 
 load_dotenv()
 
-async def run_bot(logger):
+async def run_bot(logger, sharding=None, shard_ids=None, shared_config=False, process_index=0):
 
     logger.info("🌙 Summoning Tychra...")
 
-    token = os.getenv("DISCORD_TOKEN")
-    if not token:
-        logger.error("DISCORD_TOKEN environment variable not set")
+    try:
+        identities = load_identities()
+    except ValueError as e:
+        logger.error(str(e))
         sys.exit(1)
 
-    bot = create_bot()
-    config_manager = ConfigManager()
-    bot.config_manager = config_manager
-
-    updater = Updater(bot, config_manager)
-    scheduler = UpdateScheduler(bot, config_manager, updater)
-    chart_generator = ChartGenerator()
-
-    @bot.event
-    async def on_ready():
-        await setup_commands(bot, config_manager, chart_generator)
-        logger.info(f"🧘🏻‍♀️ Whispering to the gods of chance! Logged in as {bot.user}")
-
-        logger.info("Running initial update for all guilds...")
+    install_ratelimit_observer()
+    PROCESS_RESIDENT_MEMORY_BYTES.set_function(rss_bytes)
+    PROFILER.configure_from_env()
+    metrics_server = create_metrics_server(port_offset=process_index)
+    if metrics_server:
         try:
-            #updater = Updater(bot, config_manager)
-            results = await updater.update_all_guilds()
-            successful = sum(1 for success in results.values() if success)
-            total = len(results)
-            logger.info(f"Initial update complete: {successful}/{total} guilds updated successfully")
-
-            scheduler.start()
-        except Exception as e:
-            logger.error(f"Error during initial update: {e}")
+            await metrics_server.start()
+        except OSError as e:
+            logger.error(f"⛔ Could not start metrics endpoint: {e}")
+            metrics_server = None
+
+    # Shared by every identity: one upstream fetch per wave, one connection pool, one chart lock
+    http_pool = HttpPool()
+    hub = ProviderHub(snapshot_cache=create_snapshot_cache(), http_pool=http_pool, cadence=CadenceEngine.from_env())
+    from src.chart_generator import ChartGenerator
+    chart_generator = ChartGenerator(http_pool=http_pool)
+    hub.add_listener(chart_generator.on_snapshot)
+
+    api_server = None
+    if os.getenv("API_PORT", "").strip():
+        from src.api import create_api_server
+        api_server = create_api_server(hub, chart_generator, port_offset=process_index)
+    if api_server:
+        try:
+            await api_server.start()
+            hub.add_listener(api_server.on_snapshot)
+        except OSError as e:
+            logger.error(f"⛔ Could not start API: {e}")
+            api_server = None
+
+    if sharding and sharding.enabled:
+        shard_ids = shard_ids if shard_ids is not None else sharding.shard_ids
+        logger.info(f"Sharding enabled (shards: {shard_ids or 'auto'}, count: {sharding.shard_count or 'auto'})")
+
+    bots = []
+    updaters = []
+    update_queues = []
+    startups = []
+    for identity in identities:
+        if sharding and sharding.enabled:
+            bot = create_bot(sharded=True, shard_ids=shard_ids, shard_count=sharding.shard_count)
+        else:
+            bot = create_bot()
+
+        config_manager = ConfigManager(identity.config_file, shared=shared_config, defaults=identity.defaults)
+        bot.config_manager = config_manager
+
+        updater = Updater(bot, config_manager, hub=hub)
+        bot.updater = updater
+        # JSON providers are polled only while some guild's templates use them
+        hub.add_reference_source(config_manager.referenced_providers)
+        update_queue = GuildUpdateQueue(updater)
+        alert_engine = AlertEngine(bot, config_manager, updater.work_scheduler)
+        bot.alert_engine = alert_engine
+        hub.add_listener(alert_engine.on_snapshot)
+        bots.append(bot)
+        updaters.append(updater)
+        update_queues.append(update_queue)
+        startups.append(_register_on_ready(logger, bot, config_manager, chart_generator, updater, update_queue, alert_engine))
+
+    config_managers = [updater.config_manager for updater in updaters]
+    CONFIG_GUILDS.set_function(lambda: sum(len(manager.configs) for manager in config_managers))
+
+    # One scheduler for all identities
+    if len(updaters) == 1:
+        scheduler = UpdateScheduler(bots[0], config_managers[0], updaters[0])
+    else:
+        logger.info(f"Running {len(identities)} identities: {', '.join(identity.name for identity in identities)}")
+        scheduler = UpdateScheduler(bots[0], None, UpdaterGroup(updaters, hub))
+    for startup in startups:
+        startup.scheduler = scheduler
+
+    # Digests render each chart once for every identity's subscribers
+    digests = None
+    if os.getenv("DIGEST_CRON", "0 9 * * *").strip():
+        from src.digest import DigestBroadcaster
+        digests = DigestBroadcaster(updaters, chart_generator, hub)
+        for bot in bots:
+            bot.digests = digests
+        digests.start()
+    else:
+        logger.info("DIGEST_CRON is empty, digests disabled")
 
     try:
-        await bot.start(token)
+        await asyncio.gather(*(bot.start(identity.token) for bot, identity in zip(bots, identities)))
     except KeyboardInterrupt:
         logger.info("😴 Tychra closes her eyes to the market...")
     except Exception as e:
@@ -56,39 +127,101 @@ async def run_bot(logger):
         sys.exit(1)
     finally:
         scheduler.stop()
-        await bot.close()
+        if digests:
+            digests.stop()
+        for update_queue in update_queues:
+            await update_queue.close()
+        for bot in bots:
+            await bot.alert_engine.close()
+        if api_server:
+            await api_server.stop()
+        await chart_generator.close()
+        if metrics_server:
+            await metrics_server.stop()
+        for bot in bots:
+            await bot.close()
+        await http_pool.close()
+
+
+def _register_on_ready(logger, bot, config_manager, chart_generator, updater, update_queue, alert_engine):
+    # The scheduler is shared, so it is attached once every identity is built
+    startup = StartupCoordinator(updater, None)
 
+    @bot.event
+    async def on_ready():
+        await setup_commands(bot, config_manager, chart_generator, updater, update_queue, alert_engine)
+        logger.info(f"🧘🏻‍♀️ Whispering to the gods of chance! Logged in as {bot.user}")
 
-def main():
+        await startup.on_ready()
 
-    # for more info on setting up logging,
-    # see https://discordpy.readthedocs.io/en/latest/logging.html and https://docs.python.org/3/howto/logging.html
+    return startup
 
-    root_logger = logging.getLogger()
-    root_logger.setLevel(logging.INFO)
 
-    dt_fmt = '%Y-%m-%d %H:%M:%S'
-    formatter = logging.Formatter('[{asctime}] [{levelname:<8}] {name}: {message}', dt_fmt, style='{')
+def _run_shard_process(sharding, shard_ids, process_index):
+    # Each worker gets its own log file so RotatingFileHandler doesn't race on rotation
+    setup_logging(log_file=f'discord.shard-{shard_ids[0]}-{shard_ids[-1]}.log')
+    logger = logging.getLogger(__name__)
 
-    # Console handler for logging
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setFormatter(formatter)
-    root_logger.addHandler(console_handler)
+    loop_backend = select_loop_backend()
+    logger.info(f"⚙️ Backends: {describe_backends(loop_backend)}")
+    try:
+        run(run_bot(logger, sharding, shard_ids=shard_ids, shared_config=True, process_index=process_index), loop_backend)
+    except KeyboardInterrupt:
+        logger.info(f"Shard process {shard_ids} stopped by user")
+    finally:
+        # multiprocessing children skip atexit, so flush queued records here
+        stop_logging()
+
+
+def run_shard_processes(sharding, logger):
+    """
+    Run each shard range in its own process. Provider data is shared
+    through the snapshot cache file, guild config through a locked merge.
+    """
+    import multiprocessing
+
+    os.environ.setdefault("SNAPSHOT_CACHE_FILE", "provider_snapshot.json")
+
+    processes = []
+    for process_index, shard_ids in enumerate(sharding.process_ranges()):
+        process = multiprocessing.Process(
+            target=_run_shard_process,
+            args=(sharding, shard_ids, process_index),
+            name=f"tychra-shards-{shard_ids[0]}-{shard_ids[-1]}"
+        )
+        process.start()
+        logger.info(f"Started {process.name} (pid {process.pid}) for shards {shard_ids}")
+        processes.append(process)
+
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        logger.info("Stopping shard processes...")
+        for process in processes:
+            process.terminate()
+            process.join()
 
-    # File handler for logging
-    file_handler = logging.handlers.RotatingFileHandler(
-        filename='discord.log',
-        encoding='utf-8',
-        maxBytes=32 * 1024 * 1024,  # 32 MiB
-        backupCount=5,  # Rotate through 5 files
-    )
-    file_handler.setFormatter(formatter)
-    root_logger.addHandler(file_handler)
 
+def main():
+
+    setup_logging()
     logger = logging.getLogger(__name__)
 
     try:
-        asyncio.run(run_bot(logger))
+        sharding = ShardingConfig()
+    except ValueError as e:
+        logger.error(f"Invalid sharding configuration: {e}")
+        sys.exit(1)
+
+    if sharding.enabled and sharding.processes > 1:
+        run_shard_processes(sharding, logger)
+        return
+
+    loop_backend = select_loop_backend()
+    logger.info(f"⚙️ Backends: {describe_backends(loop_backend)}")
+    try:
+        run(run_bot(logger, sharding), loop_backend)
     except KeyboardInterrupt:
         logger.info("Bot stopped by user")
         sys.exit(0)
@@ -1,6 +1,11 @@
 import aiohttp
 import logging
 
+from src.backends import loads
+
+from .emotion import EMOTION_MAP, emotion_for
+from .rolling import RollingStats
+
 logger = logging.getLogger(__name__)
 
 class CryptoProvider():
@@ -10,13 +15,10 @@ class CryptoProvider():
 
     URL = "https://api.alternative.me/fng/"
 
-    EMOTION_MAP = {
-        (0, 25): ("Extreme Fear", "😱"),
-        (25, 45): ("Fear", "😨"),
-        (45, 55): ("Neutral", "😐"),
-        (55, 75): ("Greed", "😊"),
-        (75, 101): ("Extreme Greed", "🤑")
-    }
+    EMOTION_MAP = EMOTION_MAP
+
+    def __init__(self):
+        self.stats = RollingStats()
 
     @property
     def name(self):
@@ -35,15 +37,16 @@ class CryptoProvider():
         return keys
 
     def get_available_keys(self):
-        return {"index", "emotion", "emoji", "trend", "timestamp"}
+        return {"index", "emotion", "emoji", "trend", "timestamp"} | RollingStats.available_keys()
 
     def _get_emotion_and_emoji(self, index_value: int):
-        for (low, high), (emotion, emoji) in self.EMOTION_MAP.items():
-            if low <= index_value < high:
-                return emotion, emoji
-        return "Unknown", "❓"
+        return emotion_for(index_value, self.EMOTION_MAP)
 
-    async def fetch(self):
+    async def fetch(self, session=None):
+        """
+        Fetch and parse the index. Uses the given aiohttp session if any,
+        otherwise a short-lived one.
+        """
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             'Accept': 'application/json, text/plain, */*',
@@ -51,18 +54,25 @@ class CryptoProvider():
         }
 
         try:
-            async with aiohttp.ClientSession(headers=headers) as session:
-                async with session.get(self.URL, timeout=10) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return await self._parse_alternative_response(data)
-                    else:
-                        logger.warning(f"Crypto Fear & Greed API returned status {response.status}")
-                        return self._get_default_values()
+            if session is None:
+                async with aiohttp.ClientSession() as own_session:
+                    return await self._fetch_with(own_session, headers)
+            return await self._fetch_with(session, headers)
         except Exception as e:
             logger.error(f"Error fetching Crypto Fear & Greed Index: {e}")
             return self._get_default_values()
 
+    async def _fetch_with(self, session, headers):
+        # The first fetch asks for enough history to seed the rolling stats
+        params = None if self.stats else {"limit": str(self.stats.capacity)}
+        async with session.get(self.URL, headers=headers, params=params, timeout=10) as response:
+            if response.status == 200:
+                data = loads(await response.read())
+                return await self._parse_alternative_response(data)
+            else:
+                logger.warning(f"Crypto Fear & Greed API returned status {response.status}")
+                return self._get_default_values()
+
     def _get_default_values(self):
         return {
             "index": 50,
@@ -72,6 +82,17 @@ class CryptoProvider():
             "timestamp": None
         }
 
+    def _update_stats(self, readings):
+        """
+        Readings are newest first; all of them seed the stats on first use.
+        """
+        if not self.stats:
+            self.stats.seed(
+                (int(reading["timestamp"]) // 86400, reading["value"]) for reading in reversed(readings)
+            )
+        current = readings[0]
+        self.stats.update(int(current["timestamp"]) // 86400, current["value"])
+
     async def _parse_alternative_response(self, data: dict):
         try:
             # Alternative.me API structure: data[0] contains latest reading
@@ -89,12 +110,15 @@ class CryptoProvider():
                     elif index_value < previous_value:
                         trend = "↘️ falling"
 
+                self._update_stats(data["data"])
+
                 return {
                     "index": index_value,
                     "emotion": emotion,
                     "emoji": emoji,
                     "trend": trend,
-                    "timestamp": current.get("timestamp")
+                    "timestamp": current.get("timestamp"),
+                    **self.stats.keys()
                 }
         except (KeyError, ValueError, TypeError) as e:
             logger.error(f"Error parsing Crypto Fear & Greed data: {e}")
@@ -0,0 +1,18 @@
+# Fear & Greed score buckets shared by every provider: (low, high) -> (emotion, emoji)
+EMOTION_MAP = {
+    (0, 25): ("Extreme Fear", "😱"),
+    (25, 45): ("Fear", "😨"),
+    (45, 55): ("Neutral", "😐"),
+    (55, 75): ("Greed", "😊"),
+    (75, 101): ("Extreme Greed", "🤑")
+}
+
+
+def emotion_for(value, emotion_map=EMOTION_MAP):
+    """
+    (emotion, emoji) for a 0-100 score, ("Unknown", "❓") outside the map.
+    """
+    for (low, high), (emotion, emoji) in emotion_map.items():
+        if low <= value < high:
+            return emotion, emoji
+    return "Unknown", "❓"
@@ -0,0 +1,241 @@
+import asyncio
+import functools
+import logging
+import os
+import re
+import time
+
+import aiohttp
+
+from src.backends import loads
+
+from .emotion import emotion_for
+
+logger = logging.getLogger(__name__)
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'application/json, text/plain, */*',
+    'Accept-Language': 'en-US,en;q=0.9'
+}
+# Built-in provider names a configured provider can't take
+RESERVED_NAMES = {"m", "c"}
+
+# One path step: a name (dotted after the first), [index] or ["quoted key"]
+_PATH_STEP = re.compile(r'(?P<dot>\.)?(?P<name>[A-Za-z_][\w-]*)|\[(?P<index>-?\d+)\]|\["(?P<key>[^"]*)"\]')
+
+
+@functools.lru_cache(maxsize=1024)
+def compile_path(expression):
+    """
+    Compile a path like "data[0].value" or "fear_and_greed.score" into a
+    tuple of keys and indexes, parsed once however many providers use it.
+    """
+    path = expression.strip().removeprefix("$").removeprefix(".")
+    steps = []
+    pos = 0
+    while pos < len(path):
+        match = _PATH_STEP.match(path, pos)
+        # Names after the first step need their dot
+        if not match or (match["name"] and bool(match["dot"]) != (pos > 0)):
+            raise ValueError(f"Invalid path '{expression}' at position {pos}")
+        if match["name"]:
+            steps.append(match["name"])
+        elif match["index"] is not None:
+            steps.append(int(match["index"]))
+        else:
+            steps.append(match["key"])
+        pos = match.end()
+    if not steps:
+        raise ValueError(f"Empty path '{expression}'")
+    return tuple(steps)
+
+
+def extract(document, steps):
+    """
+    Follow compiled steps into a decoded JSON document. Raises KeyError,
+    IndexError or TypeError when the document doesn't have that shape.
+    """
+    for step in steps:
+        document = document[step]
+    return document
+
+
+class JsonEndpointProvider():
+    """
+    A provider defined by configuration instead of code: a JSON URL and
+    path expressions mapping fields of the response to template keys.
+
+    `emotion_key` names a numeric key to bucket into {x.emotion} and
+    {x.emoji} like the built-in indexes. Without a mapped `timestamp`,
+    it is the time the extracted values last changed.
+    """
+
+    def __init__(self, name, url, fields, emotion_key=None, headers=None):
+        if not re.fullmatch(r'[a-z]\w*', name) or name in RESERVED_NAMES:
+            raise ValueError(f"Invalid provider name '{name}'")
+        if not fields:
+            raise ValueError(f"Provider '{name}' has no fields")
+        if emotion_key and emotion_key not in fields:
+            raise ValueError(f"Emotion key '{emotion_key}' is not one of the fields of '{name}'")
+        self._name = name
+        self.url = url
+        self.fields = dict(fields)
+        self.emotion_key = emotion_key
+        self.headers = {**HEADERS, **(headers or {})}
+        self._steps = {key: compile_path(path) for key, path in self.fields.items()}
+        self._last_values = None
+        self._changed_at = None
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def endpoint(self):
+        """
+        Providers with the same endpoint share one request.
+        """
+        return self.url, tuple(sorted(self.headers.items()))
+
+    def required_keys(self, template = ""):
+        return {key for key in self.get_available_keys() if f"{self.name}.{key}" in template}
+
+    def get_available_keys(self):
+        keys = set(self.fields) | {"timestamp"}
+        if self.emotion_key:
+            keys.update(("emotion", "emoji"))
+        return keys
+
+    def _get_default_values(self):
+        values = {"timestamp": None}
+        if self.emotion_key:
+            values.update(emotion="Unknown", emoji="❓")
+        return values
+
+    def parse(self, document):
+        """
+        Template values from a decoded response; fields missing from it are left out.
+        """
+        values = {}
+        for key, steps in self._steps.items():
+            try:
+                values[key] = extract(document, steps)
+            except (KeyError, IndexError, TypeError):
+                logger.warning(f"{self.name}: no '{self.fields[key]}' in the response from {self.url}")
+        if not values:
+            return self._get_default_values()
+
+        if self.emotion_key:
+            try:
+                values["emotion"], values["emoji"] = emotion_for(float(values[self.emotion_key]))
+            except (KeyError, ValueError, TypeError):
+                values["emotion"], values["emoji"] = "Unknown", "❓"
+
+        if "timestamp" not in self.fields:
+            # Unchanged values keep their timestamp, so the snapshot stays unchanged too
+            if values != self._last_values:
+                self._last_values = dict(values)
+                self._changed_at = int(time.time())
+            values["timestamp"] = self._changed_at
+        return values
+
+    async def fetch(self, session=None):
+        """
+        Fetch and parse this provider alone; the hub uses fetch_endpoints.
+        """
+        return (await fetch_endpoints([self], session=session))[self.name]
+
+
+async def _get_document(session, url, headers):
+    async with session.get(url, headers=headers, timeout=10) as response:
+        if response.status != 200:
+            logger.warning(f"{url} returned status {response.status}")
+            return None
+        return loads(await response.read())
+
+
+async def fetch_endpoints(providers, session=None):
+    """
+    Fetch every distinct endpoint once, concurrently, and parse the
+    response for each provider using it. Returns {name: values}.
+    """
+    groups = {}
+    for provider in providers:
+        groups.setdefault(provider.endpoint, []).append(provider)
+
+    async def fetch_group(session, members):
+        url, headers = members[0].url, members[0].headers
+        try:
+            document = await _get_document(session, url, headers)
+        except Exception as e:
+            logger.error(f"Error fetching {url}: {e}")
+            document = None
+        results = {}
+        for provider in members:
+            if document is None:
+                results[provider.name] = provider._get_default_values()
+                continue
+            try:
+                results[provider.name] = provider.parse(document)
+            except Exception as e:
+                logger.error(f"Error parsing {provider.name} data: {e}")
+                results[provider.name] = provider._get_default_values()
+        return results
+
+    async def fetch_all(session):
+        return await asyncio.gather(*(fetch_group(session, members) for members in groups.values()))
+
+    if session is None:
+        async with aiohttp.ClientSession() as own_session:
+            grouped = await fetch_all(own_session)
+    else:
+        grouped = await fetch_all(session)
+
+    logger.debug("Fetched %d JSON provider(s) with %d request(s)", len(providers), len(groups))
+    return {name: values for results in grouped for name, values in results.items()}
+
+
+def _parse_pairs(value, separator, assign):
+    pairs = {}
+    for item in value.split(separator):
+        if not item.strip():
+            continue
+        key, found, rest = item.partition(assign)
+        if not found:
+            raise ValueError(f"Expected 'key{assign}value', got '{item.strip()}'")
+        pairs[key.strip()] = rest.strip()
+    return pairs
+
+
+def load_json_providers():
+    """
+    JsonEndpointProviders configured in the environment. Invalid ones are skipped with a warning.
+
+    JSON_PROVIDERS                  - provider names, e.g. gold,btcd
+    JSON_PROVIDER_<NAME>_URL        - the JSON endpoint
+    JSON_PROVIDER_<NAME>_FIELDS     - key=path pairs, e.g. index=data[0].value,updated=data[0].timestamp
+    JSON_PROVIDER_<NAME>_EMOTION    - a numeric key to map to {name.emotion} / {name.emoji}
+    JSON_PROVIDER_<NAME>_HEADERS    - extra request headers, e.g. X-Api-Key: abc;Accept: application/json
+    """
+    providers = {}
+    for name in os.getenv("JSON_PROVIDERS", "").split(","):
+        name = name.strip().lower()
+        if not name:
+            continue
+        prefix = f"JSON_PROVIDER_{name.upper()}_"
+        url = os.getenv(f"{prefix}URL", "").strip()
+        if not url:
+            logger.warning(f"JSON provider '{name}' has no {prefix}URL, skipping")
+            continue
+        try:
+            providers[name] = JsonEndpointProvider(
+                name,
+                url,
+                _parse_pairs(os.getenv(f"{prefix}FIELDS", ""), ",", "="),
+                emotion_key=os.getenv(f"{prefix}EMOTION", "").strip() or None,
+                headers=_parse_pairs(os.getenv(f"{prefix}HEADERS", ""), ";", ":"),
+            )
+        except ValueError as e:
+            logger.warning(f"Invalid JSON provider '{name}': {e}, skipping")
+    return providers
@@ -1,5 +1,12 @@
 import aiohttp
 import logging
+import time
+from datetime import datetime
+
+from src.backends import loads
+
+from .emotion import EMOTION_MAP, emotion_for
+from .rolling import RollingStats
 
 logger = logging.getLogger(__name__)
 
@@ -11,14 +18,24 @@ class MarketProvider():
     
     URL = "https://production.dataviz.cnn.io/index/fearandgreed/graphdata"
 
-    EMOTION_MAP = {
-        (0, 25): ("Extreme Fear", "😱"),
-        (25, 45): ("Fear", "😨"),
-        (45, 55): ("Neutral", "😐"),
-        (55, 75): ("Greed", "😊"),
-        (75, 101): ("Extreme Greed", "🤑")
+    EMOTION_MAP = EMOTION_MAP
+
+    # CNN component indicators in the same graphdata payload: key -> (template alias, label)
+    INDICATORS = {
+        "market_momentum_sp500": ("momentum", "S&P 500 Momentum"),
+        "market_momentum_sp125": ("momentum125", "S&P 500 Momentum (125-day)"),
+        "stock_price_strength": ("strength", "Stock Price Strength"),
+        "stock_price_breadth": ("breadth", "Stock Price Breadth"),
+        "put_call_options": ("putcall", "Put/Call Options"),
+        "market_volatility_vix": ("vix", "Market Volatility (VIX)"),
+        "market_volatility_vix_50": ("vix50", "Market Volatility (VIX 50-day)"),
+        "junk_bond_demand": ("junk", "Junk Bond Demand"),
+        "safe_haven_demand": ("safehaven", "Safe Haven Demand"),
     }
 
+    def __init__(self):
+        self.stats = RollingStats()
+
     @property
     def name(self):
         return "m"
@@ -36,15 +53,20 @@ class MarketProvider():
         return keys
 
     def get_available_keys(self):
-        return {"index", "emotion", "emoji", "trend", "timestamp"}
+        keys = {"index", "emotion", "emoji", "trend", "timestamp"}
+        for alias, _ in self.INDICATORS.values():
+            keys.update((alias, f"{alias}_rating", f"{alias}_value"))
+        keys.update(RollingStats.available_keys())
+        return keys
 
     def _get_emotion_and_emoji(self, index_value: int):
-        for (low, high), (emotion, emoji) in self.EMOTION_MAP.items():
-            if low <= index_value < high:
-                return emotion, emoji
-        return "Unknown", "❓"
+        return emotion_for(index_value, self.EMOTION_MAP)
 
-    async def fetch(self):
+    async def fetch(self, session=None):
+        """
+        Fetch and parse the index. Uses the given aiohttp session if any,
+        otherwise a short-lived one.
+        """
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             'Accept': 'application/json, text/plain, */*',
@@ -54,18 +76,63 @@ class MarketProvider():
         }
         
         try:
-            async with aiohttp.ClientSession(headers=headers) as session:
-                async with session.get(self.URL, timeout=10) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return await self._parse_cnn_response(data)
-                    else:
-                        logger.warning(f"CNN API returned status {response.status}")
-                        return self._get_default_values()
+            if session is None:
+                async with aiohttp.ClientSession() as own_session:
+                    return await self._fetch_with(own_session, headers)
+            return await self._fetch_with(session, headers)
         except Exception as e:
             logger.error(f"Error fetching Fear & Greed Index: {e}")
             return self._get_default_values()
     
+    async def _fetch_with(self, session, headers):
+        async with session.get(self.URL, headers=headers, timeout=10) as response:
+            if response.status == 200:
+                data = loads(await response.read())
+                return await self._parse_cnn_response(data)
+            else:
+                logger.warning(f"CNN API returned status {response.status}")
+                return self._get_default_values()
+
+    def _update_stats(self, data, current):
+        """
+        Seed the rolling stats from the history in the payload on first use,
+        then add today's reading.
+        """
+        if not self.stats:
+            history = data.get("fear_and_greed_historical", {}).get("data", [])
+            self.stats.seed(
+                (int(point["x"] // 86400000), point["y"]) for point in history[-self.stats.capacity:]
+                if isinstance(point.get("x"), (int, float))
+            )
+
+        try:
+            day = int(datetime.fromisoformat(current["timestamp"]).timestamp() // 86400)
+        except (KeyError, TypeError, ValueError):
+            day = int(time.time() // 86400)
+        self.stats.update(day, current.get("score", 50))
+
+    def _parse_indicators(self, data, result):
+        """
+        Add each component indicator from the payload we already have:
+        {alias} score (0-100), {alias}_rating and {alias}_value, the latest
+        raw reading (e.g. the put/call ratio or the VIX level).
+        """
+        for source, (alias, _) in self.INDICATORS.items():
+            component = data.get(source)
+            if not isinstance(component, dict):
+                continue
+            try:
+                result[alias] = int(round(float(component["score"])))
+            except (KeyError, ValueError, TypeError):
+                continue
+            result[f"{alias}_rating"] = str(component.get("rating", "")).title()
+            series = component.get("data") or []
+            if series:
+                try:
+                    result[f"{alias}_value"] = round(float(series[-1]["y"]), 2)
+                except (KeyError, ValueError, TypeError):
+                    pass
+
     def _get_default_values(self):
         """Return default values when API fails."""
         return {
@@ -92,13 +159,17 @@ class MarketProvider():
             else:
                 trend = "→ stable"
 
-            return {
+            result = {
                 "index": index_value,
                 "emotion": emotion,
                 "emoji": emoji,
                 "trend": trend,
                 "timestamp": current.get("timestamp")
             }
+            self._parse_indicators(data, result)
+            self._update_stats(data, current)
+            result.update(self.stats.keys())
+            return result
         except (KeyError, ValueError, TypeError) as e:
             logger.error(f"Error parsing Fear & Greed data: {e}")
             return self._get_default_values()
@@ -0,0 +1,120 @@
+from collections import deque
+
+SPARK_BLOCKS = "▁▂▃▄▅▆▇█"
+
+
+def _signed(value):
+    return f"{value:+d}"
+
+
+class RollingStats:
+    """
+    Ring buffer of one reading per day with running window sums.
+
+    update() is called once per provider fetch: a reading for the same
+    day replaces that day's value, a new day pushes the oldest out, and
+    the window sums are adjusted by the difference instead of re-added.
+    keys() is rebuilt once per fetch, so templates read precomputed
+    values and a new key costs nothing per guild.
+    """
+
+    AVG_WINDOWS = (7, 30)
+    RANGE_WINDOWS = (7, 30)
+    CHANGE_WINDOWS = (1, 7)
+    PERCENTILE_WINDOW = 90
+    SPARK_WINDOWS = (7, 30)
+
+    def __init__(self, capacity=90):
+        self.capacity = max(capacity, self.PERCENTILE_WINDOW, *self.AVG_WINDOWS)
+        self._days = deque(maxlen=self.capacity)
+        self._values = deque(maxlen=self.capacity)
+        self._sums = {window: 0.0 for window in self.AVG_WINDOWS}
+        self._keys = {}
+
+    def __len__(self):
+        return len(self._values)
+
+    def seed(self, readings):
+        """
+        Fill from history: (day, value) pairs, oldest first.
+        """
+        for day, value in readings:
+            self._push(day, value)
+        self._keys = self._compute_keys()
+
+    def update(self, day, value):
+        self._push(day, value)
+        self._keys = self._compute_keys()
+
+    def _push(self, day, value):
+        value = float(value)
+        values = self._values
+
+        if self._days and day < self._days[-1]:
+            return
+        if self._days and self._days[-1] == day:
+            old = values[-1]
+            values[-1] = value
+            for window in self.AVG_WINDOWS:
+                self._sums[window] += value - old
+            return
+
+        for window in self.AVG_WINDOWS:
+            # The reading that slides out of this window once `value` is appended
+            if len(values) >= window:
+                self._sums[window] -= values[-window]
+            self._sums[window] += value
+        self._days.append(day)
+        values.append(value)
+
+    def _compute_keys(self):
+        values = self._values
+        if not values:
+            return {}
+
+        current = values[-1]
+        keys = {}
+
+        for window in self.AVG_WINDOWS:
+            count = min(window, len(values))
+            keys[f"avg{window}"] = round(self._sums[window] / count)
+
+        for window in self.CHANGE_WINDOWS:
+            if len(values) > window:
+                keys[f"chg{window}d"] = _signed(round(current - values[-window - 1]))
+
+        recent = list(values)
+        for window in self.RANGE_WINDOWS:
+            keys[f"min{window}"] = round(min(recent[-window:]))
+            keys[f"max{window}"] = round(max(recent[-window:]))
+
+        # Share of the last N days at or below today's reading
+        window_values = recent[-self.PERCENTILE_WINDOW:]
+        at_or_below = sum(1 for value in window_values if value <= current)
+        keys[f"pctile{self.PERCENTILE_WINDOW}"] = round(100 * at_or_below / len(window_values))
+
+        for window in self.SPARK_WINDOWS:
+            keys[f"spark{window}"] = self._sparkline(recent[-window:])
+
+        return keys
+
+    @staticmethod
+    def _sparkline(values):
+        low, high = min(values), max(values)
+        if high == low:
+            return SPARK_BLOCKS[len(SPARK_BLOCKS) // 2] * len(values)
+        scale = (len(SPARK_BLOCKS) - 1) / (high - low)
+        return "".join(SPARK_BLOCKS[round((value - low) * scale)] for value in values)
+
+    def keys(self):
+        return self._keys
+
+    @classmethod
+    def available_keys(cls):
+        keys = {f"avg{window}" for window in cls.AVG_WINDOWS}
+        keys.update(f"chg{window}d" for window in cls.CHANGE_WINDOWS)
+        for window in cls.RANGE_WINDOWS:
+            keys.update((f"min{window}", f"max{window}"))
+        keys.add(f"pctile{cls.PERCENTILE_WINDOW}")
+        keys.update(f"spark{window}" for window in cls.SPARK_WINDOWS)
+        return keys
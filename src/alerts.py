@@ -0,0 +1,225 @@
+import asyncio
+import bisect
+import logging
+
+from src.provider_snapshot import is_fallback
+from src.work_scheduler import Lane
+
+logger = logging.getLogger(__name__)
+
+CONDITIONS = ("below", "above", "changes")
+# Text values can only be watched for changes
+TEXT_KEYS = ("emotion", "emoji", "trend")
+
+
+def is_threshold_key(key, current=None):
+    """
+    Whether below/above rules make sense for a key: not a known text key
+    and, when its current value is known, a number.
+    """
+    if key in TEXT_KEYS or key.endswith("_rating") or key.startswith("spark"):
+        return False
+    if current is None:
+        return True
+    try:
+        float(current)
+    except (TypeError, ValueError):
+        return False
+    return True
+
+
+def describe_alert(rule):
+    target = f"{rule['provider']}.{rule['key']}"
+    if rule["condition"] == "changes":
+        return f"{target} changes"
+    return f"{target} crosses {rule['condition']} {rule['value']:g}"
+
+
+class AlertEngine:
+    """
+    Fires guild alert rules such as "m.index crosses below 25" or
+    "c.emotion changes" when a new provider snapshot arrives.
+
+    Threshold rules are kept in sorted lists per (provider, key,
+    condition), so a snapshot only bisects the range between the old and
+    new value: O(log n + fired) per watched key instead of a scan over
+    every guild's rules. Rules are stored in the guild config.
+    """
+
+    def __init__(self, bot, config_manager, work_scheduler=None):
+        self.bot = bot
+        self.config_manager = config_manager
+        self.work_scheduler = work_scheduler
+        self._rules = {}
+        # (provider, key, condition) -> parallel sorted lists of thresholds and rule keys
+        self._values = {}
+        self._entries = {}
+        # (provider, key) -> set of rule keys for "changes" rules
+        self._changes = {}
+        self._last = {}
+        self._last_snapshot = None
+        self._tasks = set()
+
+        for guild_id, rule in config_manager.iter_alerts():
+            if rule["condition"] != "changes" and not is_threshold_key(rule["key"]):
+                logger.warning(f"Alert #{rule['id']} in guild {guild_id} watches text key '{rule['key']}' for a threshold and will never fire")
+            self._index(guild_id, rule)
+        if self._rules:
+            logger.info(f"Loaded {len(self._rules)} alert rule(s)")
+
+    def _index(self, guild_id, rule):
+        rule_key = (guild_id, rule["id"])
+        self._rules[rule_key] = rule
+        if rule["condition"] == "changes":
+            self._changes.setdefault((rule["provider"], rule["key"]), set()).add(rule_key)
+            return
+
+        slot = (rule["provider"], rule["key"], rule["condition"])
+        values = self._values.setdefault(slot, [])
+        entries = self._entries.setdefault(slot, [])
+        i = bisect.bisect_right(values, rule["value"])
+        values.insert(i, rule["value"])
+        entries.insert(i, rule_key)
+
+    def _unindex(self, rule_key):
+        rule = self._rules.pop(rule_key, None)
+        if rule is None:
+            return
+        if rule["condition"] == "changes":
+            self._changes.get((rule["provider"], rule["key"]), set()).discard(rule_key)
+            return
+
+        slot = (rule["provider"], rule["key"], rule["condition"])
+        values = self._values[slot]
+        entries = self._entries[slot]
+        i = bisect.bisect_left(values, rule["value"])
+        while entries[i] != rule_key:
+            i += 1
+        del values[i]
+        del entries[i]
+
+    def add(self, guild_id, provider, key, condition, value=None, channel_id=None, current=None):
+        """
+        Store and index a rule. Returns the stored rule, or None at the guild's limit.
+        `current` is the key's latest value, if known, to reject thresholds on text.
+        """
+        if condition not in CONDITIONS:
+            raise ValueError(f"Unknown alert condition '{condition}'")
+        if condition != "changes" and value is None:
+            raise ValueError(f"'{condition}' alerts need a threshold value")
+        if condition != "changes" and not is_threshold_key(key, current):
+            raise ValueError(f"'{key}' isn't numeric, so it can only be watched for changes")
+
+        alert = {
+            "provider": provider,
+            "key": key,
+            "condition": condition,
+            "value": float(value) if condition != "changes" else None,
+            "channel_id": channel_id
+        }
+        rule = self.config_manager.add_guild_alert(guild_id, alert)
+        if rule is not None:
+            self._index(guild_id, rule)
+        return rule
+
+    def remove(self, guild_id, alert_id):
+        rule = self.config_manager.remove_guild_alert(guild_id, alert_id)
+        if rule is not None:
+            self._unindex((guild_id, alert_id))
+        return rule
+
+    def remove_guild(self, guild_id):
+        for rule_key in [rule_key for rule_key in self._rules if rule_key[0] == guild_id]:
+            self._unindex(rule_key)
+
+    def evaluate(self, snapshot):
+        """
+        Compare a snapshot with the previous one for every watched key.
+        Returns [(guild_id, rule, old, new)] for the rules that fired.
+        """
+        fired = []
+        watched = {slot[:2] for slot, values in self._values.items() if values}
+        watched.update(key for key, rule_keys in self._changes.items() if rule_keys)
+
+        for provider, key in watched:
+            data = snapshot.get(provider) or {}
+            # Don't alert on fallback values after a failed fetch
+            if key not in data or is_fallback(data):
+                continue
+            new = data[key]
+            old = self._last.get((provider, key))
+            self._last[(provider, key)] = new
+            if old is None or old == new:
+                continue
+
+            for rule_key in self._changes.get((provider, key), ()):
+                fired.append((rule_key[0], self._rules[rule_key], old, new))
+
+            try:
+                old_value, new_value = float(old), float(new)
+            except (TypeError, ValueError):
+                continue
+
+            if new_value < old_value:
+                # Thresholds in (new, old] were crossed on the way down
+                slot = (provider, key, "below")
+                values = self._values.get(slot, [])
+                lo = bisect.bisect_right(values, new_value)
+                hi = bisect.bisect_right(values, old_value)
+            else:
+                # Thresholds in [old, new) were crossed on the way up
+                slot = (provider, key, "above")
+                values = self._values.get(slot, [])
+                lo = bisect.bisect_left(values, old_value)
+                hi = bisect.bisect_left(values, new_value)
+
+            for rule_key in self._entries.get(slot, [])[lo:hi]:
+                fired.append((rule_key[0], self._rules[rule_key], old, new))
+
+        return fired
+
+    def on_snapshot(self, snapshot):
+        """
+        ProviderHub listener: evaluate and send fired alerts in the background.
+        Snapshots with the same content as the last one can't fire anything.
+        """
+        if not snapshot.changed_since(self._last_snapshot):
+            return
+        self._last_snapshot = snapshot
+        fired = self.evaluate(snapshot)
+        if not fired:
+            return
+        logger.info(f"🔔 {len(fired)} alert(s) fired")
+        task = asyncio.create_task(self.dispatch(fired))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def dispatch(self, fired):
+        # One message per channel, however many of its rules fired
+        by_channel = {}
+        for guild_id, rule, old, new in fired:
+            if self.bot.get_guild(guild_id) is None:
+                # Another shard process or identity owns this guild
+                continue
+            line = f"🔔 **{describe_alert(rule)}**: {old} → {new}"
+            by_channel.setdefault(rule["channel_id"], []).append(line)
+
+        for channel_id, lines in by_channel.items():
+            channel = self.bot.get_channel(channel_id)
+            if channel is None:
+                logger.warning(f"Alert channel {channel_id} not found")
+                continue
+            try:
+                if self.work_scheduler:
+                    async with self.work_scheduler.slot(Lane.BACKGROUND):
+                        await channel.send("\n".join(lines)[:2000])
+                else:
+                    await channel.send("\n".join(lines)[:2000])
+            except Exception as e:
+                logger.error(f"Error sending alert to channel {channel_id}: {e}")
+
+    async def close(self):
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
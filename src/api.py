@@ -0,0 +1,229 @@
+import hashlib
+import logging
+import os
+import time
+
+from src.backends import dumps
+from src.metrics import record_cache_lookup
+
+logger = logging.getLogger(__name__)
+
+# API provider names -> (snapshot key, chart/history provider)
+PROVIDERS = {
+    "m": ("m", "market"),
+    "market": ("m", "market"),
+    "c": ("c", "crypto"),
+    "crypto": ("c", "crypto"),
+}
+MAX_CACHED_RESPONSES = 512
+
+
+def _etag(body):
+    return f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+
+
+class ApiServer:
+    """
+    Read-only aiohttp API over the data Tychra already has, so other
+    services don't scrape CNN and Alternative.me themselves.
+
+    GET /v1/snapshot                  current provider snapshot
+    GET /v1/snapshot/{provider}       one provider (m/market, c/crypto)
+    GET /v1/history/{provider}?days=30&series=vix
+    GET /v1/charts/{provider}?days=30&series=vix
+
+    Snapshot responses are encoded once per snapshot; history and chart
+    responses are cached for `cache_seconds` and dropped when new data
+    arrives. Every response carries an ETag hashed from its body, and
+    If-None-Match gets a 304.
+    """
+
+    def __init__(self, hub, chart_generator, host="127.0.0.1", port=9109, cache_seconds=60.0):
+        self.hub = hub
+        self.chart_generator = chart_generator
+        self.host = host
+        self.port = port
+        self.cache_seconds = cache_seconds
+        self._runner = None
+        # request key -> (etag, body, expires_at)
+        self._responses = {}
+
+    def on_snapshot(self, snapshot):
+        """
+        ProviderHub listener: history and chart responses are only valid for the data they came from.
+        """
+        if self._responses:
+            self._responses.clear()
+
+    def _response(self, request, etag, body, status=200):
+        from aiohttp import web
+
+        headers = {
+            "ETag": etag,
+            "Cache-Control": f"public, max-age={int(self.cache_seconds)}",
+            "X-Content-Type-Options": "nosniff",
+        }
+        if status == 200:
+            if_none_match = request.headers.get("If-None-Match", "")
+            if etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(",")) or if_none_match.strip() == "*":
+                return web.Response(status=304, headers=headers)
+        return web.Response(status=status, body=body, content_type="application/json", charset="utf-8", headers=headers)
+
+    def _error(self, status, message):
+        from aiohttp import web
+        return web.Response(
+            status=status, text=dumps({"error": message}), content_type="application/json", charset="utf-8"
+        )
+
+    def _cached(self, key):
+        cached = self._responses.get(key)
+        if cached is None or cached[2] < time.monotonic():
+            return None
+        return cached
+
+    def _store(self, key, payload):
+        body = dumps(payload).encode()
+        if len(self._responses) >= MAX_CACHED_RESPONSES:
+            self._responses.pop(next(iter(self._responses)))
+        cached = (_etag(body), body, time.monotonic() + self.cache_seconds)
+        self._responses[key] = cached
+        return cached
+
+    async def _snapshot(self):
+        # Before the first update wave, fetch once rather than serve nothing
+        if not self.hub.snapshot:
+            await self.hub.refresh(max_age=self.cache_seconds)
+        return self.hub.snapshot
+
+    @staticmethod
+    def _snapshot_payload(snapshot, providers):
+        return {
+            "version": snapshot.version,
+            "fetched_at": snapshot.fetched_at,
+            "stale": snapshot.stale,
+            "stale_providers": sorted(snapshot.stale_providers),
+            "providers": providers,
+        }
+
+    async def _handle_snapshot(self, request):
+        snapshot = await self._snapshot()
+        key = ("snapshot", snapshot.version)
+        cached = self._responses.get(key)
+        record_cache_lookup("api", cached is not None)
+        if cached is None:
+            body = dumps(self._snapshot_payload(snapshot, snapshot.to_dict())).encode()
+            # Drop the previous version's body
+            self._responses = {k: v for k, v in self._responses.items() if k[0] != "snapshot"}
+            # The body also carries version and fetched_at, so the tag hashes the body itself
+            cached = self._responses[key] = (_etag(body), body, float("inf"))
+        return self._response(request, cached[0], cached[1])
+
+    async def _handle_provider(self, request):
+        name = request.match_info["provider"]
+        if name not in PROVIDERS:
+            return self._error(404, f"Unknown provider '{name}'")
+        snapshot = await self._snapshot()
+        data = snapshot.get(PROVIDERS[name][0])
+        if data is None:
+            return self._error(503, "No data for this provider yet")
+        payload = self._snapshot_payload(snapshot, {PROVIDERS[name][0]: dict(data)})
+        body = dumps(payload).encode()
+        return self._response(request, _etag(body), body)
+
+    def _window(self, request):
+        """
+        (provider, days, series) from the path and query, or an error response.
+        """
+        name = request.match_info["provider"]
+        if name not in PROVIDERS:
+            return None, self._error(404, f"Unknown provider '{name}'")
+        try:
+            days = int(request.query.get("days", "30"))
+        except ValueError:
+            return None, self._error(400, "days must be an integer")
+        if not 1 <= days <= self.chart_generator.MAX_DAYS:
+            return None, self._error(400, f"days must be between 1 and {self.chart_generator.MAX_DAYS}")
+        provider = PROVIDERS[name][1]
+        series = request.query.get("series") or None
+        if series and provider == "crypto":
+            return None, self._error(400, "series is only available for the market provider")
+        if series and not self.chart_generator.series_source(series):
+            return None, self._error(400, f"Unknown series '{series}'")
+        return (provider, days, series), None
+
+    async def _handle_cached(self, request, kind, produce):
+        window, error = self._window(request)
+        if error:
+            return error
+        key = (kind, *window)
+        cached = self._cached(key)
+        record_cache_lookup("api", cached is not None)
+        if cached is None:
+            payload = await produce(*window)
+            if payload is None:
+                return self._error(503, f"{kind.capitalize()} unavailable, try again later")
+            cached = self._store(key, payload)
+        return self._response(request, cached[0], cached[1])
+
+    async def _history(self, provider, days, series):
+        points = await self.chart_generator.history(days, provider, series)
+        if points is None:
+            return None
+        return {"provider": provider, "series": series, "days": days, "points": points}
+
+    async def _chart(self, provider, days, series):
+        url = await self.chart_generator.generate_chart(days, provider, wait=True, series=series)
+        if not url:
+            return None
+        return {"provider": provider, "series": series, "days": days, "url": url}
+
+    async def _handle_history(self, request):
+        return await self._handle_cached(request, "history", self._history)
+
+    async def _handle_chart(self, request):
+        return await self._handle_cached(request, "chart", self._chart)
+
+    async def start(self):
+        from aiohttp import web
+
+        app = web.Application()
+        app.router.add_get("/v1/snapshot", self._handle_snapshot)
+        app.router.add_get("/v1/snapshot/{provider}", self._handle_provider)
+        app.router.add_get("/v1/history/{provider}", self._handle_history)
+        app.router.add_get("/v1/charts/{provider}", self._handle_chart)
+
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        logger.info(f"🛰️ API available at http://{self.host}:{self.port}/v1/snapshot")
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+def create_api_server(hub, chart_generator, port_offset=0):
+    """
+    Build an ApiServer from API_PORT / API_HOST / API_CACHE_SECONDS, or None if disabled.
+    Shard worker processes pass their index as port_offset.
+    """
+    port_str = os.getenv("API_PORT", "").strip()
+    if not port_str:
+        return None
+
+    try:
+        port = int(port_str)
+    except ValueError:
+        logger.warning(f"Invalid API_PORT '{port_str}', API disabled")
+        return None
+
+    try:
+        cache_seconds = float(os.getenv("API_CACHE_SECONDS", "60"))
+    except ValueError:
+        logger.warning("Invalid API_CACHE_SECONDS, using 60")
+        cache_seconds = 60.0
+
+    host = os.getenv("API_HOST", "127.0.0.1").strip() or "127.0.0.1"
+    return ApiServer(hub, chart_generator, host, port + port_offset, max(0.0, cache_seconds))
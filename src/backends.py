@@ -0,0 +1,158 @@
+import asyncio
+import json
+import logging
+import os
+import sys
+
+logger = logging.getLogger(__name__)
+
+JSON_BACKENDS = ("orjson", "msgspec", "json")
+LOOP_BACKENDS = ("uvloop", "asyncio")
+
+
+class _StdlibCodec:
+    name = "json"
+
+    def loads(self, data):
+        return json.loads(data)
+
+    def dumps(self, obj, indent=False, sort_keys=False, default=None):
+        return json.dumps(
+            obj, indent=2 if indent else None, sort_keys=sort_keys, default=default,
+            ensure_ascii=False, separators=None if indent else (",", ":")
+        )
+
+
+class _OrjsonCodec:
+    name = "orjson"
+
+    def __init__(self):
+        import orjson
+        self._orjson = orjson
+
+    def loads(self, data):
+        return self._orjson.loads(data)
+
+    def dumps(self, obj, indent=False, sort_keys=False, default=None):
+        option = (self._orjson.OPT_INDENT_2 if indent else 0) | (self._orjson.OPT_SORT_KEYS if sort_keys else 0)
+        return self._orjson.dumps(obj, option=option, default=default).decode()
+
+
+class _MsgspecCodec:
+    name = "msgspec"
+
+    def __init__(self):
+        import msgspec
+        self._json = msgspec.json
+        self._decoder = msgspec.json.Decoder()
+        self._encoder = msgspec.json.Encoder()
+        self._sorted_encoder = msgspec.json.Encoder(order="sorted")
+
+    def loads(self, data):
+        return self._decoder.decode(data)
+
+    def dumps(self, obj, indent=False, sort_keys=False, default=None):
+        if default is not None:
+            encoded = self._json.encode(obj, enc_hook=default, order="sorted" if sort_keys else None)
+        else:
+            encoded = (self._sorted_encoder if sort_keys else self._encoder).encode(obj)
+        if indent:
+            encoded = self._json.format(encoded, indent=2)
+        return encoded.decode()
+
+
+_CODECS = {"orjson": _OrjsonCodec, "msgspec": _MsgspecCodec, "json": _StdlibCodec}
+_codec = None
+
+
+def _choose(setting, available, probe):
+    """
+    Name of the backend to use for an "auto"/explicit setting; explicit
+    choices that aren't installed fall back to the last (stdlib) entry.
+    """
+    setting = (setting or "auto").strip().lower()
+    if setting not in ("auto", *available):
+        logger.warning(f"Unknown backend '{setting}', using auto")
+        setting = "auto"
+    candidates = available if setting == "auto" else (setting,)
+    for name in candidates:
+        if probe(name):
+            return name
+    if setting != "auto":
+        logger.warning(f"Backend '{setting}' is not installed, using {available[-1]}")
+    return available[-1]
+
+
+def _importable(name):
+    if name in ("json", "asyncio"):
+        return True
+    try:
+        __import__(name)
+        return True
+    except ImportError:
+        return False
+
+
+def select_json_backend(name=None):
+    """
+    Pick the JSON codec: JSON_BACKEND (auto, orjson, msgspec or json) unless
+    a name is given. Returns the backend name.
+    """
+    global _codec
+    chosen = _choose(name or os.getenv("JSON_BACKEND", "auto"), JSON_BACKENDS, _importable)
+    _codec = _CODECS[chosen]()
+    return chosen
+
+
+def codec():
+    if _codec is None:
+        select_json_backend()
+    return _codec
+
+
+def loads(data):
+    """
+    Decode JSON from bytes or str with the selected backend.
+    """
+    return codec().loads(data)
+
+
+def dumps(obj, indent=False, sort_keys=False, default=None):
+    """
+    Encode to a str with the selected backend. Output is UTF-8 (not
+    ASCII-escaped) and compact unless indent is set.
+    """
+    return codec().dumps(obj, indent=indent, sort_keys=sort_keys, default=default)
+
+
+def select_loop_backend(name=None):
+    """
+    EVENT_LOOP (auto, uvloop or asyncio) unless a name is given.
+    """
+    return _choose(name or os.getenv("EVENT_LOOP", "auto"), LOOP_BACKENDS, _importable)
+
+
+def loop_factory(backend):
+    if backend == "uvloop":
+        import uvloop
+        return uvloop.new_event_loop
+    return asyncio.new_event_loop
+
+
+def run(coro, backend=None):
+    """
+    asyncio.run() on the selected event loop backend.
+    """
+    backend = backend or select_loop_backend()
+    if backend == "asyncio":
+        return asyncio.run(coro)
+    if sys.version_info >= (3, 11):
+        with asyncio.Runner(loop_factory=loop_factory(backend)) as runner:
+            return runner.run(coro)
+    import uvloop
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return asyncio.run(coro)
+
+
+def describe_backends(loop_backend):
+    return f"event loop: {loop_backend}, JSON: {codec().name}"
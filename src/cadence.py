@@ -0,0 +1,199 @@
+import logging
+import os
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+
+logger = logging.getLogger(__name__)
+
+# NYSE full-day closures; extend with MARKET_HOLIDAYS
+NYSE_HOLIDAYS = (
+    "2025-01-01", "2025-01-09", "2025-01-20", "2025-02-17", "2025-04-18", "2025-05-26",
+    "2025-06-19", "2025-07-04", "2025-09-01", "2025-11-27", "2025-12-25",
+    "2026-01-01", "2026-01-19", "2026-02-16", "2026-04-03", "2026-05-25", "2026-06-19",
+    "2026-07-03", "2026-09-07", "2026-11-26", "2026-12-25",
+    "2027-01-01", "2027-01-18", "2027-02-15", "2027-03-26", "2027-05-31", "2027-06-18",
+    "2027-07-05", "2027-09-06", "2027-11-25", "2027-12-24",
+)
+# Beyond this span every provider counts as possibly changed
+MAX_SCAN_DAYS = 14
+
+
+class MarketCalendar:
+    """
+    US equity sessions: weekdays between `session` open and close in
+    America/New_York, minus holidays.
+    """
+
+    def __init__(self, session=("09:30", "16:00"), holidays=NYSE_HOLIDAYS):
+        from zoneinfo import ZoneInfo
+
+        self.timezone = ZoneInfo("America/New_York")
+        self.open, self.close = (dt_time.fromisoformat(value) for value in session)
+        self.holidays = {date.fromisoformat(day) for day in holidays}
+
+    def is_trading_day(self, day):
+        return day.weekday() < 5 and day not in self.holidays
+
+    def sessions(self, since, until, grace=timedelta(0)):
+        """
+        (open, close + grace) datetimes of the trading days between since and until.
+        """
+        day = since.astimezone(self.timezone).date() - timedelta(days=1)
+        last = until.astimezone(self.timezone).date()
+        while day <= last:
+            if self.is_trading_day(day):
+                yield (
+                    datetime.combine(day, self.open, self.timezone),
+                    datetime.combine(day, self.close, self.timezone) + grace,
+                )
+            day += timedelta(days=1)
+
+
+class SessionCadence:
+    """
+    A provider that moves during market sessions (the CNN index). Changes
+    observed after the close widen the grace window, up to max_grace.
+    """
+
+    def __init__(self, calendar, grace=timedelta(minutes=30), max_grace=timedelta(hours=3)):
+        self.calendar = calendar
+        self.grace = grace
+        self.max_grace = max_grace
+
+    def could_change(self, since, now):
+        if now - since > timedelta(days=MAX_SCAN_DAYS):
+            return True
+        for start, end in self.calendar.sessions(since, now, self.grace):
+            if start < now and end > since:
+                return True
+        return False
+
+    def observe(self, changed_at, since):
+        local = changed_at.astimezone(self.calendar.timezone)
+        if not self.calendar.is_trading_day(local.date()):
+            return
+        close = datetime.combine(local.date(), self.calendar.close, self.calendar.timezone)
+        late = local - close
+        if timedelta(0) < late <= self.max_grace and late > self.grace:
+            self.grace = late + timedelta(minutes=5)
+            logger.info(f"Market data changed {late} after the close, grace window now {self.grace}")
+
+
+class DailyCadence:
+    """
+    A provider that publishes once a day (the crypto index). The publish
+    time is learned from changes seen by polls close together, since
+    a change only says it happened after the previous poll; until then,
+    and if a day is missed, every poll counts.
+    """
+
+    def __init__(self, window=timedelta(hours=2)):
+        self.window = window
+        # Earliest observed publish time as an offset from UTC midnight
+        self.publish_offset = None
+        self.last_change = None
+
+    def could_change(self, since, now):
+        if self.publish_offset is None or self.last_change is None:
+            return True
+        if now - self.last_change > timedelta(hours=26) or now - since > timedelta(days=MAX_SCAN_DAYS):
+            return True
+        day = datetime.combine(since.astimezone(timezone.utc).date() - timedelta(days=1), dt_time(), timezone.utc)
+        while day <= now:
+            start = day + self.publish_offset
+            # A window whose change was already seen is done
+            if start < now and start + self.window > since and self.last_change < start:
+                return True
+            day += timedelta(days=1)
+        return False
+
+    def observe(self, changed_at, since):
+        changed_at = changed_at.astimezone(timezone.utc)
+        self.last_change = changed_at
+        if since is None or changed_at - since > self.window / 2:
+            return
+        offset = since - datetime.combine(since.date(), dt_time(), timezone.utc)
+        if self.publish_offset is None or offset < self.publish_offset:
+            self.publish_offset = offset
+            logger.info(f"Daily data publishes around {offset} after UTC midnight")
+
+
+class CadenceEngine:
+    """
+    Decides which providers are worth fetching.
+
+    Each provider has a schedule: the market index during sessions
+    (weekends and holidays excluded), the crypto index once a day at its
+    observed publish time. A provider is due when its source could have
+    changed since it was last fetched, or when it hasn't been fetched for
+    max_idle (a safety net for calendar gaps).
+
+    ADAPTIVE_CADENCE        - "off" fetches every provider on every run (default: on)
+    MARKET_SESSION          - market hours in New York time (default: 09:30-16:00)
+    MARKET_HOLIDAYS         - extra closed days, e.g. 2028-01-17,2028-02-21
+    CADENCE_MAX_IDLE_HOURS  - fetch at least this often regardless (default: 6)
+    """
+
+    def __init__(self, schedules, max_idle=timedelta(hours=6)):
+        self.schedules = schedules
+        self.max_idle = max_idle
+        # provider -> when it was last fetched / the data timestamp it had
+        self.fetched_at = {}
+        self._readings = {}
+
+    @classmethod
+    def from_env(cls):
+        """
+        An engine for the built-in providers, or None with ADAPTIVE_CADENCE=off.
+        """
+        if os.getenv("ADAPTIVE_CADENCE", "on").strip().lower() in ("off", "false", "0", "no"):
+            return None
+
+        session = os.getenv("MARKET_SESSION", "09:30-16:00").strip()
+        holidays = [day.strip() for day in os.getenv("MARKET_HOLIDAYS", "").split(",") if day.strip()]
+        try:
+            calendar = MarketCalendar(tuple(session.split("-", 1)), NYSE_HOLIDAYS + tuple(holidays))
+        except ValueError as e:
+            logger.warning(f"Invalid MARKET_SESSION/MARKET_HOLIDAYS ({e}), using defaults")
+            calendar = MarketCalendar()
+
+        try:
+            max_idle = timedelta(hours=float(os.getenv("CADENCE_MAX_IDLE_HOURS", "6")))
+        except ValueError:
+            logger.warning("Invalid CADENCE_MAX_IDLE_HOURS, using 6")
+            max_idle = timedelta(hours=6)
+
+        return cls({"m": SessionCadence(calendar), "c": DailyCadence()}, max_idle)
+
+    def due(self, names, now=None):
+        """
+        The subset of provider names worth fetching now.
+        """
+        now = now or datetime.now(timezone.utc)
+        due = set()
+        for name in names:
+            schedule = self.schedules.get(name)
+            fetched_at = self.fetched_at.get(name)
+            if schedule is None or fetched_at is None or now - fetched_at >= self.max_idle:
+                due.add(name)
+            elif schedule.could_change(fetched_at, now):
+                due.add(name)
+        return due
+
+    def observe(self, snapshot, fetched, now=None):
+        """
+        Record a refresh: `fetched` providers were fetched now, and those whose
+        reading changed teach their schedule when updates happen.
+        """
+        now = now or datetime.now(timezone.utc)
+        for name in fetched:
+            data = snapshot.get(name)
+            if not data or name in snapshot.stale_providers:
+                # Failed fetches don't count, so the provider stays due
+                continue
+            since = self.fetched_at.get(name)
+            self.fetched_at[name] = now
+            reading = data.get("timestamp")
+            previous = self._readings.get(name)
+            self._readings[name] = reading
+            if previous is not None and reading != previous and name in self.schedules:
+                self.schedules[name].observe(now, since)
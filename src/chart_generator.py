@@ -1,9 +1,17 @@
-import aiohttp
 import asyncio
+import bisect
 import logging
+import os
+import time
+from collections import Counter
 from datetime import datetime
-from typing import Optional, Dict, List
-from quickchart import QuickChart
+from typing import Optional, Dict, Iterator, List
+
+from src.backends import dumps, loads
+from src.http_pool import client_session
+from src.downsample import downsample
+from src.metrics import CHART_GENERATION_SECONDS, CHART_PAYLOAD_BYTES, record_cache_lookup
+from src.profiler import PROFILER
 
 logger = logging.getLogger(__name__)
 
@@ -15,11 +23,55 @@ class ChartGenerator:
 
     MARKET_API_URL = "https://production.dataviz.cnn.io/index/fearandgreed/graphdata"
     CRYPTO_API_URL = "https://api.alternative.me/fng/?limit={days}"
-
-    def __init__(self):
+    # Longest window charts and the API serve; one history fetch covers every shorter one
+    MAX_DAYS = 365
+    QUICKCHART_SCHEME = "https"
+    QUICKCHART_HOST = "quickchart.io"
+
+    # Zone upper bounds and point colors, matching the background zones
+    ZONE_BOUNDS = (25, 45, 55, 75)
+    ZONE_COLORS = (
+        'rgb(220, 38, 38)',
+        'rgb(251, 146, 60)',
+        'rgb(250, 204, 21)',
+        'rgb(134, 239, 172)',
+        'rgb(34, 197, 94)',
+    )
+
+    def __init__(self, http_pool=None, max_points=None, prewarm_top=None, cache_ttl=None):
+        self.http_pool = http_pool
+        try:
+            if max_points is None:
+                max_points = int(os.getenv("CHART_MAX_POINTS", "90"))
+            if prewarm_top is None:
+                prewarm_top = int(os.getenv("CHART_PREWARM_TOP", "4"))
+            if cache_ttl is None:
+                cache_ttl = float(os.getenv("CHART_CACHE_TTL", "3600"))
+        except ValueError:
+            logger.warning("Invalid CHART_MAX_POINTS/CHART_PREWARM_TOP/CHART_CACHE_TTL, using defaults")
+            max_points, prewarm_top, cache_ttl = 90, 4, 3600.0
+        # Long windows are downsampled to this many plotted points (0 = no limit)
+        self.max_points = max_points
+        self.prewarm_top = max(0, prewarm_top)
+        self.cache_ttl = cache_ttl
         self._lock = asyncio.Lock()
         self._is_generating = False
 
+        # Rendered chart URLs for the current provider data: (provider, days, series) -> (generation, rendered_at, url)
+        self._charts = {}
+        self._generation = 0
+        self._last_snapshot = None
+        # Fetched history payloads shared by renders and the API: provider -> (generation, fetched_at, data)
+        self._history = {}
+        self._history_lock = asyncio.Lock()
+        # Decaying request counts per (provider, days, series) pick what to pre-render
+        self._requests = Counter()
+        self._prewarm_task = None
+        # User renders waiting for or holding the lock; pre-warm steps aside for them
+        self._interactive = 0
+        self._interactive_idle = asyncio.Event()
+        self._interactive_idle.set()
+
     async def is_busy(self) -> bool:
         """
         Check if chart generation is in progress.
@@ -30,6 +82,8 @@ class ChartGenerator:
         """
         Fetch historical market F&G data from CNN API.
         """
+        import aiohttp
+
         try:
             headers = {
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
@@ -37,10 +91,10 @@ class ChartGenerator:
                 'Referer': 'https://www.cnn.com/markets/fear-and-greed'
             }
 
-            async with aiohttp.ClientSession() as session:
+            async with client_session(self.http_pool) as session:
                 async with session.get(self.MARKET_API_URL, headers=headers, timeout=aiohttp.ClientTimeout(total=10)) as response:
                     if response.status == 200:
-                        data = await response.json()
+                        data = loads(await response.read())
                         logger.info(f"✅ Fetched market data: {len(data.get('fear_and_greed_historical', {}).get('data', []))} records")
                         return data
                     elif response.status == 418:
@@ -57,6 +111,8 @@ class ChartGenerator:
         """
         Fetch historical crypto F&G data from Alternative.me API.
         """
+        import aiohttp
+
         try:
             headers = {
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
@@ -64,10 +120,10 @@ class ChartGenerator:
             }
 
             url = self.CRYPTO_API_URL.format(days=days)
-            async with aiohttp.ClientSession() as session:
+            async with client_session(self.http_pool) as session:
                 async with session.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=10)) as response:
                     if response.status == 200:
-                        data = await response.json()
+                        data = loads(await response.read())
                         logger.info(f"✅ Fetched crypto data: {len(data.get('data', []))} records")
                         return data
                     else:
@@ -77,71 +133,82 @@ class ChartGenerator:
             logger.error(f"⛔ Error fetching crypto data: {e}")
             return None
 
-    def _parse_market_data(self, data: Dict, days: int) -> tuple[List[str], List[float]]:
+    @staticmethod
+    def _iter_market_records(data: Dict, days: int, source: str = "fear_and_greed_historical", label_format: str = '%m/%d') -> Iterator[tuple]:
         """
-        Parse CNN market data into labels and values.
+        Lazily yield (label, value) for the last `days` CNN records, oldest first.
         """
-        try:
-            historical = data.get('fear_and_greed_historical', {}).get('data', [])
+        historical = data.get(source, {}).get('data', [])
+
+        # Last N days, walked by index so nothing is copied
+        for i in range(max(0, len(historical) - days), len(historical)):
+            record = historical[i]
+            # Parse timestamp (format: "2024-12-01" or unix timestamp)
+            timestamp = record.get('x')
+            if isinstance(timestamp, str):
+                date_obj = datetime.strptime(timestamp.split('T')[0], '%Y-%m-%d')
+            else:
+                # Unix timestamp in milliseconds
+                date_obj = datetime.fromtimestamp(timestamp / 1000)
+
+            yield date_obj.strftime(label_format), float(record.get('y', 0))
+
+    @staticmethod
+    def _iter_crypto_records(data: Dict, days: int, label_format: str = '%m/%d') -> Iterator[tuple]:
+        """
+        Lazily yield (label, value) for the last `days` Alternative.me records, oldest first.
+        """
+        records = data.get('data', [])
 
-            # Get last N days
-            records = historical[-days:] if len(historical) > days else historical
+        # The API returns newest first
+        for i in range(min(days, len(records)) - 1, -1, -1):
+            record = records[i]
+            # Parse timestamp (unix timestamp)
+            date_obj = datetime.fromtimestamp(int(record.get('timestamp', 0)))
+            yield date_obj.strftime(label_format), float(record.get('value', 0))
 
+    def _parse_market_data(self, data: Dict, days: int, source: str = "fear_and_greed_historical", label_format: str = '%m/%d') -> tuple[List[str], List[float]]:
+        """
+        Parse CNN market data into labels and values.
+        source is the payload key of the series, e.g. a component indicator.
+        """
+        try:
             labels = []
             values = []
-
-            for record in records:
-                # Parse timestamp (format: "2024-12-01" or unix timestamp)
-                timestamp = record.get('x')
-                if isinstance(timestamp, str):
-                    date_obj = datetime.strptime(timestamp.split('T')[0], '%Y-%m-%d')
-                    labels.append(date_obj.strftime('%m/%d'))
-                else:
-                    # Unix timestamp in milliseconds
-                    date_obj = datetime.fromtimestamp(timestamp / 1000)
-                    labels.append(date_obj.strftime('%m/%d'))
-
-                # Get value
-                value = float(record.get('y', 0))
+            for label, value in self._iter_market_records(data, days, source, label_format):
+                labels.append(label)
                 values.append(value)
-
             return labels, values
         except Exception as e:
             logger.error(f"⛔ Error parsing market data: {e}")
             return [], []
 
-    def _parse_crypto_data(self, data: Dict, days: int) -> tuple[List[str], List[float]]:
+    def _parse_crypto_data(self, data: Dict, days: int, label_format: str = '%m/%d') -> tuple[List[str], List[float]]:
         """
         Parse Alternative.me crypto data into labels and values.
         """
         try:
-            records = data.get('data', [])
-
-            # Reverse because API returns newest first
-            records = list(reversed(records[:days]))
-
             labels = []
             values = []
-
-            for record in records:
-                # Parse timestamp (unix timestamp)
-                timestamp = int(record.get('timestamp', 0))
-                date_obj = datetime.fromtimestamp(timestamp)
-                labels.append(date_obj.strftime('%m/%d'))
-                
-                # Get value
-                value = float(record.get('value', 0))
+            for label, value in self._iter_crypto_records(data, days, label_format):
+                labels.append(label)
                 values.append(value)
-
             return labels, values
         except Exception as e:
             logger.error(f"⛔ Error parsing crypto data: {e}")
             return [], []
 
-    def _generate_chart_config(self, labels: List[str], values: List[float], title: str) -> Dict:
+    def _generate_chart_config(self, labels: List[str], values: List[float], title: str, series_label: Optional[str] = None) -> Dict:
         """
         Generate QuickChart configuration with color-coded fear/greed zones.
+        series_label charts a raw component reading (e.g. the VIX level) on its own scale instead.
         """
+        if series_label:
+            return self._generate_series_config(labels, values, title, series_label)
+
+        # Fewer, smaller points as the window grows
+        point_radius = 5 if len(values) <= 30 else 3 if len(values) <= 60 else 2
+
         return {
             'type': 'line',
             'data': {
@@ -153,11 +220,11 @@ class ChartGenerator:
                     'borderColor': 'rgb(255, 255, 255)',
                     'backgroundColor': 'rgb(255, 255, 255)',
                     'borderWidth': 3,
-                    'pointBackgroundColor': values,  # Dynamic coloring per point
+                    'pointBackgroundColor': self._zone_colors(values),
                     'pointBorderColor': '#fff',
-                    'pointBorderWidth': 2,
-                    'pointRadius': 5,
-                    'pointHoverRadius': 7,
+                    'pointBorderWidth': 2 if point_radius > 2 else 1,
+                    'pointRadius': point_radius,
+                    'pointHoverRadius': point_radius + 2,
                     'tension': 0.4
                 }]
             },
@@ -264,72 +331,278 @@ class ChartGenerator:
             }
         }
 
-    async def generate_chart(self, days: int = 10, provider: str = "market") -> Optional[str]:
+    def _zone_colors(self, values: List[float]) -> List[str]:
+        """
+        Per-point fear/greed zone colors in one pass.
+        """
+        bounds, colors = self.ZONE_BOUNDS, self.ZONE_COLORS
+        return [colors[bisect.bisect_right(bounds, value)] for value in values]
+
+    def _generate_series_config(self, labels: List[str], values: List[float], title: str, series_label: str) -> Dict:
+        config = self._generate_chart_config(labels, values, title)
+        dataset = config['data']['datasets'][0]
+        dataset['label'] = series_label
+        dataset['pointBackgroundColor'] = 'rgb(255, 255, 255)'
+        # Raw readings aren't on the 0-100 scale, so no zones and an automatic axis
+        del config['options']['annotation']
+        y_axis = config['options']['scales']['yAxes'][0]
+        y_axis['ticks'] = {'fontColor': '#fff', 'fontSize': 12}
+        y_axis['scaleLabel']['labelString'] = series_label
+        return config
+
+    async def _history_data(self, provider: str) -> Optional[Dict]:
+        """
+        The provider's history payload ("market" or "crypto"), fetched at
+        most once per data update and CHART_CACHE_TTL.
+        """
+        def cached():
+            entry = self._history.get(provider)
+            if entry and entry[0] == self._generation and time.monotonic() - entry[1] <= self.cache_ttl:
+                return entry[2]
+            return None
+
+        data = cached()
+        record_cache_lookup("history", data is not None)
+        if data is not None:
+            return data
+
+        async with self._history_lock:
+            data = cached()
+            if data is not None:
+                return data
+            generation = self._generation
+            if provider == "crypto":
+                data = await self._fetch_crypto_data(self.MAX_DAYS)
+            else:
+                data = await self._fetch_market_data(self.MAX_DAYS)
+            if data and generation == self._generation:
+                self._history[provider] = (generation, time.monotonic(), data)
+            return data
+
+    def series_source(self, series: Optional[str]) -> Optional[tuple]:
+        """
+        (payload key, label) of a market component indicator alias, or None.
+        """
+        from providers import MarketProvider
+        return next(
+            ((source, label) for source, (alias, label) in MarketProvider.INDICATORS.items() if alias == series),
+            None
+        )
+
+    async def history_rows(self, days: int = 30, provider: str = "market", series: Optional[str] = None) -> Optional[Iterator[tuple]]:
+        """
+        A lazy iterator of ("YYYY-MM-DD", value) for the last `days` days,
+        oldest first, over the same cached payload charts are rendered from.
+        Returns None if the data can't be fetched or the series is unknown.
+        """
+        if series and (provider == "crypto" or not self.series_source(series)):
+            return None
+        data = await self._history_data(provider)
+        if not data:
+            return None
+        if provider == "crypto":
+            return self._iter_crypto_records(data, days, label_format='%Y-%m-%d')
+        source = self.series_source(series)[0] if series else "fear_and_greed_historical"
+        return self._iter_market_records(data, days, source, label_format='%Y-%m-%d')
+
+    async def history(self, days: int = 30, provider: str = "market", series: Optional[str] = None) -> Optional[List[Dict]]:
+        """
+        history_rows() as [{"date": "YYYY-MM-DD", "value": ...}].
+        """
+        rows = await self.history_rows(days, provider, series)
+        if rows is None:
+            return None
+        try:
+            return [{"date": date, "value": value} for date, value in rows]
+        except Exception as e:
+            logger.error(f"⛔ Error parsing {provider} history: {e}")
+            return None
+
+    async def generate_chart(self, days: int = 10, provider: str = "market", wait: bool = False, series: Optional[str] = None, background: bool = False) -> Optional[str]:
         """
         Generate F&G index chart and return URL.
 
         Args:
             days: Number of days to include (default 10)
             provider: "market" for stock or "crypto" for cryptocurrency (default "market")
+            wait: queue behind a chart in progress instead of rejecting (for broadcasts)
+            series: a market component indicator alias (e.g. "putcall", "vix") instead of the index
+            background: pre-warm/broadcast render; not counted as a request and never rejects others
 
         Returns:
             Chart URL or None if generation failed
         """
+        key = (provider, days, series)
+        if not background:
+            self._requests[key] += 1
+            url = self.cached_chart(days, provider, series)
+            record_cache_lookup("chart", url is not None)
+            if url:
+                return url
+
         # Rate limiting - only one chart generation at a time
-        if self._is_generating:
+        if self._is_generating and not wait:
             logger.warning("⚠️ Chart generation already in progress, rejecting request")
             return None
 
-        async with self._lock:
-            self._is_generating = True
+        if not background:
+            self._interactive += 1
+            self._interactive_idle.clear()
+        try:
+            async with self._lock:
+                # Rendered by the request or pre-warm we queued behind
+                url = self.cached_chart(days, provider, series)
+                if url:
+                    return url
+
+                # Background renders make users wait for the lock instead of being rejected
+                self._is_generating = not background
+                generation = self._generation
+                try:
+                    with CHART_GENERATION_SECONDS.labels(provider).time():
+                        async with PROFILER.capture("chart"):
+                            url = await self._generate_chart(days, provider, series)
+                finally:
+                    self._is_generating = False
+
+                if url and generation == self._generation:
+                    self._charts[key] = (generation, time.monotonic(), url)
+                return url
+        finally:
+            if not background:
+                self._interactive -= 1
+                if not self._interactive:
+                    self._interactive_idle.set()
+
+    def cached_chart(self, days: int = 10, provider: str = "market", series: Optional[str] = None) -> Optional[str]:
+        """
+        URL of a chart rendered from the current provider data, if any.
+        """
+        cached = self._charts.get((provider, days, series))
+        if cached is None:
+            return None
+        generation, rendered_at, url = cached
+        if generation != self._generation or time.monotonic() - rendered_at > self.cache_ttl:
+            return None
+        return url
+
+    def on_snapshot(self, snapshot):
+        """
+        ProviderHub listener: new data invalidates rendered charts, then the
+        most requested windows are rendered again in the background, each
+        only once no user chart is waiting. A snapshot with unchanged
+        content leaves the cache alone.
+        """
+        if not snapshot.changed_since(self._last_snapshot):
+            return
+        self._last_snapshot = snapshot
+        self._generation += 1
+        self._charts.clear()
+        self._history.clear()
+        if self.prewarm_top and (self._prewarm_task is None or self._prewarm_task.done()):
+            self._prewarm_task = asyncio.create_task(self._prewarm())
+
+    async def _prewarm(self):
+        # Only windows requested since the last few updates; counts halve every update
+        popular = [key for key, count in self._requests.most_common(self.prewarm_top) if count >= 1]
+        for key in list(self._requests):
+            self._requests[key] /= 2
+            if self._requests[key] < 0.1:
+                del self._requests[key]
+        if not popular:
+            return
+
+        started = time.perf_counter()
+        rendered = 0
+        for provider, days, series in popular:
+            # Low priority: a user's chart never queues behind more than the render in progress
+            await self._interactive_idle.wait()
             try:
-                logger.info(f"🎨 Generating {provider} chart for last {days} days")
+                if await self.generate_chart(days, provider, wait=True, series=series, background=True):
+                    rendered += 1
+            except Exception as e:
+                logger.error(f"Error pre-rendering {provider} chart ({days} days): {e}")
+        logger.info(f"🔥 Pre-rendered {rendered}/{len(popular)} popular chart(s) in {time.perf_counter() - started:.2f}s")
 
-                # Fetch data based on provider
-                if provider == "crypto":
-                    data = await self._fetch_crypto_data(days)
-                    if not data:
-                        return None
-                    labels, values = self._parse_crypto_data(data, days)
-                    title = f"Crypto Fear & Greed Index (Last {days} Days)"
-                else:  # market
-                    data = await self._fetch_market_data(days)
-                    if not data:
-                        return None
-                    labels, values = self._parse_market_data(data, days)
-                    title = f"Stock Market Fear & Greed Index (Last {days} Days)"
+    async def close(self):
+        if self._prewarm_task:
+            self._prewarm_task.cancel()
+            await asyncio.gather(self._prewarm_task, return_exceptions=True)
 
-                if not labels or not values:
-                    logger.error("⛔ No data to generate chart")
-                    return None
+    async def _generate_chart(self, days: int, provider: str, series: Optional[str] = None) -> Optional[str]:
+        """
+        Fetch, parse and render one chart. Caller holds the lock.
+        """
+        # quickchart is only loaded once someone asks for a chart
+        from quickchart import QuickChart
 
-                # Generate chart
-                chart_config = self._generate_chart_config(labels, values, title)
+        try:
+            logger.info(f"🎨 Generating {provider} chart for last {days} days")
+
+            # Fetch data based on provider
+            if provider == "crypto":
+                data = await self._history_data("crypto")
+                if not data:
+                    return None
+                labels, values = self._parse_crypto_data(data, days)
+                title = f"Crypto Fear & Greed Index (Last {days} Days)"
+            elif series:
+                indicator = self.series_source(series)
+                if not indicator:
+                    logger.error(f"⛔ Unknown market series '{series}'")
+                    return None
+                source, series_label = indicator
+                data = await self._history_data("market")
+                if not data:
+                    return None
+                labels, values = self._parse_market_data(data, days, source)
+                title = f"{series_label} (Last {days} Days)"
+            else:  # market
+                data = await self._history_data("market")
+                if not data:
+                    return None
+                labels, values = self._parse_market_data(data, days)
+                title = f"Stock Market Fear & Greed Index (Last {days} Days)"
 
-                qc = QuickChart()
-                qc.width = 800
-                qc.height = 400
-                qc.background_color = '#1e1e1e'
-                qc.config = chart_config
+            if not labels or not values:
+                logger.error("⛔ No data to generate chart")
+                return None
 
-                # Get short URL
+            # Generate chart
+            # Cap plotted points so long windows upload and render like short ones
+            points = len(values)
+            if self.max_points and points > self.max_points:
+                labels, values = downsample(labels, values, self.max_points)
+
+            chart_config = self._generate_chart_config(labels, values, title, series_label if series else None)
+            payload_bytes = len(dumps(chart_config).encode())
+            CHART_PAYLOAD_BYTES.labels(provider).observe(payload_bytes)
+            logger.info(f"📐 Chart payload: {payload_bytes} bytes, {len(values)}/{points} points")
+
+            qc = QuickChart()
+            qc.width = 800
+            qc.height = 400
+            qc.background_color = '#1e1e1e'
+            qc.scheme = self.QUICKCHART_SCHEME
+            qc.host = self.QUICKCHART_HOST
+            qc.config = chart_config
+
+            # Get short URL (quickchart uses blocking requests, keep it off the event loop)
+            try:
+                url = await asyncio.to_thread(qc.get_short_url)
+                logger.info(f"✅ Chart generated: {url}")
+                return url
+            except Exception as url_error:
+                logger.error(f"⛔ Error getting short URL: {url_error}")
+                # Fallback to regular URL
                 try:
-                    url = qc.get_short_url()
-                    logger.info(f"✅ Chart generated: {url}")
+                    url = qc.get_url()
+                    logger.info(f"✅ Chart generated (long URL): {url[:100]}...")
                     return url
-                except Exception as url_error:
-                    logger.error(f"⛔ Error getting short URL: {url_error}")
-                    # Fallback to regular URL
-                    try:
-                        url = qc.get_url()
-                        logger.info(f"✅ Chart generated (long URL): {url[:100]}...")
-                        return url
-                    except Exception as fallback_error:
-                        logger.error(f"⛔ Error getting URL: {fallback_error}")
-                        return None
+                except Exception as fallback_error:
+                    logger.error(f"⛔ Error getting URL: {fallback_error}")
+                    return None
 
-            except Exception as e:
-                logger.error(f"⛔ Error generating chart: {e}")
-                return None
-            finally:
-                self._is_generating = False
+        except Exception as e:
+            logger.error(f"⛔ Error generating chart: {e}")
+            return None
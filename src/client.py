@@ -1,18 +1,58 @@
 import discord
 from discord.ext import commands
+import enum
 import logging
+import os
+
+from src.memory import describe_rss
+from src.metrics import NICKNAME_EDITS_TOTAL
 
 logger = logging.getLogger(__name__)
 
-class Tychra(commands.Bot):
-    def __init__(self, *args, **kwargs):
-        # Set up intents - using minimal intents to avoid privileged intent requirement
-        # Only request what we absolutely need
-        intents = discord.Intents.default()
-        intents.guilds = True  # Required to see guilds
-        # Note: members intent is privileged and must be enabled in Discord Developer Portal
-        # We can work without it by using guild.me instead of guild.get_member()
-        intents.members = False  # Set to False to avoid privileged intent requirement
+
+class NicknameEdit(enum.Enum):
+    """
+    What update_nickname did. Truthy unless the edit failed, so callers
+    can keep treating it as success.
+    """
+    CHANGED = "changed"
+    SKIPPED = "skipped"
+    FAILED = "failed"
+
+    def __bool__(self):
+        return self is not NicknameEdit.FAILED
+
+
+def low_memory_enabled():
+    return os.getenv("LOW_MEMORY", "").strip().lower() in ("1", "true", "on", "yes")
+
+
+class TychraMixin:
+    """
+    Shared behaviour for the single-connection and auto-sharded bots.
+    """
+
+    def __init__(self, *args, low_memory=None, **kwargs):
+        if low_memory is None:
+            low_memory = low_memory_enabled()
+        self.low_memory = low_memory
+
+        if low_memory:
+            # Nickname and presence updates only need guilds (guild.me is always cached);
+            # no message, member or chunking caches and no events for anything else
+            intents = discord.Intents.none()
+            intents.guilds = True
+            kwargs.setdefault("member_cache_flags", discord.MemberCacheFlags.none())
+            kwargs.setdefault("max_messages", None)
+            kwargs.setdefault("chunk_guilds_at_startup", False)
+        else:
+            # Set up intents - using minimal intents to avoid privileged intent requirement
+            # Only request what we absolutely need
+            intents = discord.Intents.default()
+            intents.guilds = True  # Required to see guilds
+            # Note: members intent is privileged and must be enabled in Discord Developer Portal
+            # We can work without it by using guild.me instead of guild.get_member()
+            intents.members = False  # Set to False to avoid privileged intent requirement
 
         super().__init__(
             command_prefix=commands.when_mentioned,  # Only respond to mentions, not messages
@@ -22,6 +62,11 @@ class Tychra(commands.Bot):
         )
 
         self.config_manager = None
+        self.alert_engine = None
+        self.updater = None
+        self.digests = None
+        # guild id -> nickname we last set; discord.py doesn't update guild.me after editing it
+        self._sent_nicknames = {}
 
     async def setup_hook(self):
         logger.info(f"Logged in as {self.user.name} ({self.user.id})")
@@ -29,10 +74,19 @@ class Tychra(commands.Bot):
 
     async def on_ready(self):
         logger.info("✨ Fate aligns — Tychra awakens!")
+        logger.info(
+            f"Memory{' (low-memory profile)' if self.low_memory else ''}: "
+            f"{describe_rss(len(self.guilds))} with {len(self.guilds)} guilds"
+        )
 
         # Log all guilds we're in
-        for guild in self.guilds:
-            logger.info(f"  - {guild.name} (ID: {guild.id})")
+        if logger.isEnabledFor(logging.DEBUG):
+            for guild in self.guilds:
+                logger.debug("  - %s (ID: %s)", guild.name, guild.id)
+
+    async def on_shard_ready(self, shard_id):
+        # Only dispatched by the auto-sharded bot
+        logger.info(f"Shard {shard_id} is ready")
 
     async def on_guild_join(self, guild):
         logger.info(f"Joined guild: {guild.name} (ID: {guild.id})")
@@ -44,33 +98,52 @@ class Tychra(commands.Bot):
     async def on_guild_remove(self, guild):
         logger.info(f"Left guild: {guild.name} (ID: {guild.id})")
 
+        self._sent_nicknames.pop(guild.id, None)
+        if self.updater:
+            self.updater.remove_guild(guild.id)
+        if self.alert_engine:
+            self.alert_engine.remove_guild(guild.id)
         if self.config_manager:
             self.config_manager.remove_guild(guild.id)
 
     async def update_nickname(self, guild, nickname):
+        """
+        Set the bot's nickname in a guild. Returns a NicknameEdit.
+        """
+        result = await self._update_nickname(guild, nickname)
+        NICKNAME_EDITS_TOTAL.labels(result.value).inc()
+        return result
+
+    async def _update_nickname(self, guild, nickname):
         try:
             member = guild.me
             if not member:
-                logger.warning(f"Bot not found in guild {guild.name}")
-                return False
+                logger.warning("Bot not found in guild %s", guild.name)
+                return NicknameEdit.FAILED
 
             # Check if nickname is too long
             if len(nickname) > 32:
-                logger.warning(f"Nickname too long for {guild.name}, truncating")
+                logger.warning("Nickname too long for %s, truncating", guild.name)
                 nickname = nickname[:32]
 
+            # Skip the REST call (and its rate limit budget) when nothing changed. Before our
+            # first edit the gateway's copy of the bot's member is current
+            if self._sent_nicknames.get(guild.id, member.nick) == nickname:
+                return NicknameEdit.SKIPPED
+
             await member.edit(nick=nickname)
-            logger.info(f"Updated nickname in {guild.name} to: {nickname}")
-            return True
+            self._sent_nicknames[guild.id] = nickname
+            logger.debug("Updated nickname in %s to: %s", guild.name, nickname)
+            return NicknameEdit.CHANGED
 
         except discord.Forbidden:
             logger.warning(f"Missing permissions to change nickname in {guild.name}")
-            return False
+            return NicknameEdit.FAILED
         except Exception as e:
             logger.error(f"Error updating nickname in {guild.name}: {e}")
-            return False
+            return NicknameEdit.FAILED
 
-    async def update_status(self, status_text, emotion=None, activity_type="custom"):
+    async def update_status(self, status_text, emotion=None, activity_type="custom", shard_id=None):
         try:
             # Use custom status by default (like user's status message)
             if activity_type == "custom":
@@ -96,15 +169,42 @@ class Tychra(commands.Bot):
             else:
                 status = discord.Status.online
 
-            # Update presence
-            await self.change_presence(status=status, activity=activity)
-            logger.info(f"Updated status to: {status_text} (presence: {status.name})")
+            # Update presence (per shard when sharded, so a guild only touches its own connection)
+            if shard_id is not None and isinstance(self, commands.AutoShardedBot):
+                await self.change_presence(status=status, activity=activity, shard_id=shard_id)
+            else:
+                await self.change_presence(status=status, activity=activity)
+            logger.debug("Updated status to: %s (presence: %s)", status_text, status.name)
             return True
 
         except Exception as e:
             logger.error(f"Error updating status: {e}")
             return False
 
-def create_bot():
-    bot = Tychra()
+class Tychra(TychraMixin, commands.Bot):
+    pass
+
+
+class ShardedTychra(TychraMixin, commands.AutoShardedBot):
+    """
+    Tychra running several gateway shards inside one process.
+    """
+    pass
+
+
+def create_bot(sharded=False, shard_ids=None, shard_count=None):
+    """
+    Create the bot. With sharded=True an AutoShardedBot is returned;
+    shard_ids/shard_count pin this process to a range of shards.
+    """
+    if not sharded:
+        return Tychra()
+
+    kwargs = {}
+    if shard_count is not None:
+        kwargs["shard_count"] = shard_count
+    if shard_ids is not None:
+        kwargs["shard_ids"] = list(shard_ids)
+
+    bot = ShardedTychra(**kwargs)
     return bot
@@ -0,0 +1,103 @@
+import hashlib
+import json
+import logging
+import os
+
+import discord
+
+from src.file_lock import atomic_write
+
+logger = logging.getLogger(__name__)
+
+
+def command_tree_fingerprint(tree, guild=None):
+    """
+    Stable hash of the commands Discord would receive for a scope:
+    names, descriptions, options, choices and permissions.
+    """
+    payload = sorted(
+        (command.to_dict(tree) for command in tree.get_commands(guild=guild)),
+        key=lambda command: (command.get("type", 1), command["name"])
+    )
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class CommandSyncer:
+    """
+    Syncs the application command tree only when its fingerprint differs
+    from the one recorded after the last successful sync.
+
+    COMMAND_SYNC        - "auto" (default), "force" to always sync, "off" to never sync
+    COMMAND_SYNC_FILE   - where fingerprints are stored (default: command_sync.json)
+    DEV_GUILD_IDS       - comma-separated guild ids; when set, commands are synced to
+                          these guilds only (instant updates while developing)
+    """
+
+    def __init__(self, path=None, mode=None, dev_guild_ids=None):
+        self.path = path or os.getenv("COMMAND_SYNC_FILE", "command_sync.json").strip() or "command_sync.json"
+        self.mode = (mode or os.getenv("COMMAND_SYNC", "auto")).strip().lower()
+        if dev_guild_ids is None:
+            dev_guild_ids = [
+                int(guild_id) for guild_id in os.getenv("DEV_GUILD_IDS", "").split(",")
+                if guild_id.strip().isdigit()
+            ]
+        self.dev_guild_ids = dev_guild_ids
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable command sync file {self.path}: {e}")
+            return {}
+
+    def _save(self, fingerprints):
+        try:
+            atomic_write(self.path, json.dumps(fingerprints, indent=2, sort_keys=True))
+        except Exception as e:
+            logger.error(f"Error saving command sync file: {e}")
+
+    async def sync(self, bot):
+        """
+        Sync every scope whose fingerprint changed. Returns the number of scopes synced.
+        """
+        if self.mode == "off":
+            logger.info("Command sync disabled (COMMAND_SYNC=off)")
+            return 0
+
+        if self.dev_guild_ids:
+            scopes = [discord.Object(id=guild_id) for guild_id in self.dev_guild_ids]
+            for guild in scopes:
+                bot.tree.copy_global_to(guild=guild)
+        else:
+            scopes = [None]
+
+        fingerprints = self._load()
+        synced = {}
+
+        for guild in scopes:
+            # Keyed by application so several bot identities can share one file
+            key = f"{bot.application_id}:{guild.id if guild else 'global'}"
+            fingerprint = command_tree_fingerprint(bot.tree, guild=guild)
+            scope_name = f"guild {guild.id}" if guild else "global"
+
+            if self.mode != "force" and fingerprints.get(key) == fingerprint:
+                logger.info(f"✅ Commands unchanged ({scope_name}), skipping sync")
+                continue
+
+            try:
+                commands = await bot.tree.sync(guild=guild)
+                synced[key] = fingerprint
+                logger.info(f"🔄 Synced {len(commands)} command(s) ({scope_name})")
+            except Exception as e:
+                logger.error(f"⛔ Failed to sync commands ({scope_name}): {e}")
+
+        if synced:
+            # Re-read before saving: other identities may have synced in the meantime
+            fingerprints = self._load()
+            fingerprints.update(synced)
+            self._save(fingerprints)
+        return len(synced)
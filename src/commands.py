@@ -1,32 +1,83 @@
+import asyncio
 import discord
 from discord import app_commands
 from discord.ext import commands
 import logging
+import os
+
+from src.alerts import describe_alert, is_threshold_key
+from src.command_sync import CommandSyncer
+from src.config_manager import template_providers
+from src.profiler import PROFILER
+from src.update_queue import GuildUpdateQueue
 
 logger = logging.getLogger(__name__)
 
+# Discord accepts up to 10 attachments per message
+MAX_ATTACHMENTS = 10
+
 class CommandsCog(commands.Cog):
-    def __init__(self, bot, config_manager, chart_generator=None):
+    def __init__(self, bot, config_manager, chart_generator=None, updater=None, update_queue=None, alert_engine=None):
         self.bot = bot
         self.config_manager = config_manager
         self.chart_generator = chart_generator
+        self.alert_engine = alert_engine
 
-    async def _perform_update(self, guild_id):
-        from src.updater import Updater
-        updater = Updater(self.bot, self.config_manager)
-        return await updater.update_guild(guild_id)
+        if updater is None:
+            from src.updater import Updater
+            updater = Updater(bot, config_manager)
+        self.updater = updater
+        self.update_queue = update_queue or GuildUpdateQueue(updater)
 
-    async def _update_and_respond(self, interaction, success_msg, error_msg=None):
+        # /export splits files above this size (Discord's default upload limit is 10 MiB)
+        try:
+            self.export_part_bytes = int(float(os.getenv("EXPORT_MAX_FILE_MB", "8")) * 1024 * 1024)
+        except ValueError:
+            logger.warning("Invalid EXPORT_MAX_FILE_MB, using 8")
+            self.export_part_bytes = 8 * 1024 * 1024
+
+    def _preview(self, guild_id):
+        """
+        Render the guild's templates from the cached provider snapshot.
+        """
+        if not self.updater.provider_cache:
+            return None
+        config = self.config_manager.get_guild_config(guild_id)
+        nickname = self.updater.render_template(config.get("nickname_template", ""))[:32]
+        status = self.updater.render_template(config.get("status_template", ""))
+        return nickname, status
+
+    def _needs_fetch(self, template):
+        """
+        True when the template uses a provider the snapshot doesn't have yet,
+        e.g. a JSON provider no guild used before.
+        """
+        if not self.updater:
+            return False
+        return not template_providers(template) <= set(self.updater.hub.snapshot)
+
+    async def _queue_and_respond(self, interaction, success_msg, refresh=False):
+        """
+        Queue a debounced update and reply right away with a preview.
+        """
+        guild_id = interaction.guild.id
         try:
-            await self._perform_update(interaction.guild.id)
+            self.update_queue.request(guild_id, refresh=refresh)
+        except Exception as e:
+            logger.error(f"Error queueing update: {e}")
             await interaction.followup.send(
-                f"{success_msg}\n🔄 Updated successfully!",
+                f"{success_msg}\n⚠️ Update will be applied on next scheduled run.",
                 ephemeral=True
             )
-        except Exception as e:
-            logger.error(f"Error during update: {e}")
-            fallback = error_msg or f"{success_msg}\n⚠️ Update will be applied on next scheduled run."
-            await interaction.followup.send(fallback, ephemeral=True)
+            return
+
+        preview = self._preview(guild_id)
+        lines = [success_msg]
+        if preview:
+            nickname, status = preview
+            lines.append(f"👀 Preview: **{nickname}** • {status}")
+        lines.append(f"🔄 Applying in ~{self.update_queue.window:.0f}s.")
+        await interaction.followup.send("\n".join(lines), ephemeral=True)
 
     @app_commands.command(name="setnickname", description="Set the bot's nickname template")
     @app_commands.default_permissions(administrator=True)
@@ -49,9 +100,10 @@ class CommandsCog(commands.Cog):
         )
 
         if success:
-            await self._update_and_respond(
+            await self._queue_and_respond(
                 interaction,
-                f"✅ Nickname template updated to: `{template}`"
+                f"✅ Nickname template updated to: `{template}`",
+                refresh=self._needs_fetch(template)
             )
         else:
             await interaction.followup.send(
@@ -73,9 +125,10 @@ class CommandsCog(commands.Cog):
         )
 
         if success:
-            await self._update_and_respond(
+            await self._queue_and_respond(
                 interaction,
-                f"✅ Status template updated to: `{template}`"
+                f"✅ Status template updated to: `{template}`",
+                refresh=self._needs_fetch(template)
             )
         else:
             await interaction.followup.send(
@@ -112,12 +165,15 @@ class CommandsCog(commands.Cog):
                 "`{m.index}` - Index value (0-100)\n"
                 "`{m.emotion}` - Emotion label\n"
                 "`{m.emoji}` - Emotion emoji\n"
-                "`{m.trend}` - Trend indicator\n\n"
+                "`{m.trend}` - Trend indicator\n"
+                "`{m.putcall}`, `{m.vix_rating}`, `{m.vix_value}`... - Components (see README)\n\n"
                 "**Crypto Market (c):**\n"
                 "`{c.index}` - Index value (0-100)\n"
                 "`{c.emotion}` - Emotion label\n"
                 "`{c.emoji}` - Emotion emoji\n"
                 "`{c.trend}` - Trend indicator\n"
+                "\n**Rolling stats (m or c):**\n"
+                "`{m.avg7}` `{m.chg1d}` `{c.min30}` `{m.pctile90}` `{c.spark7}`...\n"
             ),
             inline=False
         )
@@ -130,16 +186,251 @@ class CommandsCog(commands.Cog):
 
         await interaction.response.defer(ephemeral=True)
 
-        try:
-            success = await self._perform_update(interaction.guild.id)
+        # Refetch provider data, then update with the latest config
+        await self._queue_and_respond(interaction, "✅ Update queued with fresh data.", refresh=True)
 
-            if success:
-                await interaction.followup.send("✅ Update completed successfully!", ephemeral=True)
-            else:
-                await interaction.followup.send("⚠️ Update completed with some errors. Check logs.", ephemeral=True)
-        except Exception as e:
-            logger.error(f"Error in force update: {e}")
-            await interaction.followup.send(f"❌ Error during update: {str(e)}", ephemeral=True)
+    @app_commands.command(name="addalert", description="Post a message when an index crosses a threshold or changes")
+    @app_commands.default_permissions(administrator=True)
+    @app_commands.describe(
+        provider="Data source",
+        key="Value to watch (e.g., index, emotion)",
+        condition="When to fire",
+        value="Threshold for below/above (e.g., 25)",
+        channel="Channel to post in (default: this channel)"
+    )
+    @app_commands.choices(
+        provider=[
+            app_commands.Choice(name="Stock Market (m)", value="m"),
+            app_commands.Choice(name="Crypto Market (c)", value="c")
+        ],
+        condition=[
+            app_commands.Choice(name="Crosses below", value="below"),
+            app_commands.Choice(name="Crosses above", value="above"),
+            app_commands.Choice(name="Changes", value="changes")
+        ]
+    )
+    async def add_alert(
+        self,
+        interaction: discord.Interaction,
+        provider: app_commands.Choice[str],
+        key: str,
+        condition: app_commands.Choice[str],
+        value: float = None,
+        channel: discord.TextChannel = None
+    ):
+        if not self.alert_engine:
+            await interaction.response.send_message("❌ Alerts are not available.", ephemeral=True)
+            return
+
+        key = key.strip().lower()
+        available = self.updater.hub.available_keys(provider.value)
+        if key not in available:
+            await interaction.response.send_message(
+                f"❌ Unknown key `{key}`. Available: {', '.join(f'`{k}`' for k in sorted(available))}",
+                ephemeral=True
+            )
+            return
+
+        if condition.value != "changes" and value is None:
+            await interaction.response.send_message(
+                "❌ A threshold value is required for below/above alerts.",
+                ephemeral=True
+            )
+            return
+
+        current = self.updater.hub.snapshot.get(provider.value, {}).get(key)
+        if condition.value != "changes" and not is_threshold_key(key, current):
+            await interaction.response.send_message(
+                f"❌ `{key}` isn't a number (currently `{current}`), so it can only be watched with **Changes**."
+                if current is not None else
+                f"❌ `{key}` isn't a number, so it can only be watched with **Changes**.",
+                ephemeral=True
+            )
+            return
+
+        channel_id = (channel or interaction.channel).id
+        rule = self.alert_engine.add(
+            interaction.guild.id, provider.value, key, condition.value, value, channel_id, current=current
+        )
+
+        if rule:
+            await interaction.response.send_message(
+                f"✅ Alert #{rule['id']} added: **{describe_alert(rule)}** → <#{channel_id}>",
+                ephemeral=True
+            )
+        else:
+            await interaction.response.send_message(
+                "❌ This server has reached the maximum number of alerts (25).",
+                ephemeral=True
+            )
+
+    @app_commands.command(name="alerts", description="List this server's alerts")
+    @app_commands.default_permissions(administrator=True)
+    async def list_alerts(self, interaction):
+        alerts = self.config_manager.get_guild_alerts(interaction.guild.id)
+        if not alerts:
+            await interaction.response.send_message("ℹ️ No alerts set. Use `/addalert` to add one.", ephemeral=True)
+            return
+
+        lines = [f"#{alert['id']} **{describe_alert(alert)}** → <#{alert['channel_id']}>" for alert in alerts]
+        await interaction.response.send_message("🔔 Alerts:\n" + "\n".join(lines), ephemeral=True)
+
+    @app_commands.command(name="removealert", description="Remove an alert")
+    @app_commands.default_permissions(administrator=True)
+    @app_commands.describe(alert_id="Alert number from /alerts")
+    async def remove_alert(self, interaction, alert_id: int):
+        if not self.alert_engine:
+            await interaction.response.send_message("❌ Alerts are not available.", ephemeral=True)
+            return
+
+        rule = self.alert_engine.remove(interaction.guild.id, alert_id)
+        if rule:
+            await interaction.response.send_message(
+                f"✅ Removed alert #{alert_id}: {describe_alert(rule)}",
+                ephemeral=True
+            )
+        else:
+            await interaction.response.send_message(f"❌ Alert #{alert_id} not found.", ephemeral=True)
+
+    @app_commands.command(name="adddigest", description="Post a daily or weekly digest with a chart in a channel")
+    @app_commands.default_permissions(administrator=True)
+    @app_commands.describe(
+        provider="Data source",
+        frequency="How often to post",
+        days="Days shown in the chart (default: 7, max: 365)",
+        channel="Channel to post in (default: this channel)"
+    )
+    @app_commands.choices(
+        provider=[
+            app_commands.Choice(name="Stock Market (m)", value="m"),
+            app_commands.Choice(name="Crypto Market (c)", value="c")
+        ],
+        frequency=[
+            app_commands.Choice(name="Daily", value="daily"),
+            app_commands.Choice(name="Weekly", value="weekly")
+        ]
+    )
+    async def add_digest(
+        self,
+        interaction: discord.Interaction,
+        provider: app_commands.Choice[str],
+        frequency: app_commands.Choice[str],
+        days: int = 7,
+        channel: discord.TextChannel = None
+    ):
+        if days < 1 or days > 365:
+            await interaction.response.send_message("❌ Days must be between 1 and 365.", ephemeral=True)
+            return
+
+        channel_id = (channel or interaction.channel).id
+        digest = self.config_manager.add_guild_digest(interaction.guild.id, {
+            "provider": provider.value,
+            "frequency": frequency.value,
+            "days": days,
+            "channel_id": channel_id
+        })
+
+        if digest:
+            # The schedule only runs once there is something to send
+            if self.bot.digests:
+                self.bot.digests.start()
+            await interaction.response.send_message(
+                f"✅ Digest #{digest['id']} added: {frequency.name.lower()} {provider.name} "
+                f"with a {days}-day chart → <#{channel_id}>",
+                ephemeral=True
+            )
+        else:
+            await interaction.response.send_message(
+                "❌ This server has reached the maximum number of digests (5).",
+                ephemeral=True
+            )
+
+    @app_commands.command(name="digests", description="List this server's digests")
+    @app_commands.default_permissions(administrator=True)
+    async def list_digests(self, interaction):
+        digests = self.config_manager.get_guild_digests(interaction.guild.id)
+        if not digests:
+            await interaction.response.send_message("ℹ️ No digests set. Use `/adddigest` to add one.", ephemeral=True)
+            return
+
+        lines = [
+            f"#{digest['id']} {digest['frequency']} `{digest['provider']}`, {digest['days']} days → <#{digest['channel_id']}>"
+            for digest in digests
+        ]
+        await interaction.response.send_message("📰 Digests:\n" + "\n".join(lines), ephemeral=True)
+
+    @app_commands.command(name="removedigest", description="Remove a digest")
+    @app_commands.default_permissions(administrator=True)
+    @app_commands.describe(digest_id="Digest number from /digests")
+    async def remove_digest(self, interaction, digest_id: int):
+        if self.config_manager.remove_guild_digest(interaction.guild.id, digest_id):
+            await interaction.response.send_message(f"✅ Removed digest #{digest_id}.", ephemeral=True)
+        else:
+            await interaction.response.send_message(f"❌ Digest #{digest_id} not found.", ephemeral=True)
+
+    @app_commands.command(name="profile", description="Profile the next update runs or charts (bot owner only)")
+    @app_commands.default_permissions(administrator=True)
+    @app_commands.describe(
+        action="Arm the profiler, or fetch the latest capture",
+        target="What to profile (default: update)",
+        runs="Number of runs to capture (default: 1, max: 10)",
+        mode="cProfile (exact, heavier) or stack sampling (default: cProfile)"
+    )
+    @app_commands.choices(
+        action=[
+            app_commands.Choice(name="Arm", value="arm"),
+            app_commands.Choice(name="Latest capture", value="latest")
+        ],
+        target=[
+            app_commands.Choice(name="Scheduled updates", value="update"),
+            app_commands.Choice(name="Charts", value="chart")
+        ],
+        mode=[
+            app_commands.Choice(name="cProfile", value="cprofile"),
+            app_commands.Choice(name="Sampling", value="sample")
+        ]
+    )
+    async def profile(
+        self,
+        interaction: discord.Interaction,
+        action: app_commands.Choice[str],
+        target: app_commands.Choice[str] = None,
+        runs: int = 1,
+        mode: app_commands.Choice[str] = None
+    ):
+        if not await self.bot.is_owner(interaction.user):
+            await interaction.response.send_message(
+                "❌ Only the bot owner can use this command.",
+                ephemeral=True
+            )
+            return
+
+        if action.value == "latest":
+            capture = PROFILER.last_capture
+            if not capture:
+                await interaction.response.send_message("ℹ️ No profile captured yet.", ephemeral=True)
+                return
+
+            await interaction.response.send_message(
+                f"🔬 Latest `{capture['target']}` profile:\n```\n{capture['summary'][:1800]}\n```",
+                file=discord.File(capture["path"], filename=os.path.basename(capture["path"])),
+                ephemeral=True
+            )
+            return
+
+        if runs < 1 or runs > 10:
+            await interaction.response.send_message("❌ Runs must be between 1 and 10.", ephemeral=True)
+            return
+
+        target_value = target.value if target else "update"
+        mode_value = mode.value if mode else "cprofile"
+        PROFILER.arm(target_value, runs, mode_value)
+
+        await interaction.response.send_message(
+            f"🔬 Profiling the next {runs} `{target_value}` run(s) with {mode_value}. "
+            f"Use `/profile action:Latest capture` to download the result.",
+            ephemeral=True
+        )
 
     @app_commands.command(name="about", description="Show bot information")
     async def about(self, interaction):
@@ -171,7 +462,10 @@ class CommandsCog(commands.Cog):
                 "`/setstatus` - Set status template\n"
                 "`/showtemplates` - View current templates\n"
                 "`/forceupdate` - Trigger immediate update\n"
+                "`/addalert` - Alert on index thresholds or changes\n"
+                "`/adddigest` - Daily or weekly digest with a chart\n"
                 "`/chart` - Generate F&G Index chart\n"
+                "`/export` - Download F&G history as CSV or JSON Lines\n"
                 "`/about` - Show this information"
             ),
             inline=False
@@ -190,7 +484,8 @@ class CommandsCog(commands.Cog):
     @app_commands.command(name="chart", description="Generate Fear & Greed Index chart")
     @app_commands.describe(
         days="Number of days to show (default: 10, max: 365)",
-        provider="Data source: market (stocks) or crypto (default: market)"
+        provider="Data source: market (stocks) or crypto (default: market)",
+        series="Stock market component to chart instead of the index (e.g., putcall, vix)"
     )
     @app_commands.choices(provider=[
         app_commands.Choice(name="Stock Market", value="market"),
@@ -200,7 +495,8 @@ class CommandsCog(commands.Cog):
         self, 
         interaction: discord.Interaction,
         days: int = 10,
-        provider: app_commands.Choice[str] = None
+        provider: app_commands.Choice[str] = None,
+        series: str = None
     ):
         """Generate and display Fear & Greed Index chart."""
 
@@ -227,8 +523,16 @@ class CommandsCog(commands.Cog):
             )
             return
 
-        # Check if chart generation is already in progress
-        if await self.chart_generator.is_busy():
+        if series and provider and provider.value != "market":
+            await interaction.response.send_message(
+                "❌ Component series are only available for the stock market.",
+                ephemeral=True
+            )
+            return
+
+        # Check if chart generation is already in progress (ready charts are served regardless)
+        provider_value = provider.value if provider else "market"
+        if not self.chart_generator.cached_chart(days, provider_value, series) and await self.chart_generator.is_busy():
             await interaction.response.send_message(
                 "⏳ Chart generation is already in progress. Please try again in a moment.",
                 ephemeral=True
@@ -238,24 +542,24 @@ class CommandsCog(commands.Cog):
         await interaction.response.defer(ephemeral=True)
 
         try:
-            # Determine provider
-            provider_value = provider.value if provider else "market"
             provider_name = "Stock Market" if provider_value == "market" else "Cryptocurrency"
             
             logger.info(f"📊 Generating {provider_name} chart for {days} days (requested by {interaction.user})")
             
-            # Generate chart
-            chart_url = await self.chart_generator.generate_chart(days, provider_value)
-            
+            chart_url = await self.chart_generator.generate_chart(days, provider_value, series=series)
+
+            # Followups go through the interaction webhook, outside the budget waves share, so no lane slot
             if chart_url:
+                # Component charts are titled after their indicator, e.g. "Put/Call Options"
+                source = self.chart_generator.series_source(series) if series else None
                 embed = discord.Embed(
-                    title=f"📈 {provider_name} Fear & Greed Index",
+                    title=f"📈 {source[1]}" if source else f"📈 {provider_name} Fear & Greed Index",
                     description=f"Showing last {days} day{'s' if days != 1 else ''}",
                     color=discord.Color.blue()
                 )
                 embed.set_image(url=chart_url)
                 embed.set_footer(text=f"Requested by {interaction.user.display_name}")
-                
+
                 await interaction.followup.send(embed=embed, ephemeral=True)
             else:
                 await interaction.followup.send(
@@ -269,6 +573,103 @@ class CommandsCog(commands.Cog):
                 ephemeral=True
             )
 
+    @chart.autocomplete("series")
+    async def chart_series_autocomplete(self, interaction: discord.Interaction, current: str):
+        from providers import MarketProvider
+        current = current.lower()
+        return [
+            app_commands.Choice(name=label, value=alias)
+            for alias, label in MarketProvider.INDICATORS.values()
+            if current in alias or current in label.lower()
+        ][:25]
+
+    @app_commands.command(name="export", description="Export Fear & Greed history as a compressed CSV or JSON Lines file")
+    @app_commands.describe(
+        days="Number of days to export (default: 365, max: 365)",
+        provider="Data source: market (stocks) or crypto (default: market)",
+        format="File format (default: csv)",
+        series="Stock market component to export instead of the index (e.g., putcall, vix)"
+    )
+    @app_commands.choices(
+        provider=[
+            app_commands.Choice(name="Stock Market", value="market"),
+            app_commands.Choice(name="Cryptocurrency", value="crypto")
+        ],
+        format=[
+            app_commands.Choice(name="CSV", value="csv"),
+            app_commands.Choice(name="JSON Lines", value="jsonl")
+        ]
+    )
+    async def export(
+        self,
+        interaction: discord.Interaction,
+        days: int = 365,
+        provider: app_commands.Choice[str] = None,
+        format: app_commands.Choice[str] = None,
+        series: str = None
+    ):
+        """Stream history into gzip attachments."""
+        from src.export import build_export
+
+        if not self.chart_generator:
+            await interaction.response.send_message("❌ Export is not available.", ephemeral=True)
+            return
+
+        max_days = self.chart_generator.MAX_DAYS
+        if days < 1 or days > max_days:
+            await interaction.response.send_message(
+                f"❌ Number of days must be between 1 and {max_days}.",
+                ephemeral=True
+            )
+            return
+
+        provider_value = provider.value if provider else "market"
+        if series and provider_value != "market":
+            await interaction.response.send_message(
+                "❌ Component series are only available for the stock market.",
+                ephemeral=True
+            )
+            return
+
+        await interaction.response.defer(ephemeral=True)
+
+        fmt = format.value if format else "csv"
+        parts = []
+        try:
+            rows = await self.chart_generator.history_rows(days, provider_value, series)
+            if rows is None:
+                await interaction.followup.send("❌ History is unavailable. Please try again later.", ephemeral=True)
+                return
+
+            basename = f"tychra-{provider_value}{f'-{series}' if series else ''}-{days}d"
+            # Encoding and compression run off the event loop
+            parts = await asyncio.to_thread(build_export, rows, fmt, basename, self.export_part_bytes)
+            if not parts:
+                await interaction.followup.send("❌ No history to export.", ephemeral=True)
+                return
+
+            total_rows = sum(part.rows for part in parts)
+            logger.info(f"📤 Exported {total_rows} {provider_value} rows as {len(parts)} {fmt} file(s) for {interaction.user}")
+            # Interaction followups go through the webhook, not the budget waves share, so no lane slot
+            for i in range(0, len(parts), MAX_ATTACHMENTS):
+                batch = parts[i:i + MAX_ATTACHMENTS]
+                content = f"📤 {total_rows} rows, {len(parts)} file(s), gzip-compressed" if i == 0 else None
+                await interaction.followup.send(
+                    content=content,
+                    files=[discord.File(part.file, filename=part.filename) for part in batch],
+                    ephemeral=True
+                )
+        except Exception as e:
+            logger.error(f"Error exporting history: {e}")
+            await interaction.followup.send(f"❌ Error exporting history: {str(e)}", ephemeral=True)
+        finally:
+            for part in parts:
+                part.close()
+
+    @export.autocomplete("series")
+    async def export_series_autocomplete(self, interaction: discord.Interaction, current: str):
+        return await self.chart_series_autocomplete(interaction, current)
+
     async def cog_app_command_error(self, interaction: discord.Interaction, error: app_commands.AppCommandError):
         if isinstance(error, app_commands.MissingPermissions):
             await interaction.response.send_message(
@@ -288,18 +689,14 @@ class CommandsCog(commands.Cog):
                     ephemeral=True
                 )
 
-async def setup_commands(bot, config_manager, chart_generator=None):
+async def setup_commands(bot, config_manager, chart_generator=None, updater=None, update_queue=None, alert_engine=None):
     # Check if cog is already loaded (happens on reconnect)
     if bot.get_cog("CommandsCog") is not None:
         logger.info("✅ Commands already loaded, skipping setup")
         return
 
-    cog = CommandsCog(bot, config_manager, chart_generator)
+    cog = CommandsCog(bot, config_manager, chart_generator, updater, update_queue, alert_engine)
     await bot.add_cog(cog)
 
-    # Sync commands with Discord
-    try:
-        synced = await bot.tree.sync()
-        logger.info(f"🔄 Synced {len(synced)} command(s)")
-    except Exception as e:
-        logger.error(f"⛔ Failed to sync commands: {e}")
+    # Sync commands with Discord, only if the command tree changed since the last sync
+    await CommandSyncer().sync(bot)
@@ -1,10 +1,24 @@
-import json
+import functools
 import logging
 import os
+import re
 from typing import Dict
 
+from src.backends import dumps, loads
+from src.file_lock import FileLock, atomic_write
+from src.guild_config import GuildConfig
+
 logger = logging.getLogger(__name__)
 
+
+@functools.lru_cache(maxsize=1024)
+def template_providers(template):
+    """
+    Provider names in a template's {provider.key} placeholders.
+    """
+    return frozenset(re.findall(r'\{(\w+)\.\w+\}', template or ""))
+
+
 class ConfigManager:
     
     DEFAULT_CONFIG = {
@@ -13,16 +27,39 @@ class ConfigManager:
         "timezone": "UTC"
     }
     
-    def __init__(self, config_file = "guild_config.json"):
+    def __init__(self, config_file = "guild_config.json", shared = False, defaults = None):
         self.config_file = config_file
-        self.configs: Dict[str, dict] = {}
+        # Per-identity default templates layered over DEFAULT_CONFIG, stored once
+        # and shared by every guild that hasn't changed them
+        self.default_config = GuildConfig.from_dict({**self.DEFAULT_CONFIG, **(defaults or {})})
+        # shared=True when several shard processes write the same file
+        self.shared = shared
+        self.configs: Dict[int, GuildConfig] = {}
+        self._dirty = set()
+        self._removed = set()
         self._load_config()
+
+    @staticmethod
+    def _from_json(data):
+        """
+        The on-disk {"<guild id>": {...}} mapping as int-keyed records.
+        """
+        configs = {}
+        for guild_id_str, config in data.items():
+            try:
+                configs[int(guild_id_str)] = GuildConfig.from_dict(config)
+            except (TypeError, ValueError) as e:
+                logger.warning(f"Skipping invalid config entry for guild {guild_id_str}: {e}")
+        return configs
+
+    def _to_json(self):
+        return {str(guild_id): config.to_dict() for guild_id, config in self.configs.items()}
     
     def _load_config(self):
         if os.path.exists(self.config_file):
             try:
-                with open(self.config_file, 'r') as f:
-                    self.configs = json.load(f)
+                with open(self.config_file, 'rb') as f:
+                    self.configs = self._from_json(loads(f.read()))
                 logger.info(f"Loaded config for {len(self.configs)} guilds")
             except Exception as e:
                 logger.error(f"Error loading config: {e}")
@@ -33,19 +70,57 @@ class ConfigManager:
     
     def _save_config(self):
         try:
-            with open(self.config_file, 'w') as f:
-                json.dump(self.configs, f, indent=2)
+            if self.shared:
+                self._save_shared_config()
+            else:
+                with open(self.config_file, 'w', encoding='utf-8') as f:
+                    f.write(dumps(self._to_json(), indent=True))
             logger.info(f"Saved config for {len(self.configs)} guilds")
         except Exception as e:
             logger.error(f"Error saving config: {e}")
+
+    def _save_shared_config(self):
+        """
+        Merge our changes into the file on disk under a lock, so shard
+        processes don't overwrite each other's guilds.
+        """
+        with FileLock(f"{self.config_file}.lock"):
+            on_disk = {}
+            if os.path.exists(self.config_file):
+                with open(self.config_file, 'rb') as f:
+                    on_disk = loads(f.read())
+
+            for guild_id in self._removed:
+                on_disk.pop(str(guild_id), None)
+            for guild_id in self._dirty:
+                if guild_id in self.configs:
+                    on_disk[str(guild_id)] = self.configs[guild_id].to_dict()
+
+            atomic_write(self.config_file, dumps(on_disk, indent=True))
+
+        self.configs = self._from_json(on_disk)
+        self._dirty.clear()
+        self._removed.clear()
+
+    def _set_config(self, guild_id, config):
+        self.configs[guild_id] = config
+        # Only the shared merge needs to know what changed; a private file is rewritten whole
+        if self.shared:
+            self._dirty.add(guild_id)
+        self._save_config()
     
     def get_guild_config(self, guild_id):
-        guild_id_str = str(guild_id)
-        if guild_id_str not in self.configs:
+        """
+        The guild's GuildConfig record. Records are immutable, so this is
+        the stored object itself rather than a copy.
+        """
+        guild_id = int(guild_id)
+        config = self.configs.get(guild_id)
+        if config is None:
             # Initialize with default config
-            self.configs[guild_id_str] = self.DEFAULT_CONFIG.copy()
-            self._save_config()
-        return self.configs[guild_id_str].copy()
+            config = self.default_config
+            self._set_config(guild_id, config)
+        return config
     
     def set_guild_template(self, guild_id, template_type, template):
         """
@@ -53,34 +128,108 @@ class ConfigManager:
         template_type: 'nickname' or 'status'
         Returns True if successful.
         """
-        guild_id_str = str(guild_id)
-        
-        if guild_id_str not in self.configs:
-            self.configs[guild_id_str] = self.DEFAULT_CONFIG.copy()
+        guild_id = int(guild_id)
+        config = self.configs.get(guild_id, self.default_config)
         
         if template_type == "nickname":
             # Validate nickname length (Discord limit is 32 chars)
             if len(template) > 32:
                 logger.warning(f"Nickname template too long for guild {guild_id}")
                 return False
-            self.configs[guild_id_str]["nickname_template"] = template
+            config = config.replace(nickname_template=template)
         elif template_type == "status":
-            self.configs[guild_id_str]["status_template"] = template
+            config = config.replace(status_template=template)
         else:
             logger.error(f"Invalid template type: {template_type}")
             return False
         
-        self._save_config()
+        self._set_config(guild_id, config)
         logger.info(f"Updated {template_type} template for guild {guild_id}")
         return True
     
+    def _get_guild_items(self, guild_id, field):
+        config = self.configs.get(int(guild_id))
+        return [dict(item) for item in config.get(field, ())] if config else []
+
+    def _add_guild_item(self, guild_id, field, item, limit):
+        """
+        Append a rule to a guild's list under `field` with a per-guild id.
+        Returns the stored item, or None if the guild has `limit` items already.
+        """
+        guild_id = int(guild_id)
+        config = self.configs.get(guild_id, self.default_config)
+
+        items = config.get(field, ())
+        if len(items) >= limit:
+            logger.warning(f"Limit of {limit} {field} reached for guild {guild_id}")
+            return None
+
+        item = dict(item, id=max((existing["id"] for existing in items), default=0) + 1)
+        self._set_config(guild_id, config.replace(**{field: items + (item,)}))
+        logger.info(f"Added {field} #{item['id']} for guild {guild_id}")
+        return dict(item)
+
+    def _remove_guild_item(self, guild_id, field, item_id):
+        """
+        Returns the removed item, or None if not found.
+        """
+        guild_id = int(guild_id)
+        config = self.configs.get(guild_id)
+        items = config.get(field, ()) if config else ()
+        removed = next((item for item in items if item["id"] == item_id), None)
+        if removed is None:
+            return None
+
+        remaining = tuple(item for item in items if item["id"] != item_id)
+        self._set_config(guild_id, config.replace(**{field: remaining}))
+        logger.info(f"Removed {field} #{item_id} for guild {guild_id}")
+        return dict(removed)
+
+    def _iter_items(self, field):
+        for guild_id, config in self.configs.items():
+            for item in config.get(field, ()):
+                yield guild_id, dict(item)
+
+    def get_guild_alerts(self, guild_id):
+        return self._get_guild_items(guild_id, "alerts")
+
+    def add_guild_alert(self, guild_id, alert, limit=25):
+        return self._add_guild_item(guild_id, "alerts", alert, limit)
+
+    def remove_guild_alert(self, guild_id, alert_id):
+        return self._remove_guild_item(guild_id, "alerts", alert_id)
+
+    def iter_alerts(self):
+        """
+        Yield (guild_id, rule) for every stored alert rule.
+        """
+        return self._iter_items("alerts")
+
+    def get_guild_digests(self, guild_id):
+        return self._get_guild_items(guild_id, "digests")
+
+    def add_guild_digest(self, guild_id, digest, limit=5):
+        return self._add_guild_item(guild_id, "digests", digest, limit)
+
+    def remove_guild_digest(self, guild_id, digest_id):
+        return self._remove_guild_item(guild_id, "digests", digest_id)
+
+    def iter_digests(self):
+        """
+        Yield (guild_id, subscription) for every digest subscription.
+        """
+        return self._iter_items("digests")
+
     def get_all_guild_ids(self):
-        return [int(guild_id) for guild_id in self.configs.keys()]
+        return list(self.configs.keys())
     
     def remove_guild(self, guild_id: int):
-        guild_id_str = str(guild_id)
-        if guild_id_str in self.configs:
-            del self.configs[guild_id_str]
+        guild_id = int(guild_id)
+        if guild_id in self.configs:
+            del self.configs[guild_id]
+            if self.shared:
+                self._removed.add(guild_id)
+                self._dirty.discard(guild_id)
             self._save_config()
             logger.info(f"Removed config for guild {guild_id}")
     
@@ -90,12 +239,18 @@ class ConfigManager:
         Returns set of provider names.
         """
         config = self.get_guild_config(guild_id)
-        providers = set()
-        
-        for template in [config.get("nickname_template", ""), config.get("status_template", "")]:
-            # Simple parsing - look for {provider.key} patterns
-            import re
-            matches = re.findall(r'\{(\w+)\.\w+\}', template)
-            providers.update(matches)
+        return set(template_providers(config.nickname_template) | template_providers(config.status_template))
 
+    def referenced_providers(self):
+        """
+        Provider names used by any guild's templates. Each distinct
+        template is parsed once, however many guilds share it.
+        """
+        templates = {self.default_config.nickname_template, self.default_config.status_template}
+        for config in self.configs.values():
+            templates.add(config.nickname_template)
+            templates.add(config.status_template)
+        providers = set()
+        for template in templates:
+            providers.update(template_providers(template))
         return providers
@@ -0,0 +1,238 @@
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime
+
+import discord
+from discord.ext import tasks
+
+from src.work_scheduler import Lane
+
+logger = logging.getLogger(__name__)
+
+FREQUENCIES = ("daily", "weekly")
+WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+PROVIDERS = {
+    "m": ("market", "Stock Market"),
+    "c": ("crypto", "Crypto Market"),
+}
+# Discord accepts up to 10 embeds per message
+MAX_EMBEDS = 10
+
+
+class BroadcastSender:
+    """
+    Sends prepared messages at a steady pace.
+
+    Messages are already batched per channel (one send per channel
+    bucket), started at most `rate` per second with a few in flight, and
+    each send takes a background slot of its bot's WorkScheduler so
+    commands stay responsive during a broadcast.
+    """
+
+    def __init__(self, rate=10.0, concurrency=5):
+        self.rate = max(0.1, rate)
+        self.concurrency = max(1, concurrency)
+
+    async def send_all(self, batches):
+        """
+        batches: [(work_scheduler, channel, embeds)]. Returns the number of messages sent.
+        """
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        interval = 1.0 / self.rate
+        start = loop.time()
+
+        async def send(i, work_scheduler, channel, embeds):
+            delay = start + i * interval - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            async with semaphore:
+                try:
+                    async with work_scheduler.slot(Lane.BACKGROUND):
+                        await channel.send(embeds=embeds)
+                    return True
+                except Exception as e:
+                    logger.error(f"Error sending digest to channel {channel.id}: {e}")
+                    return False
+
+        results = await asyncio.gather(*(
+            send(i, work_scheduler, channel, embeds)
+            for i, (work_scheduler, channel, embeds) in enumerate(batches)
+        ))
+        return sum(results)
+
+
+class DigestBroadcaster:
+    """
+    Posts daily/weekly digests (current values, trend and a chart) to
+    subscribed channels.
+
+    Each run renders every distinct (provider, days) chart and digest
+    body once, whatever the number of subscribers, then fans the
+    messages out through a BroadcastSender.
+
+    The schedule (and croniter) only starts once some guild has a
+    subscription; /adddigest starts it for the first one.
+
+    DIGEST_CRON         - when digests go out (default: "0 9 * * *", daily at 9:00 in TIMEZONE)
+    DIGEST_WEEKDAY      - day the weekly digest is included (default: mon)
+    DIGEST_SEND_RATE    - messages per second during a broadcast (default: 10)
+    """
+
+    def __init__(self, updaters, chart_generator, hub, sender=None):
+        self.updaters = list(updaters)
+        self.chart_generator = chart_generator
+        self.hub = hub
+
+        if sender is None:
+            try:
+                rate = float(os.getenv("DIGEST_SEND_RATE", "10"))
+            except ValueError:
+                logger.warning("Invalid DIGEST_SEND_RATE, using 10 per second")
+                rate = 10.0
+            sender = BroadcastSender(rate)
+        self.sender = sender
+
+        self.cron_expression = os.getenv("DIGEST_CRON", "0 9 * * *").strip()
+        weekday = os.getenv("DIGEST_WEEKDAY", "mon").strip().lower()[:3]
+        if weekday not in WEEKDAYS:
+            logger.warning(f"Invalid DIGEST_WEEKDAY '{weekday}', using mon")
+            weekday = "mon"
+        self.weekday = WEEKDAYS.index(weekday)
+        self.timezone = None
+
+    def _subscriptions(self, frequencies):
+        """
+        [(updater, channel, subscription)] for guilds this process serves.
+        """
+        subscriptions = []
+        for updater in self.updaters:
+            for guild_id, digest in updater.config_manager.iter_digests():
+                if digest["frequency"] not in frequencies or updater.bot.get_guild(guild_id) is None:
+                    continue
+                channel = updater.bot.get_channel(digest["channel_id"])
+                if channel is None:
+                    logger.warning(f"Digest channel {digest['channel_id']} not found (guild {guild_id})")
+                    continue
+                subscriptions.append((updater, channel, digest))
+        return subscriptions
+
+    def _render_body(self, provider, frequency):
+        name = PROVIDERS[provider][1]
+        data = self.hub.snapshot.get(provider) or {}
+        return (
+            f"**{data.get('index', '?')}** — {data.get('emotion', 'Unknown')} {data.get('emoji', '')}\n"
+            f"Trend: {data.get('trend', '?')}"
+        ), f"📰 {frequency.capitalize()} {name} Fear & Greed digest"
+
+    async def broadcast(self, frequencies=FREQUENCIES):
+        """
+        Render and send the digests for the given frequencies. Returns messages sent.
+        """
+        started = time.perf_counter()
+        subscriptions = self._subscriptions(frequencies)
+        if not subscriptions:
+            logger.info("No digest subscriptions to send")
+            return 0
+
+        # Reuse data fetched by a wave in the last few minutes
+        await self.hub.refresh(max_age=300)
+
+        # Render each distinct chart once
+        charts = {}
+        for provider, days in sorted({(digest["provider"], digest["days"]) for _, _, digest in subscriptions}):
+            charts[(provider, days)] = await self.chart_generator.generate_chart(
+                days, PROVIDERS[provider][0], wait=True, background=True
+            )
+
+        # Build each distinct embed once; the same object is sent to every subscriber
+        embeds = {}
+        for provider, days, frequency in {(d["provider"], d["days"], d["frequency"]) for _, _, d in subscriptions}:
+            body, title = self._render_body(provider, frequency)
+            embed = discord.Embed(title=title, description=body, color=discord.Color.blue())
+            chart_url = charts.get((provider, days))
+            if chart_url:
+                embed.set_image(url=chart_url)
+            embed.set_footer(text=f"Last {days} day{'s' if days != 1 else ''}")
+            embeds[(provider, days, frequency)] = embed
+
+        # One message per channel, however many of its subscriptions are due
+        by_channel = {}
+        for updater, channel, digest in subscriptions:
+            key = (digest["provider"], digest["days"], digest["frequency"])
+            batch = by_channel.setdefault((id(updater), channel.id), (updater.work_scheduler, channel, []))
+            if embeds[key] not in batch[2]:
+                batch[2].append(embeds[key])
+
+        batches = [
+            (work_scheduler, channel, channel_embeds[i:i + MAX_EMBEDS])
+            for work_scheduler, channel, channel_embeds in by_channel.values()
+            for i in range(0, len(channel_embeds), MAX_EMBEDS)
+        ]
+        sent = await self.sender.send_all(batches)
+
+        logger.info(
+            "📰 Digest sent: %d/%d messages for %d subscriptions, %d chart(s) rendered in %.2fs",
+            sent, len(batches), len(subscriptions), len(charts), time.perf_counter() - started
+        )
+        return sent
+
+    def has_subscriptions(self):
+        return any(True for updater in self.updaters for _ in updater.config_manager.iter_digests())
+
+    def start(self):
+        """
+        Start the digest schedule, unless it is running, disabled or nothing is subscribed yet.
+        """
+        if not self.cron_expression:
+            logger.info("DIGEST_CRON is empty, digests disabled")
+            return
+        if self.digest_loop.is_running():
+            return
+        if not self.has_subscriptions():
+            logger.info("No digest subscriptions yet, the digest schedule starts with the first /adddigest")
+            return
+
+        from zoneinfo import ZoneInfo
+
+        try:
+            self.timezone = ZoneInfo(os.getenv("TIMEZONE", "UTC").strip())
+        except Exception:
+            self.timezone = ZoneInfo("UTC")
+
+        try:
+            self._seconds_until_next()
+        except Exception as e:
+            logger.error(f"Invalid DIGEST_CRON '{self.cron_expression}': {e}")
+            return
+        self.digest_loop.start()
+        logger.info(f"Digests enabled with cron: {self.cron_expression}")
+
+    def stop(self):
+        if self.digest_loop.is_running():
+            self.digest_loop.cancel()
+
+    def _seconds_until_next(self):
+        from croniter import croniter
+
+        now = datetime.now(self.timezone)
+        return max(1, (croniter(self.cron_expression, now).get_next(datetime) - now).total_seconds())
+
+    @tasks.loop()
+    async def digest_loop(self):
+        # The first iteration only waits for the first scheduled time
+        if self.digest_loop.current_loop:
+            frequencies = ["daily"]
+            if datetime.now(self.timezone).weekday() == self.weekday:
+                frequencies.append("weekly")
+            try:
+                await self.broadcast(frequencies)
+            except Exception as e:
+                logger.error(f"Error in digest broadcast: {e}", exc_info=True)
+        self.digest_loop.change_interval(seconds=self._seconds_until_next())
+
+    @digest_loop.before_loop
+    async def before_digest_loop(self):
+        await asyncio.gather(*(updater.wait_until_ready() for updater in self.updaters))
@@ -0,0 +1,45 @@
+def lttb_indices(values, threshold):
+    """
+    Largest-Triangle-Three-Buckets: indices of at most `threshold` points
+    that keep the visual shape of an evenly spaced series, always
+    including the first and last point.
+    """
+    n = len(values)
+    if threshold >= n or threshold < 3:
+        return list(range(n))
+
+    indices = [0]
+    bucket_size = (n - 2) / (threshold - 2)
+    a = 0
+
+    for i in range(threshold - 2):
+        # Average of the next bucket is the third corner of the triangle
+        next_start = int((i + 1) * bucket_size) + 1
+        next_end = min(int((i + 2) * bucket_size) + 1, n)
+        avg_x = (next_start + next_end - 1) / 2
+        avg_y = sum(values[next_start:next_end]) / (next_end - next_start)
+
+        start = int(i * bucket_size) + 1
+        end = int((i + 1) * bucket_size) + 1
+        a_y = values[a]
+
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = abs((a - avg_x) * (values[j] - a_y) - (a - j) * (avg_y - a_y))
+            if area > best_area:
+                best, best_area = j, area
+        indices.append(best)
+        a = best
+
+    indices.append(n - 1)
+    return indices
+
+
+def downsample(labels, values, threshold):
+    """
+    Apply lttb_indices to parallel label/value lists.
+    """
+    indices = lttb_indices(values, threshold)
+    if len(indices) == len(values):
+        return labels, values
+    return [labels[i] for i in indices], [values[i] for i in indices]
@@ -0,0 +1,108 @@
+import csv
+import io
+import logging
+import tempfile
+import zlib
+
+from src.backends import dumps
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("csv", "jsonl")
+# Rows encoded and compressed per step
+CHUNK_ROWS = 500
+# Compressed bytes a part keeps in memory before it spills to disk
+SPOOL_BYTES = 1024 * 1024
+# Headroom for output still buffered inside the compressor
+COMPRESSOR_SLACK = 64 * 1024
+
+
+class ExportPart:
+    """
+    One gzip attachment: a complete, independently readable file (CSV
+    parts repeat the header) held in a spooled temporary file.
+    """
+
+    def __init__(self, filename, header):
+        self.filename = filename
+        self.file = tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES)
+        self.rows = 0
+        self._compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+        if header:
+            self.write(header)
+
+    @property
+    def size(self):
+        return self.file.tell()
+
+    def write(self, data):
+        self.file.write(self._compressor.compress(data))
+
+    def finish(self):
+        self.file.write(self._compressor.flush())
+        self.file.seek(0)
+        return self
+
+    def close(self):
+        self.file.close()
+
+
+def _encode_rows(rows, fmt):
+    """
+    Yield (encoded bytes, row count) for CHUNK_ROWS rows at a time.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n") if fmt == "csv" else None
+    count = 0
+    for date, value in rows:
+        if writer:
+            writer.writerow((date, value))
+        else:
+            buffer.write(dumps({"date": date, "value": value}))
+            buffer.write("\n")
+        count += 1
+        if count == CHUNK_ROWS:
+            yield buffer.getvalue().encode(), count
+            buffer.seek(0)
+            buffer.truncate()
+            count = 0
+    if count:
+        yield buffer.getvalue().encode(), count
+
+
+def build_export(rows, fmt, basename, max_part_bytes):
+    """
+    Stream (date, value) rows into gzip parts of at most ~max_part_bytes.
+
+    Rows are pulled lazily, encoded and compressed CHUNK_ROWS at a time,
+    so memory stays bounded whatever the window; parts spill to disk past
+    SPOOL_BYTES. Returns the finished ExportParts (the caller closes them).
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format '{fmt}'")
+    header = b"date,value\n" if fmt == "csv" else b""
+
+    parts = []
+    part = None
+    try:
+        for chunk, count in _encode_rows(rows, fmt):
+            # A chunk compresses to well under its raw size, so this keeps parts under the limit
+            if part is not None and part.size + len(chunk) + COMPRESSOR_SLACK > max_part_bytes:
+                parts.append(part.finish())
+                part = None
+            if part is None:
+                suffix = f"-part{len(parts) + 1}" if parts else ""
+                part = ExportPart(f"{basename}{suffix}.{fmt}.gz", header)
+            part.write(chunk)
+            part.rows += count
+        if part is not None:
+            parts.append(part.finish())
+    except Exception:
+        for finished in parts + ([part] if part is not None else []):
+            finished.close()
+        raise
+
+    if len(parts) > 1:
+        # Name the first part consistently once we know there are several
+        parts[0].filename = f"{basename}-part1.{fmt}.gz"
+    return parts
@@ -0,0 +1,49 @@
+import os
+
+try:
+    import fcntl
+except ImportError:  # Windows - no advisory locks, fall back to best effort
+    fcntl = None
+
+
+class FileLock:
+    """
+    Exclusive advisory lock on a file (created if missing).
+    Used to coordinate several Tychra processes sharing files on one host.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._fd = None
+
+    def acquire(self):
+        if fcntl is None:
+            return
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+
+    def release(self):
+        if self._fd is None:
+            return
+        try:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        finally:
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
+
+def atomic_write(path, text):
+    """
+    Write text to path via a temp file + rename, so readers never see a partial file.
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
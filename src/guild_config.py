@@ -0,0 +1,105 @@
+import sys
+import weakref
+
+
+class GuildConfig:
+    """
+    Immutable per-guild config record.
+
+    Template strings are interned and records without per-guild rules are
+    shared: every guild on the default templates points at one object, so
+    100k guilds cost 100k dict entries rather than 100k dicts. Reads hand
+    out the record itself; changes go through replace(). get() keeps the
+    dict-style access the rest of the bot uses.
+    """
+
+    __slots__ = ("nickname_template", "status_template", "timezone", "alerts", "digests", "extra", "__weakref__")
+
+    FIELDS = ("nickname_template", "status_template", "timezone", "alerts", "digests")
+
+    # (nickname_template, status_template, timezone) -> shared record
+    _pool = weakref.WeakValueDictionary()
+
+    def __init__(self, nickname_template="", status_template="", timezone="UTC", alerts=(), digests=(), extra=None):
+        init = object.__setattr__
+        init(self, "nickname_template", sys.intern(nickname_template))
+        init(self, "status_template", sys.intern(status_template))
+        init(self, "timezone", sys.intern(timezone))
+        init(self, "alerts", tuple(dict(alert) for alert in alerts))
+        init(self, "digests", tuple(dict(digest) for digest in digests))
+        # Keys this version doesn't know about, kept so saving doesn't drop them
+        init(self, "extra", dict(extra) if extra else None)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("GuildConfig is immutable, use replace()")
+
+    def __delattr__(self, name):
+        raise AttributeError("GuildConfig is immutable, use replace()")
+
+    @classmethod
+    def create(cls, **fields):
+        """
+        Build a record, reusing an identical shared one when possible.
+        """
+        record = cls(**fields)
+        if record.alerts or record.digests or record.extra:
+            return record
+        key = (record.nickname_template, record.status_template, record.timezone)
+        shared = cls._pool.get(key)
+        if shared is None:
+            cls._pool[key] = shared = record
+        return shared
+
+    @classmethod
+    def from_dict(cls, data):
+        fields = {key: data[key] for key in cls.FIELDS if key in data}
+        extra = {key: value for key, value in data.items() if key not in cls.FIELDS}
+        return cls.create(**fields, extra=extra or None)
+
+    def to_dict(self):
+        data = {
+            "nickname_template": self.nickname_template,
+            "status_template": self.status_template,
+            "timezone": self.timezone,
+        }
+        if self.alerts:
+            data["alerts"] = [dict(alert) for alert in self.alerts]
+        if self.digests:
+            data["digests"] = [dict(digest) for digest in self.digests]
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def replace(self, **changes):
+        fields = {field: getattr(self, field) for field in self.FIELDS}
+        fields.update(changes)
+        return self.create(**fields, extra=self.extra)
+
+    def get(self, key, default=None):
+        if key in self.FIELDS:
+            return getattr(self, key)
+        if self.extra:
+            return self.extra.get(key, default)
+        return default
+
+    def __getitem__(self, key):
+        if key in self.FIELDS:
+            return getattr(self, key)
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        return key in self.FIELDS or bool(self.extra and key in self.extra)
+
+    def __eq__(self, other):
+        if not isinstance(other, GuildConfig):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __hash__(self):
+        # Equal records have equal templates and timezone; alerts and digests hold dicts
+        return hash((self.nickname_template, self.status_template, self.timezone))
+
+    def __repr__(self):
+        return f"GuildConfig({self.nickname_template!r}, {self.status_template!r}, {self.timezone!r})"
@@ -0,0 +1,48 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
+logger = logging.getLogger(__name__)
+
+
+class HttpPool:
+    """
+    One aiohttp ClientSession (and connection pool) shared by the
+    providers and the chart generator of every bot identity in the
+    process, created on first use.
+    """
+
+    def __init__(self, limit=20):
+        self.limit = limit
+        self._session = None
+        self._lock = asyncio.Lock()
+
+    async def session(self):
+        if self._session is None or self._session.closed:
+            async with self._lock:
+                if self._session is None or self._session.closed:
+                    import aiohttp
+                    self._session = aiohttp.ClientSession(
+                        connector=aiohttp.TCPConnector(limit=self.limit, ttl_dns_cache=300)
+                    )
+                    logger.debug("Opened shared HTTP session (limit %d)", self.limit)
+        return self._session
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+@asynccontextmanager
+async def client_session(http_pool=None):
+    """
+    Yield the pool's shared session, or a short-lived one without a pool.
+    """
+    if http_pool is not None:
+        yield await http_pool.session()
+        return
+
+    import aiohttp
+    async with aiohttp.ClientSession() as session:
+        yield session
@@ -0,0 +1,67 @@
+import logging
+import os
+import re
+
+logger = logging.getLogger(__name__)
+
+
+class Identity:
+    """
+    One bot account run by this process: its token, default templates
+    and guild config namespace (file).
+    """
+
+    def __init__(self, name, token, config_file="guild_config.json", defaults=None):
+        self.name = name
+        self.token = token
+        self.config_file = config_file
+        self.defaults = defaults or {}
+
+    def __repr__(self):
+        return f"Identity({self.name!r}, config_file={self.config_file!r})"
+
+
+def load_identities():
+    """
+    Identities read from the environment.
+
+    TYCHRA_IDENTITIES             - comma-separated names, e.g. "stocks,crypto". When unset a
+                                    single identity uses DISCORD_TOKEN and guild_config.json
+    DISCORD_TOKEN_<NAME>          - token for each identity (required)
+    NICKNAME_TEMPLATE_<NAME>      - default nickname template for new guilds (optional)
+    STATUS_TEMPLATE_<NAME>        - default status template for new guilds (optional)
+    CONFIG_FILE_<NAME>            - guild config file (default: guild_config.<name>.json)
+    """
+    names = [name.strip() for name in os.getenv("TYCHRA_IDENTITIES", "").split(",") if name.strip()]
+    if not names:
+        token = os.getenv("DISCORD_TOKEN")
+        if not token:
+            raise ValueError("DISCORD_TOKEN environment variable not set")
+        return [Identity("default", token)]
+
+    identities = []
+    for name in names:
+        if not re.fullmatch(r"\w+", name):
+            raise ValueError(f"Invalid identity name '{name}' (letters, digits and _ only)")
+        suffix = name.upper()
+        if any(identity.name.upper() == suffix for identity in identities):
+            raise ValueError(f"Duplicate identity '{name}'")
+
+        token = os.getenv(f"DISCORD_TOKEN_{suffix}")
+        if not token:
+            raise ValueError(f"DISCORD_TOKEN_{suffix} not set for identity '{name}'")
+
+        defaults = {}
+        nickname = os.getenv(f"NICKNAME_TEMPLATE_{suffix}", "").strip()
+        status = os.getenv(f"STATUS_TEMPLATE_{suffix}", "").strip()
+        if nickname:
+            if len(nickname) > 32:
+                raise ValueError(f"NICKNAME_TEMPLATE_{suffix} is longer than 32 characters")
+            defaults["nickname_template"] = nickname
+        if status:
+            defaults["status_template"] = status
+
+        config_file = os.getenv(f"CONFIG_FILE_{suffix}", "").strip() or f"guild_config.{name.lower()}.json"
+        identities.append(Identity(name, token, config_file, defaults))
+
+    return identities
@@ -0,0 +1,140 @@
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+from datetime import datetime, timezone
+
+# Attributes every LogRecord has; anything else came in through `extra=`
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+_listener = None
+_listener_pid = None
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    One JSON object per line, with any `extra=` fields merged in.
+    """
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_text or record.exc_info:
+            entry["exc"] = record.exc_text or self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that only freezes the record in the calling thread. The
+    stock handler runs the full formatter there; we merge the arguments
+    into the message (so it shows values from the moment it was logged)
+    and leave timestamps, layout and JSON to the listener thread.
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            # Tracebacks can't cross threads safely; keep their text
+            if not record.exc_text:
+                record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def stop_logging():
+    """
+    Flush queued records and stop the listener thread. Registered with
+    atexit; shard worker processes call it themselves before exiting.
+    """
+    global _listener
+    if _listener is not None and _listener_pid == os.getpid():
+        _listener.stop()
+    _listener = None
+
+
+def parse_module_levels(value):
+    """
+    Parse "discord=WARNING,src.updater=DEBUG" into {"discord": 30, "src.updater": 10}.
+    """
+    levels = {}
+    for part in value.split(","):
+        if "=" not in part:
+            continue
+        name, level = part.split("=", 1)
+        level = logging.getLevelName(level.strip().upper())
+        if isinstance(level, int):
+            levels[name.strip()] = level
+    return levels
+
+
+def setup_logging(log_file='discord.log'):
+    """
+    Configure logging for the bot.
+
+    Records are put on an in-memory queue by the calling thread and
+    formatted/written to stdout and the rotating log file by a background
+    listener thread.
+
+    LOG_LEVEL   - root level (default: INFO)
+    LOG_LEVELS  - per-logger levels, e.g. "discord=WARNING,src.updater=DEBUG"
+    LOG_FORMAT  - "text" (default) or "json"
+    """
+    global _listener, _listener_pid
+
+    # for more info on setting up logging,
+    # see https://discordpy.readthedocs.io/en/latest/logging.html and https://docs.python.org/3/howto/logging.html
+
+    root_logger = logging.getLogger()
+
+    level = logging.getLevelName(os.getenv("LOG_LEVEL", "INFO").strip().upper())
+    root_logger.setLevel(level if isinstance(level, int) else logging.INFO)
+
+    for name, module_level in parse_module_levels(os.getenv("LOG_LEVELS", "")).items():
+        logging.getLogger(name).setLevel(module_level)
+
+    # Shard worker processes inherit the parent's handlers; start clean
+    for handler in list(root_logger.handlers):
+        root_logger.removeHandler(handler)
+    stop_logging()
+
+    if os.getenv("LOG_FORMAT", "text").strip().lower() == "json":
+        formatter = JsonFormatter()
+    else:
+        dt_fmt = '%Y-%m-%d %H:%M:%S'
+        formatter = logging.Formatter('[{asctime}] [{levelname:<8}] {name}: {message}', dt_fmt, style='{')
+
+    # Console handler for logging
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setFormatter(formatter)
+
+    # File handler for logging
+    file_handler = logging.handlers.RotatingFileHandler(
+        filename=log_file,
+        encoding='utf-8',
+        maxBytes=32 * 1024 * 1024,  # 32 MiB
+        backupCount=5,  # Rotate through 5 files
+    )
+    file_handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    root_logger.addHandler(_DeferredQueueHandler(log_queue))
+
+    _listener = logging.handlers.QueueListener(log_queue, console_handler, file_handler, respect_handler_level=True)
+    _listener_pid = os.getpid()
+    _listener.start()
+    atexit.unregister(stop_logging)
+    atexit.register(stop_logging)
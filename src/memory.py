@@ -0,0 +1,35 @@
+import os
+import sys
+
+
+def rss_bytes():
+    """
+    Current resident set size of this process, or None if unknown.
+    Falls back to the peak RSS where /proc isn't available.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+
+    try:
+        import resource
+    except ImportError:
+        return None
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def describe_rss(guild_count):
+    """
+    "48.2 MiB RSS (24.1 MiB per 1000 guilds)" for sizing containers.
+    """
+    rss = rss_bytes()
+    if rss is None:
+        return "RSS unavailable"
+    mib = rss / (1024 * 1024)
+    if not guild_count:
+        return f"{mib:.1f} MiB RSS"
+    return f"{mib:.1f} MiB RSS ({mib / guild_count * 1000:.1f} MiB per 1000 guilds)"
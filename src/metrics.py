@@ -0,0 +1,356 @@
+import bisect
+import logging
+import os
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+class _Metric:
+    """
+    Base for metrics with optional labels. Each label combination gets its
+    own child, created on first use and cached, so hot-path updates are a
+    dict lookup plus an add.
+    """
+
+    TYPE = "untyped"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        if not self.labelnames:
+            self._children[()] = self._new_child()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values):
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _format_labels(self, values, extra=None):
+        pairs = list(zip(self.labelnames, values))
+        if extra:
+            pairs.append(extra)
+        if not pairs:
+            return ""
+        inner = ",".join(f'{k}="{str(v)}"' for k, v in pairs)
+        return "{" + inner + "}"
+
+    def _samples(self):
+        raise NotImplementedError
+
+    def render(self):
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.TYPE}",
+        ]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+
+class Counter(_Metric):
+    TYPE = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount=1):
+        self._children[()].inc(amount)
+
+    def _samples(self):
+        for values, child in self._children.items():
+            yield f"{self.name}{self._format_labels(values)} {child.value}"
+
+
+class _GaugeChild:
+    __slots__ = ("value", "function")
+
+    def __init__(self):
+        self.value = 0.0
+        self.function = None
+
+    def set(self, value):
+        self.value = value
+
+    def inc(self, amount=1):
+        self.value += amount
+
+    def dec(self, amount=1):
+        self.value -= amount
+
+    def set_function(self, function):
+        """
+        Compute the value lazily at scrape time instead of on every change.
+        """
+        self.function = function
+
+    def get(self):
+        if self.function is not None:
+            try:
+                return float(self.function())
+            except Exception as e:
+                logger.debug(f"Gauge callback failed: {e}")
+                return float("nan")
+        return self.value
+
+
+class Gauge(_Metric):
+    TYPE = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value):
+        self._children[()].set(value)
+
+    def inc(self, amount=1):
+        self._children[()].inc(amount)
+
+    def dec(self, amount=1):
+        self._children[()].dec(amount)
+
+    def set_function(self, function):
+        self._children[()].set_function(function)
+
+    def _samples(self):
+        for values, child in self._children.items():
+            yield f"{self.name}{self._format_labels(values)} {child.get()}"
+
+
+class _HistogramChild:
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        # One slot per bound plus +Inf; cumulated only at render time
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+    @contextmanager
+    def time(self):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+
+class Histogram(_Metric):
+    TYPE = "histogram"
+
+    DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.bounds = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.bounds)
+
+    def observe(self, value):
+        self._children[()].observe(value)
+
+    def time(self):
+        return self._children[()].time()
+
+    def _samples(self):
+        for values, child in self._children.items():
+            cumulative = 0
+            for bound, count in zip(self.bounds + (float("inf"),), child.counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                yield f"{self.name}_bucket{self._format_labels(values, ('le', le))} {cumulative}"
+            yield f"{self.name}_sum{self._format_labels(values)} {child.sum}"
+            yield f"{self.name}_count{self._format_labels(values)} {cumulative}"
+
+
+class Registry:
+    """
+    Collection of metrics rendered in the Prometheus text exposition format.
+    """
+
+    def __init__(self):
+        self._metrics = {}
+
+    def register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self):
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+REGISTRY = Registry()
+
+PROVIDER_FETCH_SECONDS = REGISTRY.register(Histogram(
+    "tychra_provider_fetch_seconds",
+    "Time to fetch and parse one provider",
+    ["provider"]
+))
+GUILD_UPDATE_SECONDS = REGISTRY.register(Histogram(
+    "tychra_guild_update_seconds",
+    "Time to render and apply one guild's nickname and status"
+))
+CHART_GENERATION_SECONDS = REGISTRY.register(Histogram(
+    "tychra_chart_generation_seconds",
+    "Time to fetch history and render a chart",
+    ["provider"]
+))
+CHART_PAYLOAD_BYTES = REGISTRY.register(Histogram(
+    "tychra_chart_payload_bytes",
+    "Size of the chart config sent to QuickChart",
+    ["provider"],
+    buckets=(1000, 2500, 5000, 10000, 25000, 50000, 100000, 250000)
+))
+RATELIMIT_WAIT_SECONDS = REGISTRY.register(Histogram(
+    "tychra_discord_ratelimit_wait_seconds",
+    "Retry-after waits imposed by Discord 429 responses",
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+))
+NICKNAME_EDITS_TOTAL = REGISTRY.register(Counter(
+    "tychra_nickname_edits_total",
+    "Nickname edits by result (changed, skipped, failed)",
+    ["result"]
+))
+SCHEDULER_LAG_SECONDS = REGISTRY.register(Gauge(
+    "tychra_scheduler_lag_seconds",
+    "How late the last scheduled run started compared to its cron time"
+))
+SCHEDULED_WAVES_SKIPPED_TOTAL = REGISTRY.register(Counter(
+    "tychra_scheduled_waves_skipped_total",
+    "Scheduled runs skipped because no provider could have changed"
+))
+CONFIG_GUILDS = REGISTRY.register(Gauge(
+    "tychra_config_guilds",
+    "Number of guilds in the config store"
+))
+PROCESS_RESIDENT_MEMORY_BYTES = REGISTRY.register(Gauge(
+    "tychra_process_resident_memory_bytes",
+    "Resident memory of this process"
+))
+CACHE_REQUESTS_TOTAL = REGISTRY.register(Counter(
+    "tychra_cache_requests_total",
+    "Cache lookups by cache and result (hit, miss)",
+    ["cache", "result"]
+))
+CACHE_HIT_RATIO = REGISTRY.register(Gauge(
+    "tychra_cache_hit_ratio",
+    "Hit ratio per cache since start",
+    ["cache"]
+))
+
+
+def record_cache_lookup(cache, hit):
+    """
+    Count a cache lookup and make sure its hit-ratio gauge exists.
+    """
+    result = "hit" if hit else "miss"
+    CACHE_REQUESTS_TOTAL.labels(cache, result).inc()
+
+    ratio = CACHE_HIT_RATIO.labels(cache)
+    if ratio.function is None:
+        hits = CACHE_REQUESTS_TOTAL.labels(cache, "hit")
+        misses = CACHE_REQUESTS_TOTAL.labels(cache, "miss")
+        ratio.set_function(lambda: hits.value / max(1.0, hits.value + misses.value))
+
+
+class RateLimitWaitFilter(logging.Filter):
+    """
+    Observes Discord 429 retry-after waits from discord.http's log records.
+    discord.py exposes no hook for these, but logs each one with the wait as
+    its last argument. Only "Retrying in" records are waits; a 429 whose
+    timeout was too long errors instead. Never drops records.
+    """
+
+    def filter(self, record):
+        if isinstance(record.msg, str) and "Retrying in" in record.msg and record.args:
+            try:
+                RATELIMIT_WAIT_SECONDS.observe(float(record.args[-1]))
+            except (TypeError, ValueError):
+                pass
+        return True
+
+
+class MetricsServer:
+    """
+    Small aiohttp server exposing REGISTRY at /metrics.
+    """
+
+    def __init__(self, host="127.0.0.1", port=9108, registry=REGISTRY):
+        self.host = host
+        self.port = port
+        self.registry = registry
+        self._runner = None
+
+    async def _handle_metrics(self, request):
+        from aiohttp import web
+        return web.Response(
+            text=self.registry.render(),
+            content_type="text/plain",
+            charset="utf-8",
+            headers={"X-Content-Type-Options": "nosniff"}
+        )
+
+    async def start(self):
+        from aiohttp import web
+
+        app = web.Application()
+        app.router.add_get("/metrics", self._handle_metrics)
+
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        logger.info(f"📈 Metrics available at http://{self.host}:{self.port}/metrics")
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+def install_ratelimit_observer():
+    logging.getLogger("discord.http").addFilter(RateLimitWaitFilter())
+
+
+def create_metrics_server(port_offset=0):
+    """
+    Build a MetricsServer from METRICS_PORT / METRICS_HOST, or None if disabled.
+    Shard worker processes pass their index as port_offset.
+    """
+    port_str = os.getenv("METRICS_PORT", "").strip()
+    if not port_str:
+        return None
+
+    try:
+        port = int(port_str)
+    except ValueError:
+        logger.warning(f"Invalid METRICS_PORT '{port_str}', metrics endpoint disabled")
+        return None
+
+    host = os.getenv("METRICS_HOST", "127.0.0.1").strip() or "127.0.0.1"
+    return MetricsServer(host, port + port_offset)
@@ -0,0 +1,219 @@
+import asyncio
+import io
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+
+logger = logging.getLogger(__name__)
+
+TARGETS = ("update", "chart")
+MODES = ("cprofile", "sample")
+
+
+class _StackSampler(threading.Thread):
+    """
+    Samples the event loop thread's stack at a fixed interval and counts
+    collapsed stacks (flamegraph.pl / speedscope compatible).
+    """
+
+    def __init__(self, thread_id, interval):
+        super().__init__(name="tychra-profiler", daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+class _LoopLagMonitor:
+    """
+    Measures how late a periodic sleep wakes up. Any lateness is time a
+    callback held the loop, so the max and count over a threshold point
+    at slow callbacks.
+    """
+
+    def __init__(self, interval=0.05, threshold=0.1):
+        self.interval = interval
+        self.threshold = threshold
+        self.max_lag = 0.0
+        self.slow_callbacks = 0
+        self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = loop.time() - start - self.interval
+            self.max_lag = max(self.max_lag, lag)
+            if lag >= self.threshold:
+                self.slow_callbacks += 1
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+
+class Profiler:
+    """
+    Captures profiles around the next N runs of an armed target.
+
+    Targets are "update" (Updater.update_all_guilds) and "chart"
+    (ChartGenerator.generate_chart). Unarmed targets cost one dict lookup.
+    cProfile mode records every task the loop runs during the capture,
+    not just the wrapped coroutine; sample mode records the loop thread's
+    stacks every PROFILE_SAMPLE_INTERVAL_MS.
+    """
+
+    def __init__(self, output_dir="profiles", sample_interval=0.005, slow_callback=0.1):
+        self.output_dir = output_dir
+        self.sample_interval = sample_interval
+        self.slow_callback = slow_callback
+        self._armed = {}
+        self._active = False
+        self.last_capture = None
+
+    def configure_from_env(self):
+        """
+        PROFILE_UPDATES / PROFILE_CHARTS  - arm the next N update runs / charts at startup
+        PROFILE_MODE                      - "cprofile" (default) or "sample"
+        PROFILE_DIR                       - where captures are written (default: profiles)
+        PROFILE_SAMPLE_INTERVAL_MS        - sampling interval (default: 5)
+        PROFILE_SLOW_CALLBACK_MS          - loop lag counted as a slow callback (default: 100)
+        """
+        self.output_dir = os.getenv("PROFILE_DIR", self.output_dir).strip() or self.output_dir
+        try:
+            self.sample_interval = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", self.sample_interval * 1000)) / 1000
+            self.slow_callback = float(os.getenv("PROFILE_SLOW_CALLBACK_MS", self.slow_callback * 1000)) / 1000
+        except ValueError:
+            logger.warning("Invalid profiler interval settings, using defaults")
+
+        mode = os.getenv("PROFILE_MODE", "cprofile").strip().lower()
+        for target, env_name in (("update", "PROFILE_UPDATES"), ("chart", "PROFILE_CHARTS")):
+            runs = os.getenv(env_name, "").strip()
+            if runs:
+                try:
+                    self.arm(target, int(runs), mode)
+                except ValueError as e:
+                    logger.warning(f"Ignoring {env_name}: {e}")
+
+    def arm(self, target, runs=1, mode="cprofile"):
+        if target not in TARGETS:
+            raise ValueError(f"Unknown profile target '{target}'")
+        if mode not in MODES:
+            raise ValueError(f"Unknown profile mode '{mode}'")
+        if runs < 1:
+            self._armed.pop(target, None)
+            return
+        self._armed[target] = [runs, mode]
+        logger.info(f"🔬 Profiler armed for next {runs} {target} run(s) ({mode})")
+
+    def status(self):
+        return {target: {"runs": runs, "mode": mode} for target, (runs, mode) in self._armed.items()}
+
+    @asynccontextmanager
+    async def capture(self, target):
+        armed = self._armed.get(target)
+        # Captures don't nest; a run overlapping an active capture is left alone
+        if armed is None or self._active:
+            yield
+            return
+
+        runs, mode = armed
+        if runs <= 1:
+            del self._armed[target]
+        else:
+            armed[0] = runs - 1
+
+        self._active = True
+        lag_monitor = _LoopLagMonitor(threshold=self.slow_callback)
+        lag_monitor.start()
+
+        profile = sampler = None
+        if mode == "sample":
+            sampler = _StackSampler(threading.get_ident(), self.sample_interval)
+            sampler.start()
+        else:
+            import cProfile
+            profile = cProfile.Profile()
+            profile.enable()
+
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            if profile:
+                profile.disable()
+            if sampler:
+                sampler.stop()
+            lag_monitor.stop()
+            self._active = False
+
+            try:
+                self.last_capture = await asyncio.to_thread(
+                    self._write_capture, target, mode, elapsed, profile, sampler, lag_monitor
+                )
+                logger.info(f"🔬 Profile for {target} written to {self.last_capture['path']}")
+            except Exception as e:
+                logger.error(f"Error writing profile: {e}")
+
+    def _write_capture(self, target, mode, elapsed, profile, sampler, lag_monitor):
+        os.makedirs(self.output_dir, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        base = os.path.join(self.output_dir, f"{target}-{stamp}")
+
+        lines = [
+            f"{target} run took {elapsed:.3f}s ({mode})",
+            f"event loop lag: max {lag_monitor.max_lag * 1000:.1f} ms, "
+            f"{lag_monitor.slow_callbacks} slow callback(s) >= {self.slow_callback * 1000:.0f} ms",
+            "",
+        ]
+
+        if profile:
+            path = f"{base}.prof"
+            import pstats
+            profile.dump_stats(path)
+            stream = io.StringIO()
+            pstats.Stats(profile, stream=stream).sort_stats("cumulative").print_stats(25)
+            lines.append(stream.getvalue())
+        else:
+            path = f"{base}.collapsed.txt"
+            with open(path, "w", encoding="utf-8") as f:
+                for stack, count in sampler.stacks.most_common():
+                    f.write(f"{stack} {count}\n")
+            total = sum(sampler.stacks.values()) or 1
+            lines.append(f"{total} samples, hottest stacks:")
+            for stack, count in sampler.stacks.most_common(10):
+                lines.append(f"{count / total:6.1%}  {stack.rsplit(';', 1)[-1]}")
+
+        summary = "\n".join(lines)
+        with open(f"{base}.summary.txt", "w", encoding="utf-8") as f:
+            f.write(summary)
+
+        return {"target": target, "path": path, "summary": summary}
+
+
+PROFILER = Profiler()
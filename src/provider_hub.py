@@ -0,0 +1,185 @@
+import asyncio
+import logging
+import os
+import time
+
+from src.metrics import PROVIDER_FETCH_SECONDS
+from src.provider_snapshot import EMPTY_SNAPSHOT, ProviderSnapshot
+
+logger = logging.getLogger(__name__)
+
+
+class ProviderHub:
+    """
+    Owns the provider snapshot for every Updater in the process.
+
+    Concurrent refreshes share one in-flight fetch, and `max_age` lets a
+    caller reuse a snapshot fetched moments ago (e.g. several bot
+    identities starting together), so the upstreams are hit once per
+    wave however many bots read the result. Each refresh publishes a new
+    immutable ProviderSnapshot. With a CadenceEngine only providers that
+    could have changed are fetched; the rest carry over.
+
+    Configured JSON providers are only polled while some guild template
+    uses them, and providers sharing an endpoint share one request.
+    """
+
+    def __init__(self, snapshot_cache=None, http_pool=None, cadence=None):
+        self.snapshot_cache = snapshot_cache
+        self.http_pool = http_pool
+        self.cadence = cadence
+        self.snapshot = EMPTY_SNAPSHOT
+        # Monotonic time of the last fetch, for max_age
+        self.fetched_at = None
+        self._providers = None
+        # Names of the configured JSON providers, fetched together by endpoint
+        self._endpoint_names = frozenset()
+        self._inflight = None
+        self._listeners = []
+        self._reference_sources = []
+
+    @property
+    def provider_cache(self):
+        return self.snapshot
+
+    @property
+    def version(self):
+        # Bumped on every fetch; guilds remember the version they last applied
+        return self.snapshot.version
+
+    def add_listener(self, listener):
+        """
+        Call listener(snapshot) after every refresh, e.g. the alert engine.
+        """
+        self._listeners.append(listener)
+
+    def add_reference_source(self, source):
+        """
+        source() returns the provider names guild templates use, e.g.
+        ConfigManager.referenced_providers. Once any are added, JSON
+        providers none of them reference are skipped.
+        """
+        self._reference_sources.append(source)
+
+    def _referenced(self):
+        if not self._reference_sources:
+            return None
+        names = set()
+        for source in self._reference_sources:
+            names.update(source())
+        return names
+
+    def available_keys(self, name):
+        provider = self._get_providers().get(name)
+        return provider.get_available_keys() if provider else set()
+
+    def _get_providers(self):
+        if self._providers is None:
+            from providers import MarketProvider, CryptoProvider
+            self._providers = { 'm': MarketProvider(), 'c': CryptoProvider() }
+            # The JSON provider module is only loaded when some are configured
+            if os.getenv("JSON_PROVIDERS", "").strip():
+                from providers.json_endpoint import load_json_providers
+                custom = load_json_providers()
+                self._providers.update(custom)
+                self._endpoint_names = frozenset(custom)
+                if custom:
+                    logger.info(f"🧩 JSON providers: {', '.join(custom)}")
+        return self._providers
+
+    def due_providers(self):
+        """
+        Names of the providers worth fetching now. Everything is due
+        before the first snapshot or without a cadence engine.
+        """
+        providers = self._get_providers()
+        referenced = self._referenced()
+        names = {
+            name for name in providers
+            if referenced is None or name in referenced or name not in self._endpoint_names
+        }
+        if self.cadence is None or not self.snapshot:
+            return names
+        return self.cadence.due(names)
+
+    async def _fetch_providers(self, names=None):
+        session = await self.http_pool.session() if self.http_pool else None
+        # Providers that aren't fetched keep their previous data
+        results = {name: dict(data) for name, data in self.snapshot.items()}
+
+        endpoints = []
+        for name, provider in self._get_providers().items():
+            if names is not None and name not in names:
+                continue
+            if name in self._endpoint_names:
+                endpoints.append(provider)
+                continue
+            try:
+                with PROVIDER_FETCH_SECONDS.labels(name).time():
+                    data = await provider.fetch(session=session)
+                if not isinstance(data, dict):
+                    # A parser that fell through (e.g. an empty upstream response)
+                    logger.warning(f"✗ {name} returned no data, using defaults")
+                    data = provider._get_default_values()
+                results[name] = data
+                logger.debug("✓ %s: %s", name, data)
+            except Exception as e:
+                logger.error(f"✗ Failed to fetch {name}: {e}")
+                results[name] = {}
+
+        if endpoints:
+            from providers.json_endpoint import fetch_endpoints
+            with PROVIDER_FETCH_SECONDS.labels("json").time():
+                results.update(await fetch_endpoints(endpoints, session=session))
+
+        return results
+
+    async def refresh(self, max_age=0.0):
+        """
+        Fetch a new snapshot unless one is in flight (joined) or was
+        fetched less than max_age seconds ago (reused).
+        """
+        if self._inflight is None:
+            if max_age and self.fetched_at is not None and time.monotonic() - self.fetched_at <= max_age:
+                logger.debug("Reusing provider snapshot v%d", self.version)
+                return
+            self._inflight = asyncio.ensure_future(self._refresh())
+            self._inflight.add_done_callback(self._clear_inflight)
+        else:
+            logger.debug("Joining in-flight provider fetch")
+        await asyncio.shield(self._inflight)
+
+    def _clear_inflight(self, _future):
+        self._inflight = None
+
+    async def _refresh(self):
+        due = self.due_providers()
+        if not due:
+            logger.info("Providers: none could have changed, keeping snapshot v%d", self.snapshot.version)
+            return
+
+        # With a shared snapshot cache only one process per TTL hits the upstreams
+        if self.snapshot_cache:
+            providers = await self.snapshot_cache.get_or_fetch(lambda: self._fetch_providers(due))
+        else:
+            providers = await self._fetch_providers(due)
+        snapshot = ProviderSnapshot(providers, version=self.snapshot.version + 1)
+        if self.cadence:
+            self.cadence.observe(snapshot, due)
+        changed = snapshot.changed_since(self.snapshot)
+        self.snapshot = snapshot
+        self.fetched_at = time.monotonic()
+
+        logger.info(
+            "Providers v%d%s%s: %s",
+            snapshot.version,
+            "" if changed else " (unchanged)",
+            f" (stale: {','.join(sorted(snapshot.stale_providers))})" if snapshot.stale else "",
+            ", ".join(f"{name}={data.get('index', '?')}" for name, data in snapshot.items())
+        )
+
+        for listener in self._listeners:
+            try:
+                listener(snapshot)
+            except Exception as e:
+                logger.error(f"Error in snapshot listener: {e}")
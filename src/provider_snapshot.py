@@ -0,0 +1,92 @@
+import hashlib
+import json
+import time
+from types import MappingProxyType
+
+
+def is_fallback(data):
+    """
+    True for provider data that isn't a real reading: a failed fetch ({})
+    or a provider's default values, which carry no timestamp.
+    """
+    return not data or data.get("timestamp") is None
+
+
+class ProviderSnapshot:
+    """
+    One immutable fetch of every provider.
+
+    Provider data is wrapped in read-only mappings, so a snapshot can be
+    handed to renders, listeners and caches without copying. Each one
+    carries the hub's version, the wall-clock fetch time, which providers
+    fell back to defaults, and a content hash computed once at creation,
+    so "did anything change?" is a single string comparison.
+    """
+
+    __slots__ = ("_providers", "version", "fetched_at", "stale_providers", "content_hash")
+
+    def __init__(self, providers=None, version=0, fetched_at=None):
+        init = object.__setattr__
+        providers = providers or {}
+        init(self, "_providers", MappingProxyType({
+            name: MappingProxyType(dict(data)) for name, data in providers.items()
+        }))
+        init(self, "version", version)
+        init(self, "fetched_at", fetched_at if fetched_at is not None else time.time())
+        init(self, "stale_providers", frozenset(name for name, data in providers.items() if is_fallback(data)))
+        # Always the stdlib encoder, so the hash doesn't depend on JSON_BACKEND
+        payload = json.dumps(providers, sort_keys=True, default=str, separators=(",", ":"), ensure_ascii=False).encode()
+        init(self, "content_hash", hashlib.blake2b(payload, digest_size=8).hexdigest())
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ProviderSnapshot is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("ProviderSnapshot is immutable")
+
+    @property
+    def stale(self):
+        """
+        True if any provider is serving fallback values.
+        """
+        return bool(self.stale_providers)
+
+    @property
+    def providers(self):
+        return self._providers
+
+    def changed_since(self, other):
+        """
+        True if this snapshot's data differs from `other` (None counts as different).
+        """
+        return other is None or other.content_hash != self.content_hash
+
+    def get(self, name, default=None):
+        return self._providers.get(name, default)
+
+    def __getitem__(self, name):
+        return self._providers[name]
+
+    def __contains__(self, name):
+        return name in self._providers
+
+    def __iter__(self):
+        return iter(self._providers)
+
+    def __len__(self):
+        return len(self._providers)
+
+    def items(self):
+        return self._providers.items()
+
+    def to_dict(self):
+        return {name: dict(data) for name, data in self._providers.items()}
+
+    def __repr__(self):
+        return (
+            f"ProviderSnapshot(v{self.version}, {sorted(self._providers)}, "
+            f"hash={self.content_hash}{', stale' if self.stale else ''})"
+        )
+
+
+EMPTY_SNAPSHOT = ProviderSnapshot({}, version=0, fetched_at=0.0)
@@ -1,10 +1,10 @@
 import logging
 import os
 from datetime import datetime
-from zoneinfo import ZoneInfo
-from croniter import croniter
 from discord.ext import tasks
 
+from src.metrics import SCHEDULED_WAVES_SKIPPED_TOTAL, SCHEDULER_LAG_SECONDS
+
 logger = logging.getLogger(__name__)
 
 
@@ -20,6 +20,7 @@ class UpdateScheduler:
         self.updater = updater
         self.cron_expression = None
         self.timezone = None
+        self._next_run = None
         self._parse_schedule()
 
     def _parse_schedule(self):
@@ -44,6 +45,10 @@ class UpdateScheduler:
             logger.info("SCHEDULE_CRON not set, automatic updates disabled")
             return
 
+        # Only needed when a schedule is configured, so imported here to keep startup light
+        from zoneinfo import ZoneInfo
+        from croniter import croniter
+
         try:
             self.timezone = ZoneInfo(timezone_str)
             logger.info(f"Using timezone: {timezone_str}")
@@ -69,7 +74,9 @@ class UpdateScheduler:
         """
         Start the scheduled update task if cron expression is configured
         """
-        if self.cron_expression:
+        if self.scheduled_update.is_running():
+            logger.debug("Scheduled updates already running")
+        elif self.cron_expression:
             self.scheduled_update.start()
             logger.info(f"Scheduled updates enabled with cron: {self.cron_expression}")
         else:
@@ -91,19 +98,29 @@ class UpdateScheduler:
         if not self.cron_expression:
             return
 
+        from croniter import croniter
+
         try:
             now = datetime.now(self.timezone)
-            
-            logger.info("⏰ Running scheduled update...")
-            results = await self.updater.update_all_guilds()
-            successful = sum(1 for success in results.values() if success)
-            total = len(results)
-            logger.info(f"Scheduled update complete: {successful}/{total} guilds updated")
+            if self._next_run is not None:
+                SCHEDULER_LAG_SECONDS.set(max(0.0, (now - self._next_run).total_seconds()))
+
+            # Off-hours and holidays: no provider could have new data, so no wave
+            if self.updater.hub.due_providers():
+                logger.info("⏰ Running scheduled update...")
+                results = await self.updater.update_all_guilds()
+                successful = sum(1 for success in results.values() if success)
+                total = len(results)
+                logger.info(f"Scheduled update complete: {successful}/{total} guilds updated")
+            else:
+                SCHEDULED_WAVES_SKIPPED_TOTAL.inc()
+                logger.info("⏭️ Skipping scheduled update: no provider could have changed")
 
             # Calculate seconds until next run
             cron = croniter(self.cron_expression, now)
             next_run = cron.get_next(datetime)
             seconds_until_next = (next_run - now).total_seconds()
+            self._next_run = next_run
 
             logger.info(f"Next scheduled run: {next_run.strftime('%Y-%m-%d %H:%M:%S %Z')} (in {seconds_until_next:.0f}s)")
 
@@ -117,8 +134,8 @@ class UpdateScheduler:
 
     @scheduled_update.before_loop
     async def before_scheduled_update(self):
-        #Wait for bot to be ready before starting scheduled updates
-        await self.bot.wait_until_ready()
+        #Wait for bot(s) to be ready before starting scheduled updates
+        await self.updater.wait_until_ready()
         logger.info("Bot ready, scheduled updates will now run at configured times")
 
     @scheduled_update.error
@@ -0,0 +1,84 @@
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+
+def parse_shard_ids(value):
+    """
+    Parse a shard list like "0-3,6,8-9" into a sorted list of ints.
+    """
+    shard_ids = set()
+    for part in value.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            start, end = (int(value) for value in part.split("-", 1))
+            if end < start:
+                raise ValueError(f"Invalid shard range '{part}'")
+            shard_ids.update(range(start, end + 1))
+        else:
+            shard_ids.add(int(part))
+    return sorted(shard_ids)
+
+
+def split_shards(shard_ids, processes):
+    """
+    Split shard ids into `processes` contiguous ranges of near-equal size.
+    """
+    processes = max(1, min(processes, len(shard_ids)))
+    size, extra = divmod(len(shard_ids), processes)
+
+    ranges = []
+    start = 0
+    for i in range(processes):
+        end = start + size + (1 if i < extra else 0)
+        ranges.append(shard_ids[start:end])
+        start = end
+    return ranges
+
+
+class ShardingConfig:
+    """
+    Sharding settings read from the environment.
+
+    SHARDING          - "on" to run an AutoShardedBot (default: off)
+    SHARD_COUNT       - total shards across all processes (default: Discord's recommendation)
+    SHARD_IDS         - shards this process runs, e.g. "0-3" (default: all)
+    SHARD_PROCESSES   - split the shards over this many worker processes (default: 1)
+    """
+
+    def __init__(self):
+        self.enabled = os.getenv("SHARDING", "").strip().lower() in ("1", "true", "on", "yes")
+        self.shard_count = None
+        self.shard_ids = None
+        self.processes = 1
+
+        if not self.enabled:
+            return
+
+        count_str = os.getenv("SHARD_COUNT", "").strip()
+        ids_str = os.getenv("SHARD_IDS", "").strip()
+        processes_str = os.getenv("SHARD_PROCESSES", "").strip()
+
+        if count_str:
+            self.shard_count = int(count_str)
+        if ids_str:
+            self.shard_ids = parse_shard_ids(ids_str)
+        if processes_str:
+            self.processes = max(1, int(processes_str))
+
+        if self.shard_ids is not None and self.shard_count is None:
+            raise ValueError("SHARD_IDS requires SHARD_COUNT to be set")
+        if self.processes > 1 and self.shard_count is None:
+            raise ValueError("SHARD_PROCESSES > 1 requires SHARD_COUNT to be set")
+
+    def process_ranges(self):
+        """
+        Shard id ranges, one per worker process.
+        """
+        shard_ids = self.shard_ids
+        if shard_ids is None:
+            shard_ids = list(range(self.shard_count))
+        return split_shards(shard_ids, self.processes)
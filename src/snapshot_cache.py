@@ -0,0 +1,95 @@
+import asyncio
+import logging
+import os
+import time
+
+from src.backends import dumps, loads
+from src.file_lock import FileLock, atomic_write
+from src.metrics import record_cache_lookup
+
+logger = logging.getLogger(__name__)
+
+
+class SnapshotCache:
+    """
+    File-backed cache of provider data shared by every Tychra process on a host.
+
+    The first process whose snapshot is stale takes the lock and fetches,
+    the rest wait on the lock and then read what it wrote, so each
+    upstream is hit once per TTL no matter how many shard processes run.
+    """
+
+    def __init__(self, path="provider_snapshot.json", ttl=60):
+        self.path = path
+        self.ttl = ttl
+        self._lock = FileLock(f"{path}.lock")
+        self._local_lock = asyncio.Lock()
+
+    def _read_fresh(self):
+        """
+        Return cached provider data if it is younger than the TTL, else None.
+        """
+        try:
+            with open(self.path, 'rb') as f:
+                snapshot = loads(f.read())
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable snapshot cache {self.path}: {e}")
+            return None
+
+        age = time.time() - snapshot.get("fetched_at", 0)
+        if age > self.ttl:
+            return None
+        return snapshot.get("providers")
+
+    def _write(self, providers):
+        snapshot = {"fetched_at": time.time(), "providers": providers}
+        atomic_write(self.path, dumps(snapshot))
+
+    async def get_or_fetch(self, fetch):
+        """
+        Return shared provider data, calling `fetch()` only if no other
+        process has produced a fresh snapshot.
+        """
+        providers = self._read_fresh()
+        record_cache_lookup("snapshot", providers is not None)
+        if providers is not None:
+            logger.debug("Using provider snapshot from shared cache")
+            return providers
+
+        async with self._local_lock:
+            await asyncio.to_thread(self._lock.acquire)
+            try:
+                # Another process may have fetched while we waited for the lock
+                providers = self._read_fresh()
+                if providers is not None:
+                    logger.debug("Provider snapshot refreshed by another process")
+                    return providers
+
+                providers = await fetch()
+                try:
+                    self._write(providers)
+                except Exception as e:
+                    logger.error(f"Error writing snapshot cache: {e}")
+                return providers
+            finally:
+                self._lock.release()
+
+
+def create_snapshot_cache():
+    """
+    Build a SnapshotCache from SNAPSHOT_CACHE_FILE / SNAPSHOT_CACHE_TTL, or None if disabled.
+    """
+    path = os.getenv("SNAPSHOT_CACHE_FILE", "").strip()
+    if not path:
+        return None
+
+    try:
+        ttl = int(os.getenv("SNAPSHOT_CACHE_TTL", "60"))
+    except ValueError:
+        logger.warning("Invalid SNAPSHOT_CACHE_TTL, using 60 seconds")
+        ttl = 60
+
+    logger.info(f"Sharing provider snapshots via {path} (TTL {ttl}s)")
+    return SnapshotCache(path, ttl)
@@ -0,0 +1,71 @@
+import enum
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+
+class StartupState(enum.Enum):
+    PENDING = "pending"
+    INITIALIZING = "initializing"
+    RUNNING = "running"
+
+
+class StartupCoordinator:
+    """
+    Decides what an on_ready means.
+
+    discord.py fires on_ready again after reconnects that could not RESUME.
+    The first one runs the initial update wave (staggered) and starts the
+    scheduler; later ones only reconcile guilds that missed the current
+    snapshot instead of refetching and re-editing every guild.
+    """
+
+    def __init__(self, updater, scheduler, stagger=None, max_age=60.0):
+        self.updater = updater
+        # The initial wave reuses a snapshot this recent, e.g. one another
+        # bot identity in the process fetched while starting up
+        self.max_age = max_age
+        self.scheduler = scheduler
+        self.state = StartupState.PENDING
+        if stagger is None:
+            try:
+                stagger = float(os.getenv("STARTUP_STAGGER_SECONDS", "10"))
+            except ValueError:
+                logger.warning("Invalid STARTUP_STAGGER_SECONDS, using 10 seconds")
+                stagger = 10.0
+        self.stagger = max(0.0, stagger)
+
+    async def on_ready(self):
+        if self.state is StartupState.PENDING:
+            await self._initial_update()
+        elif self.state is StartupState.INITIALIZING:
+            # The initial wave is still running and will cover every guild
+            logger.info("Reconnected during initial update, nothing to reconcile yet")
+        else:
+            await self._reconcile()
+
+    async def _initial_update(self):
+        self.state = StartupState.INITIALIZING
+        logger.info(f"Running initial update for all guilds (spread over {self.stagger:.0f}s)...")
+        try:
+            results = await self.updater.update_all_guilds(stagger=self.stagger, max_age=self.max_age)
+            successful = sum(1 for success in results.values() if success)
+            logger.info(f"Initial update complete: {successful}/{len(results)} guilds updated successfully")
+        except Exception as e:
+            logger.error(f"Error during initial update: {e}")
+        finally:
+            self.state = StartupState.RUNNING
+            self.scheduler.start()
+
+    async def _reconcile(self):
+        stale = self.updater.stale_guild_ids()
+        if not stale:
+            logger.info("Reconnected, all guilds are up to date")
+            return
+
+        logger.info(f"Reconnected, reconciling {len(stale)} guild(s) behind the current snapshot...")
+        try:
+            await self.updater.reconcile_guilds(stagger=self.stagger)
+        except Exception as e:
+            logger.error(f"Error reconciling guilds after reconnect: {e}")
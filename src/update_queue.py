@@ -0,0 +1,79 @@
+import asyncio
+import logging
+import os
+
+from src.work_scheduler import Lane
+
+logger = logging.getLogger(__name__)
+
+
+class GuildUpdateQueue:
+    """
+    Debounces per-guild updates requested by admin commands.
+
+    Requests for the same guild within `window` seconds coalesce into a
+    single update_guild call that reads the guild's config when it runs,
+    so five template edits in a row cost one nickname edit and one
+    presence change.
+    """
+
+    def __init__(self, updater, window=None):
+        self.updater = updater
+        if window is None:
+            try:
+                window = float(os.getenv("UPDATE_DEBOUNCE_SECONDS", "3"))
+            except ValueError:
+                logger.warning("Invalid UPDATE_DEBOUNCE_SECONDS, using 3 seconds")
+                window = 3.0
+        self.window = max(0.0, window)
+        self._deadlines = {}
+        self._refresh = set()
+        self._tasks = {}
+
+    def request(self, guild_id, refresh=False):
+        """
+        Queue an update for guild_id. refresh=True refetches provider
+        data before the update runs.
+        """
+        loop = asyncio.get_running_loop()
+        self._deadlines[guild_id] = loop.time() + self.window
+        if refresh:
+            self._refresh.add(guild_id)
+
+        if guild_id not in self._tasks:
+            self._tasks[guild_id] = asyncio.create_task(self._run(guild_id))
+        else:
+            logger.debug("Coalesced update request for guild %s", guild_id)
+
+    def pending(self, guild_id):
+        return guild_id in self._tasks
+
+    async def _run(self, guild_id):
+        loop = asyncio.get_running_loop()
+        try:
+            while guild_id in self._deadlines:
+                # Wait until no new request has arrived for a full window
+                delay = self._deadlines[guild_id] - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                    continue
+
+                del self._deadlines[guild_id]
+                refresh = guild_id in self._refresh
+                self._refresh.discard(guild_id)
+
+                try:
+                    if refresh:
+                        await self.updater.fetch_all_providers()
+                    await self.updater.update_guild(guild_id, lane=Lane.INTERACTIVE)
+                except Exception as e:
+                    logger.error(f"Error in queued update for guild {guild_id}: {e}")
+                # A request that arrived while updating re-adds a deadline and loops
+        finally:
+            self._tasks.pop(guild_id, None)
+
+    async def close(self):
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -1,31 +1,50 @@
+import asyncio
 import logging
 import re
+import time
+
+from src.metrics import GUILD_UPDATE_SECONDS
+from src.profiler import PROFILER
+from src.provider_hub import ProviderHub
+from src.work_scheduler import Lane, WorkScheduler
 
 logger = logging.getLogger(__name__)
 
 
 class Updater:
 
-    def __init__(self, bot, config_manager):
+    def __init__(self, bot, config_manager, snapshot_cache=None, work_scheduler=None, hub=None):
         self.bot = bot
         self.config_manager = config_manager
-        self.provider_cache = {}
-
-    async def fetch_all_providers(self):
-        from providers import MarketProvider, CryptoProvider
-
-        providers = { 'm': MarketProvider(), 'c': CryptoProvider() }
-        
-        for name, provider in providers.items():
-            try:
-                data = await provider.fetch()
-                self.provider_cache[name] = data
-                logger.info(f"✓ {name}: {data}")
-            except Exception as e:
-                logger.error(f"✗ Failed to fetch {name}: {e}")
-                self.provider_cache[name] = {}
-
-    def render_template(self, template):
+        self.work_scheduler = work_scheduler or WorkScheduler.from_env()
+        # Bot identities in one process share a hub, and so one fetch per wave
+        self.hub = hub or ProviderHub(snapshot_cache)
+        # guild_id -> the ProviderSnapshot its nickname/status were last rendered from
+        self.last_applied = {}
+
+    @property
+    def snapshot(self):
+        return self.hub.snapshot
+
+    def remove_guild(self, guild_id):
+        self.last_applied.pop(guild_id, None)
+
+    @property
+    def provider_cache(self):
+        return self.hub.snapshot
+
+    @property
+    def snapshot_version(self):
+        return self.hub.version
+
+    async def fetch_all_providers(self, max_age=0.0):
+        await self.hub.refresh(max_age)
+
+    async def wait_until_ready(self):
+        await self.bot.wait_until_ready()
+
+    def render_template(self, template, snapshot=None):
+        snapshot = self.hub.snapshot if snapshot is None else snapshot
         result = template
 
         # Find all placeholders like {provider.key}
@@ -34,22 +53,30 @@ class Updater:
         for provider_name, key in placeholders:
             placeholder = f"{{{provider_name}.{key}}}"
 
-            # Get value from cache
-            if provider_name in self.provider_cache:
-                provider_data = self.provider_cache[provider_name]
+            # Get value from the snapshot
+            if provider_name in snapshot:
+                provider_data = snapshot[provider_name]
                 value = provider_data.get(key, f"?{key}?")
                 result = result.replace(placeholder, str(value))
             else:
-                logger.warning(f"Provider '{provider_name}' not found in cache")
+                logger.warning("Provider '%s' not found in cache", provider_name)
                 result = result.replace(placeholder, f"?{provider_name}?")
 
         return result
 
-    async def update_guild(self, guild_id):
+    async def update_guild(self, guild_id, lane=Lane.BACKGROUND, nickname_edits=None):
         """
         Update a specific guild's nickname and status.
+        lane is Lane.INTERACTIVE for command-triggered updates, which
+        run ahead of background waves. nickname_edits, if given, counts
+        the nickname outcome by NicknameEdit value.
         Returns True if successful.
         """
+        async with self.work_scheduler.slot(lane):
+            with GUILD_UPDATE_SECONDS.time():
+                return await self._update_guild(guild_id, nickname_edits)
+
+    async def _update_guild(self, guild_id, nickname_edits=None):
         try:
             # Fetch provider data if cache is empty
             if not self.provider_cache:
@@ -65,46 +92,118 @@ class Updater:
             # Get config
             config = self.config_manager.get_guild_config(guild_id)
 
-            # Render templates
+            # Render both templates from one snapshot, even if a refresh lands meanwhile
+            snapshot = self.hub.snapshot
             nickname_template = config.get("nickname_template", "")
             status_template = config.get("status_template", "")
 
-            nickname = self.render_template(nickname_template)
-            status = self.render_template(status_template)
+            nickname = self.render_template(nickname_template, snapshot)
+            status = self.render_template(status_template, snapshot)
 
-            logger.info(f"Updating {guild.name}:")
-            logger.info(f"  Nickname: {nickname}")
-            logger.info(f"  Status: {status}")
+            logger.debug("Updating %s: nickname=%r status=%r", guild.name, nickname, status)
 
             # Update nickname
             nickname_success = await self.bot.update_nickname(guild, nickname)
+            if nickname_edits is not None:
+                nickname_edits[nickname_success.value] += 1
 
             # Update status (global, but we do it per guild for now)
-            emotion = self.provider_cache.get('m', {}).get('emotion')
-            status_success = await self.bot.update_status(status, emotion=emotion)
+            emotion = snapshot.get('m', {}).get('emotion')
+            status_success = await self.bot.update_status(status, emotion=emotion, shard_id=guild.shard_id)
 
-            return nickname_success or status_success
+            success = nickname_success or status_success
+            if success:
+                self.last_applied[guild_id] = snapshot
+            return success
 
         except Exception as e:
             logger.error(f"Error updating guild {guild_id}: {e}")
             return False
 
-    async def update_all_guilds(self):
+    async def update_all_guilds(self, stagger=0.0, max_age=0.0):
         """
         Update all guilds the bot is in.
+        stagger spreads the guild updates over that many seconds.
+        max_age reuses a snapshot fetched that recently (see ProviderHub.refresh).
+        Returns dict of guild_id -> success.
+        """
+        async with PROFILER.capture("update"):
+            # First, fetch all provider data
+            await self.fetch_all_providers(max_age)
+            guild_ids = [guild.id for guild in self.bot.guilds]
+            return await self._update_guilds(guild_ids, stagger)
+
+    def stale_guild_ids(self):
+        """
+        Guilds whose last applied snapshot differs from the current one.
+        A newer snapshot with the same content doesn't count.
+        """
+        snapshot = self.hub.snapshot
+        return [
+            guild.id for guild in self.bot.guilds
+            if snapshot.changed_since(self.last_applied.get(guild.id))
+        ]
+
+    async def reconcile_guilds(self, stagger=0.0):
+        """
+        Update only the guilds that missed the current snapshot,
+        e.g. after a gateway reconnect. Does not refetch providers.
         Returns dict of guild_id -> success.
         """
-        # First, fetch all provider data
-        await self.fetch_all_providers()
+        if not self.provider_cache:
+            await self.fetch_all_providers()
+        return await self._update_guilds(self.stale_guild_ids(), stagger)
+
+    async def _update_guilds(self, guild_ids, stagger=0.0):
+        started = time.perf_counter()
+        # This wave's own nickname outcomes; the global counters also see commands and other identities
+        edits = {"changed": 0, "skipped": 0, "failed": 0}
 
-        # Update each guild
+        # Update each guild, spread over `stagger` seconds when asked
+        delay = stagger / len(guild_ids) if guild_ids and stagger > 0 else 0
         results = {}
-        for guild in self.bot.guilds:
-            success = await self.update_guild(guild.id)
-            results[guild.id] = success
+        for i, guild_id in enumerate(guild_ids):
+            if delay and i:
+                await asyncio.sleep(delay)
+            success = await self.update_guild(guild_id, nickname_edits=edits)
+            results[guild_id] = success
 
-        # Log summary
+        # One summary record per tick instead of per-guild INFO lines
         successful = sum(1 for success in results.values() if success)
-        logger.info(f"Update complete: {successful}/{len(results)} guilds updated successfully")
+        elapsed = time.perf_counter() - started
+        logger.info(
+            "Update complete: %d/%d guilds updated successfully in %.2fs (nicknames: %d changed, %d skipped, %d failed)",
+            successful, len(results), elapsed, edits["changed"], edits["skipped"], edits["failed"],
+            extra={"tick": {"guilds": len(results), "successful": successful, "seconds": round(elapsed, 3), "nicknames": edits}}
+        )
 
         return results
+
+
+class UpdaterGroup:
+    """
+    Drives the Updaters of several bot identities from one scheduler:
+    one provider fetch per wave, then every identity's guilds.
+    """
+
+    def __init__(self, updaters, hub):
+        self.updaters = list(updaters)
+        self.hub = hub
+
+    async def wait_until_ready(self):
+        await asyncio.gather(*(updater.wait_until_ready() for updater in self.updaters))
+
+    async def update_all_guilds(self, stagger=0.0):
+        """
+        Returns dict of (identity index, guild_id) -> success.
+        """
+        await self.hub.refresh()
+        # Each identity has its own REST rate limits, so their waves run side by side
+        waves = await asyncio.gather(*(
+            updater.update_all_guilds(stagger, max_age=float("inf")) for updater in self.updaters
+        ))
+        return {
+            (index, guild_id): success
+            for index, results in enumerate(waves)
+            for guild_id, success in results.items()
+        }
@@ -0,0 +1,96 @@
+import asyncio
+import enum
+import logging
+import os
+from contextlib import asynccontextmanager
+
+logger = logging.getLogger(__name__)
+
+
+class Lane(enum.IntEnum):
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+
+class WorkScheduler:
+    """
+    Prioritizes interactive work (slash commands) over bulk background
+    updates (scheduled waves) that share Discord's REST budget and the
+    event loop.
+
+    Each unit of work takes a token from a shared bucket refilled at
+    `rate` per second (0 = unlimited). A `interactive_share` fraction of
+    the bucket is reserved: background work only takes tokens above that
+    reserve and pauses entirely while interactive work is in flight, so
+    a /forceupdate never queues behind hundreds of wave edits.
+    """
+
+    def __init__(self, rate=0.0, interactive_share=0.3):
+        if not 0.0 <= interactive_share < 1.0:
+            raise ValueError("interactive_share must be at least 0 and below 1")
+        self.rate = max(0.0, rate)
+        self.interactive_share = interactive_share
+        self.capacity = max(1.0, self.rate)
+        # Background work needs at least one token above the reserve, or it would never run
+        self.reserve = min(self.capacity * self.interactive_share, self.capacity - 1.0) if self.rate else 0.0
+        self._tokens = self.capacity
+        self._updated = None
+        self._interactive = 0
+        self._interactive_idle = asyncio.Event()
+        self._interactive_idle.set()
+
+    @classmethod
+    def from_env(cls):
+        """
+        UPDATE_RATE_LIMIT   - guild updates per second across both lanes (default: 0, unlimited)
+        INTERACTIVE_SHARE   - fraction of that budget reserved for commands, below 1 (default: 0.3)
+        """
+        try:
+            return cls(float(os.getenv("UPDATE_RATE_LIMIT", "0")), float(os.getenv("INTERACTIVE_SHARE", "0.3")))
+        except ValueError:
+            logger.warning("Invalid UPDATE_RATE_LIMIT/INTERACTIVE_SHARE (the share must be below 1), using defaults")
+            return cls()
+
+    def _refill(self):
+        now = asyncio.get_running_loop().time()
+        if self._updated is not None:
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def _take(self, floor):
+        """
+        Take one token, waiting until more than `floor` tokens are available.
+        """
+        if not self.rate:
+            return
+        while True:
+            self._refill()
+            if self._tokens - 1 >= floor:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((floor + 1 - self._tokens) / self.rate)
+
+    @asynccontextmanager
+    async def slot(self, lane=Lane.BACKGROUND, cost=1):
+        """
+        Run a unit of work in a lane. cost=0 only applies priority, not budget.
+        """
+        if lane is Lane.INTERACTIVE:
+            self._interactive += 1
+            self._interactive_idle.clear()
+            try:
+                for _ in range(cost):
+                    await self._take(0.0)
+                yield
+            finally:
+                self._interactive -= 1
+                if not self._interactive:
+                    self._interactive_idle.set()
+        else:
+            # Yield to the loop between background units, and step aside for interactive work
+            await asyncio.sleep(0)
+            await self._interactive_idle.wait()
+            for _ in range(cost):
+                await self._take(self.reserve)
+                await self._interactive_idle.wait()
+            yield
@@ -0,0 +1,47 @@
+import pytest
+
+from src.alerts import AlertEngine, is_threshold_key
+from src.config_manager import ConfigManager
+from src.provider_snapshot import ProviderSnapshot
+
+
+@pytest.fixture
+def engine(tmp_path):
+    return AlertEngine(None, ConfigManager(str(tmp_path / "guild_config.json")))
+
+
+def _snapshot(version, **market):
+    return ProviderSnapshot({"m": {"timestamp": version, **market}}, version=version)
+
+
+@pytest.mark.parametrize("key, current", [
+    ("emotion", None), ("emoji", "😨"), ("trend", None), ("vix_rating", None),
+    ("spark7", None), ("index", "Fear"),
+])
+def test_text_keys_are_not_threshold_keys(key, current):
+    assert not is_threshold_key(key, current)
+
+
+@pytest.mark.parametrize("key, current", [("index", None), ("index", 42), ("vix_value", "17.5")])
+def test_numeric_keys_are_threshold_keys(key, current):
+    assert is_threshold_key(key, current)
+
+
+def test_threshold_on_text_key_is_rejected(engine):
+    with pytest.raises(ValueError):
+        engine.add(1, "m", "emotion", "below", 25)
+    with pytest.raises(ValueError):
+        engine.add(1, "m", "putcall", "above", 50, current="n/a")
+    assert engine.add(1, "m", "emotion", "changes") is not None
+
+
+def test_crossing_fires_threshold_rules(engine):
+    below = engine.add(1, "m", "index", "below", 25)
+    above = engine.add(2, "m", "index", "above", 75)
+    changes = engine.add(3, "m", "emotion", "changes")
+
+    assert engine.evaluate(_snapshot(1, index=30, emotion="Fear")) == []
+    fired = engine.evaluate(_snapshot(2, index=20, emotion="Extreme Fear"))
+    assert {(guild_id, rule["id"]) for guild_id, rule, _, _ in fired} == {(1, below["id"]), (3, changes["id"])}
+    fired = engine.evaluate(_snapshot(3, index=80, emotion="Extreme Fear"))
+    assert [(guild_id, rule["id"]) for guild_id, rule, _, _ in fired] == [(2, above["id"])]
@@ -0,0 +1,104 @@
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from src.cadence import CadenceEngine, MarketCalendar, SessionCadence
+
+NEW_YORK = ZoneInfo("America/New_York")
+
+
+def _ny(day, hour, minute=0):
+    return datetime.combine(date.fromisoformat(day), datetime.min.time(), NEW_YORK).replace(hour=hour, minute=minute)
+
+
+def test_trading_days_skip_weekends_and_holidays():
+    calendar = MarketCalendar(holidays=("2026-11-26", "2026-10-20"))
+    assert calendar.is_trading_day(date(2026, 10, 19))      # Monday
+    assert not calendar.is_trading_day(date(2026, 10, 17))  # Saturday
+    assert not calendar.is_trading_day(date(2026, 10, 18))  # Sunday
+    assert not calendar.is_trading_day(date(2026, 11, 26))  # Thanksgiving
+    assert not calendar.is_trading_day(date(2026, 10, 20))  # extra holiday
+
+
+def test_sessions_between_skip_closed_days():
+    calendar = MarketCalendar()
+    sessions = list(calendar.sessions(_ny("2026-11-25", 17), _ny("2026-11-30", 8)))
+    # Thanksgiving and the weekend are closed; the days of `since` and `until` and the one before are included
+    assert [start.date() for start, _ in sessions] == [
+        date(2026, 11, 24), date(2026, 11, 25), date(2026, 11, 27), date(2026, 11, 30)]
+    assert sessions[2] == (_ny("2026-11-27", 9, 30), _ny("2026-11-27", 16))
+
+
+def test_session_cadence_idle_over_weekend_and_holiday():
+    cadence = SessionCadence(MarketCalendar())
+    # Friday after the close to Monday before the open
+    assert not cadence.could_change(_ny("2026-10-16", 17), _ny("2026-10-19", 8))
+    assert cadence.could_change(_ny("2026-10-16", 17), _ny("2026-10-19", 10))
+    # Wednesday after the close to Thanksgiving evening
+    assert not cadence.could_change(_ny("2026-11-25", 17), _ny("2026-11-26", 20))
+
+
+def test_session_cadence_grace_after_close():
+    cadence = SessionCadence(MarketCalendar(), grace=timedelta(minutes=30))
+    assert cadence.could_change(_ny("2026-10-19", 16, 10), _ny("2026-10-19", 16, 20))
+    assert not cadence.could_change(_ny("2026-10-19", 16, 40), _ny("2026-10-19", 17))
+
+    # A change seen after the grace window widens it
+    cadence.observe(_ny("2026-10-19", 17, 30), _ny("2026-10-19", 17))
+    assert cadence.grace == timedelta(hours=1, minutes=35)
+    assert cadence.could_change(_ny("2026-10-20", 16, 40), _ny("2026-10-20", 17))
+
+    # ...but not past max_grace, or from a closed day
+    cadence.observe(_ny("2026-10-20", 21), _ny("2026-10-20", 20))
+    cadence.observe(_ny("2026-10-17", 18), _ny("2026-10-17", 17))
+    assert cadence.grace == timedelta(hours=1, minutes=35)
+
+
+def test_session_cadence_long_gap_counts_as_changed():
+    cadence = SessionCadence(MarketCalendar(holidays=[f"2026-10-{day:02d}" for day in range(1, 32)]))
+    assert not cadence.could_change(_ny("2026-10-01", 12), _ny("2026-10-10", 12))
+    assert cadence.could_change(_ny("2026-10-01", 12), _ny("2026-10-20", 12))
+
+
+def test_engine_due_and_max_idle():
+    engine = CadenceEngine({"m": SessionCadence(MarketCalendar())}, max_idle=timedelta(hours=6))
+    saturday = _ny("2026-10-17", 10)
+
+    # Never fetched, or without a schedule: always due
+    assert engine.due({"m", "gold"}, now=saturday) == {"m", "gold"}
+
+    engine.fetched_at["m"] = saturday
+    engine.fetched_at["gold"] = saturday
+    assert engine.due({"m", "gold"}, now=saturday + timedelta(hours=5)) == {"gold"}
+    # max_idle fetches anyway
+    assert engine.due({"m"}, now=saturday + timedelta(hours=6)) == {"m"}
+
+
+@pytest.mark.parametrize("value", ["off", "OFF", "false", "0", "no"])
+def test_from_env_off_switch(monkeypatch, value):
+    monkeypatch.setenv("ADAPTIVE_CADENCE", value)
+    assert CadenceEngine.from_env() is None
+
+
+def test_from_env_defaults_and_settings(monkeypatch):
+    monkeypatch.delenv("ADAPTIVE_CADENCE", raising=False)
+    monkeypatch.delenv("MARKET_SESSION", raising=False)
+    monkeypatch.setenv("MARKET_HOLIDAYS", "2026-10-19")
+    monkeypatch.setenv("CADENCE_MAX_IDLE_HOURS", "2.5")
+    engine = CadenceEngine.from_env()
+    assert set(engine.schedules) == {"m", "c"}
+    assert engine.max_idle == timedelta(hours=2.5)
+    calendar = engine.schedules["m"].calendar
+    assert not calendar.is_trading_day(date(2026, 10, 19))
+    assert not calendar.is_trading_day(date(2026, 11, 26))
+
+
+def test_from_env_invalid_values_fall_back(monkeypatch):
+    monkeypatch.delenv("ADAPTIVE_CADENCE", raising=False)
+    monkeypatch.setenv("MARKET_SESSION", "open-close")
+    monkeypatch.setenv("CADENCE_MAX_IDLE_HOURS", "soon")
+    engine = CadenceEngine.from_env()
+    calendar = engine.schedules["m"].calendar
+    assert (calendar.open.hour, calendar.open.minute, calendar.close.hour) == (9, 30, 16)
+    assert engine.max_idle == timedelta(hours=6)
@@ -0,0 +1,34 @@
+import asyncio
+
+from src.chart_generator import ChartGenerator
+
+
+def test_prewarm_steps_aside_while_user_charts_are_waiting():
+    async def run():
+        charts = ChartGenerator(prewarm_top=3, max_points=90, cache_ttl=3600)
+        order = []
+
+        async def render(days, provider, series=None):
+            order.append(days)
+            await asyncio.sleep(0.05)
+            return f"https://charts/{provider}/{days}"
+
+        charts._generate_chart = render
+        for days in (7, 30, 90):
+            charts._requests[("market", days, None)] = 2
+
+        async def user(days, delay):
+            await asyncio.sleep(delay)
+            return await charts.generate_chart(days, "market", wait=True)
+
+        prewarm = asyncio.create_task(charts._prewarm())
+        # The first user arrives during a pre-warm render, the second during the first user's render
+        urls = await asyncio.gather(user(180, 0.01), user(365, 0.07))
+        await prewarm
+        return urls, order
+
+    urls, order = asyncio.run(run())
+    assert urls == ["https://charts/market/180", "https://charts/market/365"]
+    # Users wait for the render in progress only, then pre-warm resumes
+    assert order[1:3] == [180, 365]
+    assert sorted(order) == [7, 30, 90, 180, 365]
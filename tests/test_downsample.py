@@ -0,0 +1,46 @@
+import math
+
+from src.downsample import downsample, lttb_indices
+
+
+def _series(n):
+    return [50 + 40 * math.sin(i / 7) + (i % 5) for i in range(n)]
+
+
+def test_keeps_first_and_last_point():
+    values = _series(500)
+    indices = lttb_indices(values, 60)
+    assert indices[0] == 0
+    assert indices[-1] == len(values) - 1
+
+
+def test_output_length_equals_threshold():
+    values = _series(500)
+    for threshold in (3, 10, 60, 499):
+        indices = lttb_indices(values, threshold)
+        assert len(indices) == threshold
+        # Strictly increasing, so labels stay in order
+        assert indices == sorted(set(indices))
+
+
+def test_keeps_extremes():
+    values = [0.0] * 100
+    values[37] = 100.0
+    assert 37 in lttb_indices(values, 10)
+
+
+def test_short_input_returned_unchanged():
+    labels = [f"d{i}" for i in range(20)]
+    values = _series(20)
+    for threshold in (20, 50):
+        new_labels, new_values = downsample(labels, values, threshold)
+        assert new_labels is labels
+        assert new_values is values
+
+
+def test_downsample_keeps_labels_paired():
+    labels = list(range(300))
+    values = _series(300)
+    new_labels, new_values = downsample(labels, values, 30)
+    assert len(new_labels) == len(new_values) == 30
+    assert all(values[label] == value for label, value in zip(new_labels, new_values))
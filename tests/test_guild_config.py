@@ -0,0 +1,18 @@
+from src.guild_config import GuildConfig
+
+
+def test_equal_records_hash_equal():
+    alert = {"id": 1, "provider": "m", "key": "index", "condition": "below", "value": 25.0}
+    a = GuildConfig.create(nickname_template="F/G: {m.index}", alerts=[alert])
+    b = GuildConfig.create(nickname_template="F/G: {m.index}", alerts=[dict(alert)])
+    assert a is not b
+    assert a == b
+    assert hash(a) == hash(b)
+    assert len({a, b}) == 1
+
+
+def test_records_without_rules_are_shared():
+    a = GuildConfig.from_dict({"nickname_template": "F/G: {m.index}", "status_template": "{m.emoji}"})
+    b = GuildConfig.from_dict({"nickname_template": "F/G: {m.index}", "status_template": "{m.emoji}"})
+    assert a is b
+    assert a.replace(timezone="Europe/Sofia") != a
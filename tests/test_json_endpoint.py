@@ -0,0 +1,104 @@
+import os
+
+import pytest
+
+from providers.json_endpoint import JsonEndpointProvider, compile_path, extract, load_json_providers
+
+DOCUMENT = {
+    "fear_and_greed": {"score": 42.5, "rating": "fear"},
+    "data": [{"value": "71", "timestamp": "1760832000"}, {"value": "65"}],
+    "odd key": {"a.b": 1},
+}
+
+
+def test_compile_nested_keys():
+    assert compile_path("fear_and_greed.score") == ("fear_and_greed", "score")
+    assert compile_path("$.fear_and_greed.score") == ("fear_and_greed", "score")
+    assert extract(DOCUMENT, compile_path("fear_and_greed.rating")) == "fear"
+
+
+def test_compile_list_indices_and_quoted_keys():
+    assert compile_path("data[0].value") == ("data", 0, "value")
+    assert compile_path("data[-1].value") == ("data", -1, "value")
+    assert compile_path('["odd key"]["a.b"]') == ("odd key", "a.b")
+    assert extract(DOCUMENT, compile_path("data[-1].value")) == "65"
+    assert extract(DOCUMENT, compile_path('["odd key"]["a.b"]')) == 1
+
+
+@pytest.mark.parametrize("expression", ["", "$", "data..value", "data[x]", "[0]value", "data value", ".1abc"])
+def test_compile_invalid_paths(expression):
+    with pytest.raises(ValueError):
+        compile_path(expression)
+
+
+@pytest.mark.parametrize("path", ["missing", "data[5].value", "fear_and_greed.score.x", "data.value"])
+def test_missing_paths(path):
+    with pytest.raises((KeyError, IndexError, TypeError)):
+        extract(DOCUMENT, compile_path(path))
+
+
+def test_parse_leaves_missing_fields_out():
+    provider = JsonEndpointProvider("fg", "https://example.com", {
+        "index": "fear_and_greed.score", "gone": "data[9].value"}, emotion_key="index")
+    values = provider.parse(DOCUMENT)
+    assert values["index"] == 42.5
+    assert "gone" not in values
+    assert values["emotion"] != "Unknown"
+    assert values["timestamp"] is not None
+
+    # Nothing found falls back to the defaults
+    assert provider.parse({}) == {"timestamp": None, "emotion": "Unknown", "emoji": "❓"}
+
+
+def _clear_env(monkeypatch):
+    for key in list(os.environ):
+        if key.startswith("JSON_PROVIDER"):
+            monkeypatch.delenv(key)
+
+
+def test_load_json_providers(monkeypatch):
+    _clear_env(monkeypatch)
+    monkeypatch.setenv("JSON_PROVIDERS", " Gold, ,btcd")
+    monkeypatch.setenv("JSON_PROVIDER_GOLD_URL", "https://example.com/gold")
+    monkeypatch.setenv("JSON_PROVIDER_GOLD_FIELDS", "price=data[0].value, updated=data[0].timestamp")
+    monkeypatch.setenv("JSON_PROVIDER_GOLD_HEADERS", "X-Api-Key: abc;")
+    monkeypatch.setenv("JSON_PROVIDER_BTCD_URL", "https://example.com/btcd")
+    monkeypatch.setenv("JSON_PROVIDER_BTCD_FIELDS", "index=fear_and_greed.score")
+    monkeypatch.setenv("JSON_PROVIDER_BTCD_EMOTION", "index")
+
+    providers = load_json_providers()
+    assert set(providers) == {"gold", "btcd"}
+    assert providers["gold"].fields == {"price": "data[0].value", "updated": "data[0].timestamp"}
+    assert providers["gold"].headers["X-Api-Key"] == "abc"
+    assert providers["btcd"].emotion_key == "index"
+
+
+@pytest.mark.parametrize("env", [
+    {},                                                                      # no URL
+    {"JSON_PROVIDER_{}_URL": "https://example.com"},                         # no FIELDS
+    {"JSON_PROVIDER_{}_URL": "https://example.com", "JSON_PROVIDER_{}_FIELDS": "price"},
+    {"JSON_PROVIDER_{}_URL": "https://example.com", "JSON_PROVIDER_{}_FIELDS": "price=data..value"},
+    {"JSON_PROVIDER_{}_URL": "https://example.com", "JSON_PROVIDER_{}_FIELDS": "price=data",
+     "JSON_PROVIDER_{}_EMOTION": "index"},
+    {"JSON_PROVIDER_{}_URL": "https://example.com", "JSON_PROVIDER_{}_FIELDS": "price=data",
+     "JSON_PROVIDER_{}_HEADERS": "X-Api-Key abc"},
+])
+def test_load_json_providers_skips_invalid(monkeypatch, env):
+    _clear_env(monkeypatch)
+    monkeypatch.setenv("JSON_PROVIDERS", "bad,ok")
+    monkeypatch.setenv("JSON_PROVIDER_OK_URL", "https://example.com/ok")
+    monkeypatch.setenv("JSON_PROVIDER_OK_FIELDS", "price=data[0].value")
+    for key, value in env.items():
+        monkeypatch.setenv(key.format("BAD"), value)
+
+    assert set(load_json_providers()) == {"ok"}
+
+
+@pytest.mark.parametrize("name", ["m", "c", "1st"])
+def test_load_json_providers_skips_reserved_names(monkeypatch, name):
+    _clear_env(monkeypatch)
+    monkeypatch.setenv("JSON_PROVIDERS", name)
+    monkeypatch.setenv(f"JSON_PROVIDER_{name.upper()}_URL", "https://example.com")
+    monkeypatch.setenv(f"JSON_PROVIDER_{name.upper()}_FIELDS", "price=data")
+
+    assert load_json_providers() == {}
@@ -0,0 +1,39 @@
+import logging
+import queue
+
+from src.logging_setup import JsonFormatter, _DeferredQueueHandler
+
+
+def _queued(log):
+    records = queue.SimpleQueue()
+    logger = logging.getLogger("tests.logging_setup")
+    logger.propagate = False
+    handler = _DeferredQueueHandler(records)
+    logger.addHandler(handler)
+    try:
+        log(logger)
+    finally:
+        logger.removeHandler(handler)
+    return records.get_nowait()
+
+
+def test_message_is_frozen_when_logged():
+    values = {"index": 40}
+    record = _queued(lambda logger: logger.warning("index=%s", values))
+    values["index"] = 99
+    assert record.getMessage() == "index={'index': 40}"
+    assert record.args is None
+
+
+def test_exception_text_survives_the_queue():
+    def log(logger):
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logger.exception("failed")
+
+    record = _queued(log)
+    assert record.exc_info is None
+    assert "ValueError: boom" in record.exc_text
+    assert "ValueError: boom" in logging.Formatter().format(record)
+    assert "ValueError: boom" in JsonFormatter().format(record)
@@ -0,0 +1,28 @@
+import logging
+
+from src.metrics import RATELIMIT_WAIT_SECONDS, RateLimitWaitFilter
+
+
+def _record(msg, *args):
+    return logging.LogRecord("discord.http", logging.WARNING, __file__, 0, msg, args, None)
+
+
+def _waits():
+    child = RATELIMIT_WAIT_SECONDS._children[()]
+    return sum(child.counts), child.sum
+
+
+def test_ratelimit_filter_records_retry_waits_only():
+    rate_filter = RateLimitWaitFilter()
+    count, total = _waits()
+
+    # discord.http's format strings
+    assert rate_filter.filter(_record(
+        "We are being rate limited. %s %s responded with 429. Retrying in %.2f seconds.", "PATCH", "/x", 1.5))
+    assert rate_filter.filter(_record(
+        "Global rate limit has been hit. Retrying in %.2f seconds.", 2.0))
+    assert rate_filter.filter(_record(
+        "We are being rate limited. %s %s responded with 429. Timeout of %.2f was too long, erroring instead.",
+        "PATCH", "/x", 600.0))
+
+    assert _waits() == (count + 2, total + 3.5)
@@ -0,0 +1,37 @@
+import asyncio
+
+from src import backends
+from src.provider_hub import ProviderHub
+from src.provider_snapshot import ProviderSnapshot
+
+
+def test_provider_returning_none_falls_back_to_defaults():
+    hub = ProviderHub()
+    providers = hub._get_providers()
+
+    async def market(session=None):
+        return {"index": 40, "timestamp": "1"}
+
+    async def crypto(session=None):
+        return None
+
+    providers["m"].fetch = market
+    providers["c"].fetch = crypto
+    asyncio.run(hub.refresh())
+
+    assert hub.snapshot["m"]["index"] == 40
+    assert dict(hub.snapshot["c"]) == providers["c"]._get_default_values()
+    assert hub.snapshot.stale_providers == {"c"}
+
+
+def test_content_hash_does_not_depend_on_json_backend():
+    data = {"m": {"index": 40, "emoji": "😨", "timestamp": "1"}}
+    try:
+        hashes = set()
+        for name in backends.JSON_BACKENDS:
+            if backends._importable(name):
+                backends.select_json_backend(name)
+                hashes.add(ProviderSnapshot(data).content_hash)
+    finally:
+        backends.select_json_backend()
+    assert len(hashes) == 1
@@ -0,0 +1,90 @@
+import random
+
+import pytest
+
+from providers.rolling import RollingStats
+
+
+def _naive(readings, capacity):
+    """
+    The expected window values recomputed from scratch: last reading per day wins.
+    """
+    by_day = {}
+    for day, value in readings:
+        if by_day and day < max(by_day):
+            continue
+        by_day[day] = float(value)
+    return [by_day[day] for day in sorted(by_day)][-capacity:]
+
+
+def _assert_matches(stats, readings):
+    values = _naive(readings, stats.capacity)
+    assert len(stats) == len(values)
+    keys = stats.keys()
+    current = values[-1]
+    for window in RollingStats.AVG_WINDOWS:
+        recent = values[-window:]
+        assert stats._sums[window] == pytest.approx(sum(recent))
+        assert keys[f"avg{window}"] == round(sum(recent) / len(recent))
+    for window in RollingStats.RANGE_WINDOWS:
+        assert keys[f"min{window}"] == round(min(values[-window:]))
+        assert keys[f"max{window}"] == round(max(values[-window:]))
+    for window in RollingStats.CHANGE_WINDOWS:
+        if len(values) > window:
+            assert keys[f"chg{window}d"] == f"{round(current - values[-window - 1]):+d}"
+        else:
+            assert f"chg{window}d" not in keys
+    recent = values[-RollingStats.PERCENTILE_WINDOW:]
+    at_or_below = sum(1 for value in recent if value <= current)
+    assert keys[f"pctile{RollingStats.PERCENTILE_WINDOW}"] == round(100 * at_or_below / len(recent))
+
+
+def test_empty_has_no_keys():
+    assert RollingStats().keys() == {}
+
+
+def test_seed_then_update():
+    rng = random.Random(1)
+    readings = [(day, rng.uniform(0, 100)) for day in range(40)]
+    stats = RollingStats()
+    stats.seed(readings)
+    _assert_matches(stats, readings)
+
+    readings.append((40, 12.5))
+    stats.update(40, 12.5)
+    _assert_matches(stats, readings)
+    assert stats.keys()["chg1d"] == f"{round(12.5 - readings[-2][1]):+d}"
+
+
+def test_same_day_overwrite():
+    readings = [(day, 50 + day) for day in range(10)]
+    stats = RollingStats()
+    stats.seed(readings)
+
+    for value in (5, 95, 60):
+        readings.append((9, value))
+        stats.update(9, value)
+        _assert_matches(stats, readings)
+    assert len(stats) == 10
+
+
+def test_older_reading_is_ignored():
+    readings = [(day, day) for day in range(10)]
+    stats = RollingStats()
+    stats.seed(readings)
+    stats.update(3, 1000)
+    _assert_matches(stats, readings)
+
+
+def test_window_eviction():
+    rng = random.Random(2)
+    stats = RollingStats()
+    readings = []
+    # Past the 7- and 30-day windows and the ring's capacity, with same-day overwrites along the way
+    for day in range(stats.capacity * 2 + 15):
+        for _ in range(rng.randint(1, 2)):
+            value = rng.uniform(0, 100)
+            readings.append((day, value))
+            stats.update(day, value)
+        _assert_matches(stats, readings)
+    assert len(stats) == stats.capacity
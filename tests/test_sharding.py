@@ -0,0 +1,33 @@
+import pytest
+
+from src.sharding import parse_shard_ids, split_shards
+
+
+def test_parse_ranges_and_single_ids():
+    assert parse_shard_ids("0-3,6,8-9") == [0, 1, 2, 3, 6, 8, 9]
+    assert parse_shard_ids(" 4 , 2-2 ,") == [2, 4]
+
+
+def test_parse_duplicates_and_overlaps():
+    assert parse_shard_ids("3,1-4,3,2-5") == [1, 2, 3, 4, 5]
+
+
+@pytest.mark.parametrize("value", ["a", "1-b", "1-", "-1", "5-2", "1.5"])
+def test_parse_invalid(value):
+    with pytest.raises(ValueError):
+        parse_shard_ids(value)
+
+
+def test_split_even():
+    assert split_shards(list(range(8)), 4) == [[0, 1], [2, 3], [4, 5], [6, 7]]
+
+
+def test_split_uneven_keeps_every_shard_once():
+    ranges = split_shards(list(range(10)), 3)
+    assert ranges == [[0, 1, 2, 3], [4, 5, 6], [7, 8, 9]]
+    assert max(map(len, ranges)) - min(map(len, ranges)) <= 1
+
+
+def test_split_clamps_process_count():
+    assert split_shards([2, 5], 4) == [[2], [5]]
+    assert split_shards([0, 1, 2], 0) == [[0, 1, 2]]
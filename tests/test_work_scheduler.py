@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+
+from src.work_scheduler import Lane, WorkScheduler
+
+
+async def _acquire(scheduler, lane, timeout=1.0):
+    """
+    True if a slot in `lane` is acquired within timeout seconds.
+    """
+    async def enter():
+        async with scheduler.slot(lane):
+            pass
+
+    try:
+        await asyncio.wait_for(enter(), timeout)
+        return True
+    except asyncio.TimeoutError:
+        return False
+
+
+def test_unlimited_rate_never_waits():
+    async def run():
+        scheduler = WorkScheduler()
+        results = [await _acquire(scheduler, Lane.BACKGROUND, 0.1) for _ in range(100)]
+        return all(results) and await _acquire(scheduler, Lane.INTERACTIVE, 0.1)
+
+    assert asyncio.run(run())
+
+
+@pytest.mark.parametrize("rate, share", [(1.0, 0.3), (1.0, 0.9), (1.2, 0.3), (0.5, 0.3)])
+def test_background_runs_at_low_rates(rate, share):
+    scheduler = WorkScheduler(rate=rate, interactive_share=share)
+    assert scheduler.capacity - scheduler.reserve >= 1.0
+    assert asyncio.run(_acquire(scheduler, Lane.BACKGROUND))
+
+
+def test_background_leaves_the_reserve_for_interactive_work():
+    async def run():
+        scheduler = WorkScheduler(rate=10.0, interactive_share=0.5)
+        background = [await _acquire(scheduler, Lane.BACKGROUND, 0.01) for _ in range(6)]
+        interactive = await _acquire(scheduler, Lane.INTERACTIVE, 0.01)
+        return background, interactive
+
+    background, interactive = asyncio.run(run())
+    # 10 tokens, 5 reserved: background gets 5 right away, the 6th has to wait
+    assert background == [True] * 5 + [False]
+    assert interactive
+
+
+def test_background_pauses_while_interactive_work_is_in_flight():
+    async def run():
+        scheduler = WorkScheduler()
+        async with scheduler.slot(Lane.INTERACTIVE):
+            blocked = not await _acquire(scheduler, Lane.BACKGROUND, 0.05)
+        return blocked and await _acquire(scheduler, Lane.BACKGROUND, 0.05)
+
+    assert asyncio.run(run())
+
+
+@pytest.mark.parametrize("share", [1.0, 1.5, -0.1])
+def test_invalid_share_is_rejected(share):
+    with pytest.raises(ValueError):
+        WorkScheduler(rate=5.0, interactive_share=share)
+
+
+def test_from_env_falls_back_on_invalid_share(monkeypatch):
+    monkeypatch.setenv("UPDATE_RATE_LIMIT", "2")
+    monkeypatch.setenv("INTERACTIVE_SHARE", "1")
+    scheduler = WorkScheduler.from_env()
+    assert scheduler.rate == 0.0
+    assert scheduler.interactive_share == 0.3